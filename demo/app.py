@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 """Sin City Travels - Interactive Web Demo"""
+import json
 import math
 import os
 import re
@@ -7,7 +8,7 @@ import sys
 import time as _time
 from decimal import Decimal
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request, send_from_directory
 from flask.json.provider import DefaultJSONProvider
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
@@ -15,10 +16,21 @@ from flask_limiter.util import get_remote_address
 sys.path.insert(0, os.path.dirname(__file__))
 from config import (
     MAP_CONFIG, WALK_THRESHOLD_METERS, WALK_SPEED_MPS,
-    UBER_RATES, LYFT_RATES, RIDESHARE_AVG_SPEED_MPH
+    UBER_RATES, LYFT_RATES, RIDESHARE_AVG_SPEED_MPH, TILE_MAX_ZOOM,
+    AUTOCOMPLETE_LIMIT, FLOORPLAN_TILES_DIR, FLOORPLAN_TILE_MAX_AGE
 )
 from db import init_pool, query
+import autocomplete  # noqa: F401  (registers the 'autocomplete' catalog index)
+import catalog
+import clustering  # noqa: F401  (registers the 'clusters' catalog index)
+import facets
+import geofence  # noqa: F401  (registers the 'geofence' catalog index)
 import google_directions
+import opening_hours
+import property_matrix  # noqa: F401  (registers the 'property_matrix' catalog index)
+import search  # noqa: F401  (registers the 'search' catalog index)
+import spatial_index  # noqa: F401  (registers the 'spatial' catalog index)
+import vector_tiles
 
 
 class CustomJSONProvider(DefaultJSONProvider):
@@ -45,12 +57,26 @@ limiter = Limiter(
 VALID_CATEGORIES = {'restaurant', 'shopping', 'entertainment', 'nightlife',
                     'pool_spa', 'attraction', 'casino', 'hotel'}
 POI_ID_PATTERN = re.compile(r'^[a-zA-Z0-9_-]{1,20}$')
+FLOORPLAN_SLUG_PATTERN = re.compile(r'^[a-zA-Z0-9_-]{1,64}$')
+OPEN_AT_ERROR = 'open_at must be "now", unix seconds or an ISO 8601 timestamp'
 
 
 def validate_poi_id(poi_id):
     return bool(POI_ID_PATTERN.match(poi_id))
 
 
+def open_poi_ids():
+    """Ids of POIs open at ?open_at=, or None when the filter is absent.
+
+    Raises ValueError for an unparseable timestamp.
+    """
+    value = request.args.get('open_at')
+    if not value:
+        return None
+    when = opening_hours.parse_timestamp(value)
+    return catalog.get_snapshot().index('open_hours').open_at(when)
+
+
 # ─── Error handlers ─────────────────────────────────────────────────────────
 
 @app.errorhandler(400)
@@ -111,6 +137,10 @@ def api_pois():
     category = request.args.get('category')
     if category and category not in VALID_CATEGORIES:
         return jsonify({'error': f'Invalid category. Must be one of: {", ".join(sorted(VALID_CATEGORIES))}'}), 400
+    try:
+        open_ids = open_poi_ids()
+    except ValueError:
+        return jsonify({'error': OPEN_AT_ERROR}), 400
     sql = """
         SELECT id, name, category::text, subcategory::text, casino_property,
                ST_Y(location::geometry) AS lat, ST_X(location::geometry) AS lng,
@@ -123,9 +153,35 @@ def api_pois():
         ORDER BY casino_property, name
     """
     rows = query(sql, (category, category))
+    if open_ids is not None:
+        rows = [r for r in rows if r['id'] in open_ids]
     return jsonify(rows)
 
 
+@app.route('/api/pois/query')
+@limiter.limit("120 per minute")
+def api_pois_query():
+    """Faceted POI filtering: any of the facets.FACETS as comma-separated values."""
+    filters = {}
+    for facet in facets.FACETS:
+        values = [v.strip() for arg in request.args.getlist(facet) for v in arg.split(',') if v.strip()]
+        if values:
+            filters[facet] = values
+
+    bad = set(filters.get('category', [])) - VALID_CATEGORIES
+    if bad:
+        return jsonify({'error': f'Invalid category. Must be one of: {", ".join(sorted(VALID_CATEGORIES))}'}), 400
+
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', 50)), 1), 200)
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be integers'}), 400
+
+    index = catalog.get_snapshot().index('facets')
+    return jsonify(index.query(filters, offset=offset, limit=limit))
+
+
 @app.route('/api/pois/recommended')
 def api_pois_recommended():
     sql = """
@@ -176,15 +232,183 @@ def api_nearby():
     if category and category not in VALID_CATEGORIES:
         return jsonify({'error': f'Invalid category. Must be one of: {", ".join(sorted(VALID_CATEGORIES))}'}), 400
 
-    if category:
-        sql = "SELECT * FROM find_nearby_pois(%s, %s, %s, %s::poi_category)"
-        rows = query(sql, (lat, lng, radius, category))
-    else:
-        sql = "SELECT * FROM find_nearby_pois(%s, %s, %s)"
-        rows = query(sql, (lat, lng, radius))
+    try:
+        open_ids = open_poi_ids()
+    except ValueError:
+        return jsonify({'error': OPEN_AT_ERROR}), 400
+
+    # In-memory grid index; same rows as find_nearby_pois() without a DB round trip
+    rows = catalog.get_snapshot().index('spatial').nearby(lat, lng, radius, category)
+    if open_ids is not None:
+        rows = [r for r in rows if r['id'] in open_ids]
     return jsonify(rows)
 
 
+@app.route('/api/locate')
+@limiter.limit("120 per minute")
+def api_locate():
+    try:
+        lat = float(request.args['lat'])
+        lng = float(request.args['lng'])
+    except (KeyError, ValueError, TypeError):
+        return jsonify({'error': 'lat and lng are required and must be numbers'}), 400
+
+    if not (-90 <= lat <= 90) or not (-180 <= lng <= 180):
+        return jsonify({'error': 'lat must be -90..90, lng must be -180..180'}), 400
+
+    return jsonify(catalog.get_snapshot().index('geofence').locate(lat, lng))
+
+
+@app.route('/api/search')
+def api_search():
+    q = request.args.get('q', '').strip()
+    if not q or len(q) > 100:
+        return jsonify({'error': 'q is required (max 100 characters)'}), 400
+
+    lat = lng = None
+    if request.args.get('lat') or request.args.get('lng'):
+        try:
+            lat = float(request.args['lat'])
+            lng = float(request.args['lng'])
+        except (KeyError, ValueError, TypeError):
+            return jsonify({'error': 'lat and lng must both be numbers'}), 400
+        if not (-90 <= lat <= 90) or not (-180 <= lng <= 180):
+            return jsonify({'error': 'lat must be -90..90, lng must be -180..180'}), 400
+
+    category = request.args.get('category') or None
+    if category and category not in VALID_CATEGORIES:
+        return jsonify({'error': f'Invalid category. Must be one of: {", ".join(sorted(VALID_CATEGORIES))}'}), 400
+
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 50)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
+    try:
+        open_ids = open_poi_ids()
+    except ValueError:
+        return jsonify({'error': OPEN_AT_ERROR}), 400
+
+    index = catalog.get_snapshot().index('search')
+    return jsonify(index.search(q, lat=lat, lng=lng, category=category, limit=limit, ids=open_ids))
+
+
+@app.route('/api/autocomplete')
+@limiter.limit("600 per minute")
+def api_autocomplete():
+    q = request.args.get('q', '')
+    if len(q) > 100:
+        return jsonify({'error': 'q must be at most 100 characters'}), 400
+
+    category = request.args.get('category') or None
+    if category and category not in VALID_CATEGORIES and category != 'property':
+        return jsonify({'error': f'Invalid category. Must be one of: {", ".join(sorted(VALID_CATEGORIES | {"property"}))}'}), 400
+
+    try:
+        limit = min(max(int(request.args.get('limit', AUTOCOMPLETE_LIMIT)), 1), 25)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
+    index = catalog.get_snapshot().index('autocomplete')
+    return jsonify(index.complete(q, category=category, limit=limit))
+
+
+@app.route('/api/clusters')
+def api_clusters():
+    try:
+        west, south, east, north = (float(v) for v in request.args['bbox'].split(','))
+        zoom = int(request.args.get('zoom', MAP_CONFIG['default_zoom']))
+    except (KeyError, ValueError, TypeError):
+        return jsonify({'error': 'bbox=west,south,east,north and integer zoom are required'}), 400
+
+    if not (-180 <= west < east <= 180) or not (-85 <= south < north <= 85):
+        return jsonify({'error': 'bbox must be west,south,east,north with west < east and south < north'}), 400
+
+    category = request.args.get('category') or None
+    if category and category not in VALID_CATEGORIES:
+        return jsonify({'error': f'Invalid category. Must be one of: {", ".join(sorted(VALID_CATEGORIES))}'}), 400
+
+    indexes = catalog.get_snapshot().index('clusters')
+    if category not in indexes:
+        return jsonify([])
+    return jsonify(indexes[category].get_clusters(west, south, east, north, zoom))
+
+
+@app.route('/api/clusters/<int:cluster_id>/leaves')
+def api_cluster_leaves(cluster_id):
+    category = request.args.get('category') or None
+    if category and category not in VALID_CATEGORIES:
+        return jsonify({'error': f'Invalid category. Must be one of: {", ".join(sorted(VALID_CATEGORIES))}'}), 400
+
+    index = catalog.get_snapshot().index('clusters').get(category)
+    leaves = index.get_leaves(cluster_id) if index else None
+    if leaves is None:
+        return jsonify({'error': 'Cluster not found'}), 404
+    return jsonify([{k: v for k, v in poi.items() if k != 'is_closed'} for poi in leaves])
+
+
+@app.route('/tiles/pois/<int:z>/<int:x>/<int:y>.mvt')
+@limiter.limit("600 per minute")
+def tiles_pois(z, x, y):
+    if z > TILE_MAX_ZOOM or x >= 2 ** z or y >= 2 ** z:
+        return jsonify({'error': f'Tile out of range (z must be 0..{TILE_MAX_ZOOM})'}), 400
+
+    version = catalog.get_snapshot().version_tag
+    if request.if_none_match.contains(version):
+        return Response(status=304)
+
+    tile, version = vector_tiles.get_tile(z, x, y, version)
+    resp = Response(tile, mimetype='application/vnd.mapbox-vector-tile')
+    resp.set_etag(version)
+    resp.headers['Cache-Control'] = 'public, max-age=300'
+    return resp
+
+
+_floorplan_index = {'mtime': None, 'layers': [], 'fingerprints': {}}
+
+
+def _floorplan_layers():
+    """Layers of the rendered index.json, re-read when the file changes."""
+    path = os.path.join(FLOORPLAN_TILES_DIR, 'index.json')
+    try:
+        mtime = os.path.getmtime(path)
+        if mtime != _floorplan_index['mtime']:
+            with open(path, 'r', encoding='utf-8') as f:
+                layers = json.load(f)['layers']
+            _floorplan_index.update(mtime=mtime, layers=layers, fingerprints={
+                layer['slug']: layer.get('fingerprint') for layer in layers})
+    except (OSError, ValueError, KeyError):
+        _floorplan_index.update(mtime=None, layers=[], fingerprints={})
+    return _floorplan_index
+
+
+@app.route('/api/floorplans')
+def api_floorplans():
+    """Floor-plan tile layers: slug, property, bounds [w, s, e, n], minzoom, maxzoom, fingerprint."""
+    return jsonify(_floorplan_layers()['layers'])
+
+
+@app.route('/tiles/floorplans/<slug>/<int:z>/<int:x>/<int:y>.png')
+@limiter.limit("600 per minute")
+def tiles_floorplans(slug, z, x, y):
+    if not FLOORPLAN_SLUG_PATTERN.match(slug):
+        return jsonify({'error': 'Invalid floor plan'}), 400
+    if x >= 2 ** z or y >= 2 ** z:
+        return jsonify({'error': 'Tile out of range'}), 400
+    # 404 outside the rendered area; send_from_directory adds ETag/Last-Modified
+    # and answers conditional requests with 304
+    resp = send_from_directory(FLOORPLAN_TILES_DIR, f'{slug}/{z}/{x}/{y}.png',
+                               mimetype='image/png')
+    # Only a URL versioned with the layer's current fingerprint may be cached
+    # for long; anything else is revalidated so a re-render shows up at once
+    current = _floorplan_layers()['fingerprints'].get(slug)
+    if current and request.args.get('v') == current:
+        resp.headers['Cache-Control'] = f'public, max-age={FLOORPLAN_TILE_MAX_AGE}, immutable'
+    else:
+        resp.headers['Cache-Control'] = 'public, no-cache'
+    return resp
+
+
 @app.route('/api/route/<start_id>/<end_id>')
 def api_route(start_id, end_id):
     if not validate_poi_id(start_id) or not validate_poi_id(end_id):
@@ -622,12 +846,8 @@ def api_navigate():
     else:
         # ─── Different Property ───
         # Get property distance
-        dist_sql = """
-            SELECT distance_meters FROM property_distances
-            WHERE from_property_name = %s AND to_property_name = %s
-        """
-        prop_dist = query(dist_sql, (start_property, end_property), fetchone=True)
-        inter_property_dist = float(prop_dist['distance_meters']) if prop_dist else 1000
+        prop_dist = catalog.get_snapshot().index('property_matrix').distance(start_property, end_property)
+        inter_property_dist = prop_dist if prop_dist is not None else 1000
 
         # Find nearest entrances
         start_entrance_sql = """
@@ -888,14 +1108,29 @@ def api_navigate():
 
 @app.route('/api/property-distances')
 def api_property_distances():
-    sql = """
-        SELECT from_property_name, to_property_name,
-               ROUND(distance_meters::numeric) AS distance_meters,
-               CASE WHEN distance_meters <= %s THEN 'walk' ELSE 'rideshare' END AS mode
-        FROM property_distances
-        ORDER BY distance_meters
-    """
-    return jsonify(query(sql, (WALK_THRESHOLD_METERS,)))
+    matrix = catalog.get_snapshot().index('property_matrix')
+    from_name = request.args.get('from')
+    if not from_name:
+        return jsonify(matrix.pairs())
+
+    try:
+        max_meters = float(request.args.get('max_meters', 'inf'))
+    except ValueError:
+        return jsonify({'error': 'max_meters must be a number'}), 400
+
+    nearby = matrix.within(from_name, max_meters)
+    if nearby is None:
+        return jsonify({'error': 'Property not found'}), 404
+    modes = matrix.modes(from_name)
+    return jsonify([
+        {
+            'from_property_name': from_name,
+            'to_property_name': name,
+            'distance_meters': int(round(meters)),
+            'mode': str(modes[matrix.index[name]]),
+        }
+        for name, meters in nearby
+    ])
 
 
 if __name__ == '__main__':
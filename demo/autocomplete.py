@@ -0,0 +1,120 @@
+"""As-you-type name completion for POIs and properties.
+
+Every word start of every name ("Bazaar Meat" -> "bazaar meat", "meat") is a
+key in a sorted array, so the completions of a prefix are the contiguous
+slice found by two bisects. Entries are ranked once at build time by
+popularity, which makes picking the top results a matter of taking the
+smallest ranks in the slice. Short prefixes match a large share of the
+catalog, so their top results are precomputed. One array is kept per
+category filter; properties live under the pseudo-category 'property'.
+"""
+
+import bisect
+import heapq
+import math
+
+from config import AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_PRECOMPUTED_PREFIX
+import catalog
+from db import query
+from search import normalize
+
+PROPERTIES_SQL = "SELECT id, name, area FROM properties ORDER BY id"
+
+# Upper bound on the key range; no normalized key contains this character
+_KEY_END = '￿'
+
+
+def popularity(poi):
+    """Heuristic popularity of a POI from its ratings and tags."""
+    score = 0.0
+    ratings = poi.get('ratings') or {}
+    if 'michelin' in ratings:
+        score += 3 * (ratings['michelin'].get('stars') or 1)
+    if 'aaa' in ratings:
+        score += ratings['aaa'].get('diamonds') or 1
+    if 'forbes' in ratings:
+        score += ratings['forbes'].get('stars') or 1
+    if 'opentable' in ratings:
+        score += math.log10(1 + (ratings['opentable'].get('count') or 0))
+    tags = poi.get('tags') or []
+    if 'recommended' in tags:
+        score += 2
+    if 'iconic' in tags or 'signature' in tags:
+        score += 1
+    return score
+
+
+def _word_starts(name):
+    """Normalized suffixes of name that begin at a word boundary."""
+    words = normalize(name).split()
+    return {' '.join(words[i:]) for i in range(len(words))}
+
+
+class _Completions:
+    """Sorted keys for one category filter with the rank of each key's entry."""
+
+    def __init__(self, keyed):
+        keyed.sort()
+        self.keys = [k for k, _ in keyed]
+        self.ranks = [r for _, r in keyed]
+        self.top = {}
+        for key, _ in keyed:
+            for n in range(1, min(len(key), AUTOCOMPLETE_PRECOMPUTED_PREFIX) + 1):
+                prefix = key[:n]
+                if prefix not in self.top:
+                    self.top[prefix] = self._scan(prefix, AUTOCOMPLETE_LIMIT)
+
+    def _scan(self, prefix, limit):
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + _KEY_END, lo)
+        # One entry can match through several of its word starts
+        return heapq.nsmallest(limit, set(self.ranks[lo:hi]))
+
+    def complete(self, prefix, limit):
+        if len(prefix) <= AUTOCOMPLETE_PRECOMPUTED_PREFIX and limit <= AUTOCOMPLETE_LIMIT:
+            return self.top.get(prefix, [])[:limit]
+        return self._scan(prefix, limit)
+
+
+class AutocompleteIndex:
+    def __init__(self, pois, properties):
+        poi_counts = {}
+        candidates = []
+        for poi in pois:
+            if poi['is_closed']:
+                continue
+            poi_counts[poi['casino_property']] = poi_counts.get(poi['casino_property'], 0) + 1
+            candidates.append((popularity(poi), {
+                'type': 'poi', 'id': poi['id'], 'name': poi['name'],
+                'category': poi['category'], 'casino_property': poi['casino_property'],
+            }))
+        for prop in properties:
+            # Properties are what people navigate between; rank them by how much they hold
+            candidates.append((2 + math.log2(1 + poi_counts.get(prop['name'], 0)), {
+                'type': 'property', 'id': prop['id'], 'name': prop['name'],
+                'category': 'property', 'area': prop['area'],
+            }))
+
+        candidates.sort(key=lambda c: (-c[0], c[1]['name'], str(c[1]['id'])))
+        self.entries = [entry for _, entry in candidates]
+
+        keyed = {None: []}
+        for rank, entry in enumerate(self.entries):
+            for key in _word_starts(entry['name']):
+                keyed[None].append((key, rank))
+                keyed.setdefault(entry['category'], []).append((key, rank))
+        self.completions = {category: _Completions(k) for category, k in keyed.items()}
+
+    def complete(self, prefix, category=None, limit=AUTOCOMPLETE_LIMIT):
+        """Top `limit` entries whose name has a word starting with prefix."""
+        prefix = normalize(prefix)
+        completions = self.completions.get(category)
+        if not prefix or completions is None:
+            return []
+        return [self.entries[rank] for rank in completions.complete(prefix, limit)]
+
+
+catalog.register_index(
+    'autocomplete',
+    lambda snapshot, previous: AutocompleteIndex(snapshot.pois, query(PROPERTIES_SQL)),
+)
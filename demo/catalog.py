@@ -0,0 +1,127 @@
+"""In-process snapshot of the POI catalog shared by the in-memory indexes.
+
+The whole `pois` table is small enough to hold in memory. A snapshot is
+reloaded only when the data version (row count + latest updated_at of pois
+and of properties) changes, which is checked at most every
+CATALOG_REFRESH_SECONDS. Indexes registered with register_index() are built
+against a new snapshot before it is published, so a rebuild is an atomic
+reference swap and readers never see a half-built index.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+
+from config import CATALOG_REFRESH_SECONDS
+from db import query
+
+logger = logging.getLogger(__name__)
+
+CATALOG_SQL = """
+    SELECT id, name, category::text, subcategory::text, casino_property,
+           ST_Y(location::geometry) AS lat, ST_X(location::geometry) AS lng,
+           description, cuisine, features, chef, price_range::text,
+           hours, ratings, phone, website, area, dress_code,
+           average_per_person, level, tags, is_closed
+    FROM pois
+    ORDER BY casino_property, name
+"""
+
+VERSION_SQL = """
+    SELECT (SELECT COUNT(*) FROM pois) AS count,
+           (SELECT MAX(updated_at) FROM pois) AS updated_at,
+           (SELECT COUNT(*) FROM properties) AS property_count,
+           (SELECT MAX(updated_at) FROM properties) AS property_updated_at
+"""
+
+# name -> builder(snapshot, previous_index) registered by index modules
+_builders = {}
+
+_snapshot = None
+_checked_at = 0.0
+_refresh_lock = threading.Lock()
+
+
+class Snapshot:
+    """Immutable view of the catalog plus the indexes built from it."""
+
+    def __init__(self, version, pois):
+        self.version = version
+        self.version_tag = version_tag(version)
+        self.pois = pois
+        self.by_id = {p['id']: p for p in pois}
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def index(self, name):
+        """Return the named index, building it on first use."""
+        idx = self._indexes.get(name)
+        if idx is None:
+            with self._lock:
+                idx = self._indexes.get(name)
+                if idx is None:
+                    idx = _builders[name](self, None)
+                    self._indexes[name] = idx
+        return idx
+
+    def build_indexes(self, previous=None):
+        """Eagerly build every registered index, reusing `previous` where a builder can."""
+        for name, builder in _builders.items():
+            prev_idx = previous._indexes.get(name) if previous else None
+            self._indexes[name] = builder(self, prev_idx)
+
+
+def register_index(name, builder):
+    """Register an index builder: builder(snapshot, previous_index) -> index."""
+    _builders[name] = builder
+
+
+def _version_key(row):
+    return (row['count'], str(row['updated_at']),
+            row['property_count'], str(row['property_updated_at']))
+
+
+def version_tag(version):
+    """Short tag for a data version; accepts a version key or a row with VERSION_SQL's columns."""
+    if isinstance(version, dict):
+        version = _version_key(version)
+    return hashlib.md5(repr(version).encode()).hexdigest()[:12]
+
+
+def _refresh():
+    global _snapshot, _checked_at
+    _checked_at = time.monotonic()
+    version = _version_key(query(VERSION_SQL, fetchone=True))
+    if _snapshot is not None and version == _snapshot.version:
+        return
+
+    started = time.perf_counter()
+    snapshot = Snapshot(version, query(CATALOG_SQL))
+    snapshot.build_indexes(previous=_snapshot)
+    _snapshot = snapshot
+    logger.info(f"Catalog loaded: {len(snapshot.pois)} POIs, "
+                f"{len(_builders)} indexes in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+def get_snapshot():
+    """Return the current catalog snapshot, reloading it if the data changed.
+
+    If the database is unreachable after a snapshot has been loaded, the
+    stale snapshot keeps being served.
+    """
+    if _snapshot is not None and time.monotonic() - _checked_at < CATALOG_REFRESH_SECONDS:
+        return _snapshot
+
+    # Only one thread refreshes; the others keep using the current snapshot
+    if _refresh_lock.acquire(blocking=_snapshot is None):
+        try:
+            if _snapshot is None or time.monotonic() - _checked_at >= CATALOG_REFRESH_SECONDS:
+                _refresh()
+        except Exception as e:
+            if _snapshot is None:
+                raise
+            logger.warning(f"Catalog refresh failed, serving stale snapshot: {e}")
+        finally:
+            _refresh_lock.release()
+    return _snapshot
@@ -0,0 +1,174 @@
+"""Hierarchical marker clustering of POIs for map viewports.
+
+Supercluster-style: POIs are projected to Web Mercator and greedily merged
+zoom by zoom, from MAP_CONFIG max_zoom down to min_zoom, with each level
+clustering the clusters of the level above. Every level is stored sorted by
+x so a viewport query is a bisect plus a scan of the visible slice.
+"""
+
+import bisect
+import math
+
+from config import MAP_CONFIG, CLUSTER_RADIUS_PX, CLUSTER_TILE_EXTENT
+import catalog
+
+
+def project(lat, lng):
+    """Project lat/lng to Web Mercator unit square coordinates (x, y in 0..1)."""
+    sin = math.sin(math.radians(lat))
+    y = 0.5 - 0.25 * math.log((1 + sin) / (1 - sin)) / math.pi
+    return (lng / 360 + 0.5, min(max(y, 0.0), 1.0))
+
+
+def unproject(x, y):
+    """Inverse of project()."""
+    lat = math.degrees(2 * math.atan(math.exp((1 - 2 * y) * math.pi)) - math.pi / 2)
+    return lat, (x - 0.5) * 360
+
+
+class _Node:
+    __slots__ = ('x', 'y', 'count', 'categories', 'poi', 'children', 'cluster_id', 'expansion_zoom')
+
+    def __init__(self, x, y, count, categories, poi=None, children=None):
+        self.x = x
+        self.y = y
+        self.count = count
+        self.categories = categories
+        self.poi = poi
+        self.children = children
+        self.cluster_id = None
+        self.expansion_zoom = None
+
+
+class _Level:
+    """Nodes of one zoom level, sorted by x for viewport range scans."""
+
+    def __init__(self, nodes):
+        self.nodes = sorted(nodes, key=lambda n: n.x)
+        self.xs = [n.x for n in self.nodes]
+
+    def in_box(self, min_x, min_y, max_x, max_y):
+        lo = bisect.bisect_left(self.xs, min_x)
+        hi = bisect.bisect_right(self.xs, max_x)
+        return [n for n in self.nodes[lo:hi] if min_y <= n.y <= max_y]
+
+
+def _cluster(nodes, radius):
+    """Greedily merge nodes within `radius` (unit-square distance) of each other."""
+    grid = {}
+    for i, node in enumerate(nodes):
+        grid.setdefault((int(node.x // radius), int(node.y // radius)), []).append(i)
+
+    merged = [False] * len(nodes)
+    clusters = []
+    r2 = radius * radius
+    for i, node in enumerate(nodes):
+        if merged[i]:
+            continue
+        merged[i] = True
+        members = [node]
+        cx, cy = int(node.x // radius), int(node.y // radius)
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for j in grid.get((gx, gy), ()):
+                    if merged[j]:
+                        continue
+                    other = nodes[j]
+                    if (other.x - node.x) ** 2 + (other.y - node.y) ** 2 <= r2:
+                        merged[j] = True
+                        members.append(other)
+
+        if len(members) == 1:
+            clusters.append(node)
+            continue
+
+        count = sum(m.count for m in members)
+        categories = {}
+        for m in members:
+            for cat, n in m.categories.items():
+                categories[cat] = categories.get(cat, 0) + n
+        clusters.append(_Node(
+            sum(m.x * m.count for m in members) / count,
+            sum(m.y * m.count for m in members) / count,
+            count, categories, children=members,
+        ))
+    return clusters
+
+
+class ClusterIndex:
+    """Precomputed clusters for every zoom between min_zoom and max_zoom."""
+
+    def __init__(self, pois, min_zoom=MAP_CONFIG['min_zoom'], max_zoom=MAP_CONFIG['max_zoom'],
+                 radius_px=CLUSTER_RADIUS_PX, extent=CLUSTER_TILE_EXTENT):
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.clusters = {}
+        self.levels = {}
+
+        nodes = []
+        for poi in pois:
+            if poi['lat'] is None or poi['lng'] is None:
+                continue
+            x, y = project(float(poi['lat']), float(poi['lng']))
+            nodes.append(_Node(x, y, 1, {poi['category']: 1}, poi=poi))
+        # Deterministic greedy order regardless of catalog ordering
+        nodes.sort(key=lambda n: n.poi['id'])
+
+        for zoom in range(max_zoom, min_zoom - 1, -1):
+            nodes = _cluster(nodes, radius_px / (extent * 2 ** zoom))
+            for node in nodes:
+                if node.children is not None and node.cluster_id is None:
+                    node.cluster_id = len(self.clusters) + 1
+                    node.expansion_zoom = zoom + 1
+                    self.clusters[node.cluster_id] = node
+            self.levels[zoom] = _Level(nodes)
+
+    def get_clusters(self, west, south, east, north, zoom):
+        """Clusters and single POIs visible in the bbox at the given zoom."""
+        zoom = min(max(int(zoom), self.min_zoom), self.max_zoom)
+        min_x, max_y = project(south, west)
+        max_x, min_y = project(north, east)
+        return [self._feature(n) for n in self.levels[zoom].in_box(min_x, min_y, max_x, max_y)]
+
+    def get_leaves(self, cluster_id):
+        """All POIs inside a cluster, or None for an unknown id."""
+        node = self.clusters.get(cluster_id)
+        if node is None:
+            return None
+        leaves, stack = [], [node]
+        while stack:
+            n = stack.pop()
+            if n.children is None:
+                leaves.append(n.poi)
+            else:
+                stack.extend(n.children)
+        return sorted(leaves, key=lambda p: p['name'])
+
+    @staticmethod
+    def _feature(node):
+        lat, lng = unproject(node.x, node.y)
+        if node.children is None:
+            poi = node.poi
+            return {
+                'type': 'poi', 'id': poi['id'], 'name': poi['name'],
+                'category': poi['category'], 'casino_property': poi['casino_property'],
+                'lat': float(poi['lat']), 'lng': float(poi['lng']), 'count': 1,
+            }
+        return {
+            'type': 'cluster', 'cluster_id': node.cluster_id,
+            'lat': round(lat, 6), 'lng': round(lng, 6),
+            'count': node.count, 'categories': node.categories,
+            'expansion_zoom': node.expansion_zoom,
+        }
+
+
+def build_cluster_indexes(snapshot, previous=None):
+    """One ClusterIndex for all open POIs plus one per category."""
+    open_pois = [p for p in snapshot.pois if not p['is_closed']]
+    indexes = {None: ClusterIndex(open_pois)}
+    for category in sorted({p['category'] for p in open_pois}):
+        indexes[category] = ClusterIndex([p for p in open_pois if p['category'] == category])
+    return indexes
+
+
+catalog.register_index('clusters', build_cluster_indexes)
@@ -41,7 +41,66 @@ RIDESHARE_AVG_SPEED_MPH = 15  # Las Vegas Strip average
 
 # Google Maps Directions API
 GOOGLE_MAPS_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY', '')
-GOOGLE_DIRECTIONS_BASE_URL = 'https://maps.googleapis.com/maps/api/directions/json'
-DIRECTIONS_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.directions_cache')
+# Point GOOGLE_DIRECTIONS_BASE_URL at fake_directions.py for offline runs and load tests
+GOOGLE_DIRECTIONS_BASE_URL = os.getenv(
+    'GOOGLE_DIRECTIONS_BASE_URL', 'https://maps.googleapis.com/maps/api/directions/json'
+)
+DIRECTIONS_CACHE_DIR = os.getenv(
+    'DIRECTIONS_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.directions_cache')
+)
 DIRECTIONS_CACHE_TTL_DAYS = 30
-GOOGLE_API_TIMEOUT = 5
+GOOGLE_API_TIMEOUT = float(os.getenv('GOOGLE_API_TIMEOUT', '5'))
+
+# In-memory POI catalog (see catalog.py)
+CATALOG_REFRESH_SECONDS = int(os.getenv('CATALOG_REFRESH_SECONDS', '30'))
+NEARBY_GRID_CELL_DEGREES = 0.005  # ~550 m of latitude per grid cell
+
+# Server-side marker clustering (see clustering.py)
+CLUSTER_RADIUS_PX = 60
+CLUSTER_TILE_EXTENT = 256
+
+# POI vector tiles (see vector_tiles.py)
+TILE_CACHE_DIR = os.getenv(
+    'TILE_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.tile_cache')
+)
+TILE_CACHE_VERSIONS = 3  # newest version dirs kept; workers may briefly serve different versions
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+TILE_MAX_ZOOM = 22
+
+# Floor-plan raster tiles (rendered offline by scripts/render_floorplan_tiles.py)
+FLOORPLAN_TILES_DIR = os.getenv('FLOORPLAN_TILES_DIR', os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'build', 'floorplan_tiles'))
+FLOORPLAN_TILE_MAX_AGE = 30 * 24 * 3600  # for URLs carrying the layer's current fingerprint (?v=)
+
+# POI search (see search.py)
+SEARCH_FIELD_WEIGHTS = {
+    'name': 1.0,
+    'chef': 0.8,
+    'casino_property': 0.6,
+    'cuisine': 0.5,
+    'tags': 0.4,
+}
+SEARCH_MIN_SIMILARITY = 0.3
+SEARCH_DISTANCE_WEIGHT = 0.3  # share of the score that decays with distance
+SEARCH_DISTANCE_SCALE_METERS = 1000
+
+# Name autocomplete (see autocomplete.py)
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_PRECOMPUTED_PREFIX = 3  # prefixes up to this length have cached top results
+
+# Opening hours (see opening_hours.py)
+LOCAL_TIMEZONE = 'America/Los_Angeles'
+SEATING_DURATION_MINUTES = 150  # "5:30 PM & 8:30 PM seatings" count as open this long after each
+
+# Property geofencing (see geofence.py); both files are written by scripts/osm_ingest.py
+PROPERTY_FOOTPRINTS_PATH = os.getenv('PROPERTY_FOOTPRINTS_PATH', os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'maps', 'property_footprints.geojson'))
+PROPERTIES_PATH = os.getenv('PROPERTIES_PATH', os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'maps', 'properties.json'))
+STRTREE_NODE_CAPACITY = 8
@@ -0,0 +1,89 @@
+"""Faceted filtering of open POIs with per-value bitsets.
+
+Each open POI gets a bit position in catalog order (casino_property, name,
+the same order /api/pois uses). For every facet value there is one Python
+int with the bits of the POIs carrying it, so a query is an OR across the
+selected values of a facet and an AND across facets, and a facet count is a
+popcount. Counts are disjunctive: each facet is counted against the filters
+of the other facets only, so choosing one cuisine still shows how many POIs
+the other cuisines would add.
+"""
+
+import catalog
+
+# facet -> True if the POI column is a list of values
+FACETS = {
+    'category': False,
+    'price_range': False,
+    'cuisine': True,
+    'features': True,
+    'tags': True,
+    'casino_property': False,
+    'area': False,
+}
+
+
+class FacetIndex:
+    def __init__(self, pois):
+        self.pois = [p for p in pois if not p['is_closed']]
+        self.all = (1 << len(self.pois)) - 1
+        self.bitsets = {facet: {} for facet in FACETS}
+
+        for bit, poi in enumerate(self.pois):
+            for facet, multi in FACETS.items():
+                values = (poi[facet] or []) if multi else [poi[facet]]
+                bitsets = self.bitsets[facet]
+                for value in values:
+                    if value is not None:
+                        bitsets[value] = bitsets.get(value, 0) | (1 << bit)
+
+    def _facet_mask(self, facet, values):
+        mask = 0
+        for value in values:
+            mask |= self.bitsets[facet].get(value, 0)
+        return mask
+
+    def query(self, filters, offset=0, limit=50):
+        """Apply {facet: [values]} filters; return one page plus facet counts."""
+        masks = {facet: self._facet_mask(facet, values) for facet, values in filters.items() if values}
+
+        matched = self.all
+        for mask in masks.values():
+            matched &= mask
+
+        facet_counts = {}
+        for facet, bitsets in self.bitsets.items():
+            others = self.all
+            for other, mask in masks.items():
+                if other != facet:
+                    others &= mask
+            counts = {}
+            for value, bits in bitsets.items():
+                n = (bits & others).bit_count()
+                if n:
+                    counts[value] = n
+            facet_counts[facet] = dict(sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])))
+
+        return {
+            'total': matched.bit_count(),
+            'offset': offset,
+            'limit': limit,
+            'results': self._page(matched, offset, limit),
+            'facets': facet_counts,
+        }
+
+    def _page(self, mask, offset, limit):
+        rows = []
+        skipped = 0
+        while mask and len(rows) < limit:
+            low = mask & -mask
+            mask ^= low
+            if skipped < offset:
+                skipped += 1
+                continue
+            poi = self.pois[low.bit_length() - 1]
+            rows.append({k: v for k, v in poi.items() if k != 'is_closed'})
+        return rows
+
+
+catalog.register_index('facets', lambda snapshot, previous: FacetIndex(snapshot.pois))
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Google Directions API.
+
+Serves Directions-shaped JSON (encoded polylines, steps, distances, durations)
+synthesized from street-grid geometry between origin and destination, or
+replayed from recorded fixtures. Latency, error rates and status codes are
+configurable so caching and timeout behaviour in google_directions.py can be
+exercised offline and benchmarked deterministically.
+
+Usage:
+    python fake_directions.py --port 8765
+    python fake_directions.py --latency-ms 80 --jitter-ms 40 --seed 1
+    python fake_directions.py --error-rate 0.1 --error-status OVER_QUERY_LIMIT
+    python fake_directions.py --status ZERO_RESULTS
+    python fake_directions.py --fixtures recorded/
+
+Then point the app at it:
+    GOOGLE_MAPS_API_KEY=fake \\
+    GOOGLE_DIRECTIONS_BASE_URL=http://127.0.0.1:8765/maps/api/directions/json \\
+    python app.py
+
+GET /stats returns request counters as JSON.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(__file__))
+from google_directions import encode_polyline
+
+# Travel speeds used to synthesize durations (meters per second)
+MODE_SPEEDS = {
+    'walking': 1.4,
+    'driving': 6.7,  # ~15 mph, Las Vegas Strip average
+}
+# Extra seconds per step for driving (lights, turns)
+DRIVING_STEP_PENALTY = 20
+# Spacing of intermediate polyline points along each step
+POLYLINE_SPACING_METERS = 25
+# Legs shorter than this are folded into the neighbouring step
+MIN_STEP_METERS = 5
+
+STATUSES = ('OK', 'ZERO_RESULTS', 'OVER_QUERY_LIMIT', 'REQUEST_DENIED',
+            'INVALID_REQUEST', 'NOT_FOUND', 'UNKNOWN_ERROR')
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """Calculate distance in meters between two lat/lng points."""
+    R = 6371000
+    lat1, lng1, lat2, lng2 = map(math.radians, [lat1, lng1, lat2, lng2])
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng/2)**2
+    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _heading(a, b):
+    """Cardinal heading of a street-grid segment."""
+    if abs(b['lat'] - a['lat']) >= abs(b['lng'] - a['lng']):
+        return 'north' if b['lat'] > a['lat'] else 'south'
+    return 'east' if b['lng'] > a['lng'] else 'west'
+
+
+def _turn(prev_heading, heading):
+    order = ['north', 'east', 'south', 'west']
+    diff = (order.index(heading) - order.index(prev_heading)) % 4
+    return {1: 'right', 3: 'left'}.get(diff)
+
+
+def _interpolate(a, b, spacing=POLYLINE_SPACING_METERS):
+    """Points from a to b (inclusive) roughly `spacing` meters apart."""
+    n = max(1, int(haversine(a['lat'], a['lng'], b['lat'], b['lng']) // spacing))
+    return [{'lat': a['lat'] + (b['lat'] - a['lat']) * i / n,
+             'lng': a['lng'] + (b['lng'] - a['lng']) * i / n}
+            for i in range(n + 1)]
+
+
+def fixture_key(origin, destination, mode):
+    """File stem used for recorded fixtures, matching the app's 5-decimal rounding."""
+    return '{}_{:.5f}_{:.5f}_{:.5f}_{:.5f}'.format(
+        mode, origin[0], origin[1], destination[0], destination[1])
+
+
+def synthesize_route(origin, destination, mode='walking'):
+    """Build a Directions API route following the street grid (north-south, then east-west)."""
+    start = {'lat': origin[0], 'lng': origin[1]}
+    end = {'lat': destination[0], 'lng': destination[1]}
+    corner = {'lat': end['lat'], 'lng': start['lng']}
+
+    corners = [start]
+    for point in (corner, end):
+        if haversine(corners[-1]['lat'], corners[-1]['lng'], point['lat'], point['lng']) >= MIN_STEP_METERS:
+            corners.append(point)
+    if len(corners) == 1:
+        corners.append(end)
+
+    speed = MODE_SPEEDS.get(mode, MODE_SPEEDS['walking'])
+    steps = []
+    prev_heading = None
+    for a, b in zip(corners, corners[1:]):
+        heading = _heading(a, b)
+        dist = haversine(a['lat'], a['lng'], b['lat'], b['lng'])
+        duration = dist / speed
+        if mode == 'driving':
+            duration += DRIVING_STEP_PENALTY
+
+        turn = _turn(prev_heading, heading) if prev_heading else None
+        if turn:
+            instruction = f'Turn <b>{turn}</b> to head <b>{heading}</b>'
+        else:
+            instruction = f'Head <b>{heading}</b>'
+
+        steps.append({
+            'html_instructions': instruction,
+            'distance': {'text': f'{round(dist)} m', 'value': round(dist)},
+            'duration': {'text': f'{max(1, round(duration / 60))} mins', 'value': round(duration)},
+            'start_location': dict(a),
+            'end_location': dict(b),
+            'polyline': {'points': encode_polyline(_interpolate(a, b))},
+            'travel_mode': mode.upper(),
+        })
+        prev_heading = heading
+
+    total_dist = sum(s['distance']['value'] for s in steps)
+    total_time = sum(s['duration']['value'] for s in steps)
+    return {
+        'summary': 'Las Vegas Blvd S',
+        'legs': [{
+            'distance': {'text': f'{total_dist} m', 'value': total_dist},
+            'duration': {'text': f'{max(1, round(total_time / 60))} mins', 'value': total_time},
+            'start_location': start,
+            'end_location': end,
+            'steps': steps,
+        }],
+        'overview_polyline': {'points': encode_polyline(corners)},
+        'warnings': [],
+    }
+
+
+class FakeDirections:
+    """Response policy and counters shared by all handler threads."""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0,
+                 error_status='OVER_QUERY_LIMIT', status=None,
+                 http_error_rate=0.0, fixtures_dir=None, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.status = status
+        self.http_error_rate = http_error_rate
+        self.fixtures_dir = fixtures_dir
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'fixture_hits': 0, 'http_errors': 0, 'by_status': {}}
+
+    def _roll(self):
+        with self._lock:
+            return self._rng.random(), self._rng.random(), self._rng.random()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _count_status(self, status):
+        with self._lock:
+            self.stats['by_status'][status] = self.stats['by_status'].get(status, 0) + 1
+
+    def snapshot_stats(self):
+        with self._lock:
+            return json.loads(json.dumps(self.stats))
+
+    def _load_fixture(self, origin, destination, mode):
+        if not self.fixtures_dir:
+            return None
+        path = os.path.join(self.fixtures_dir, fixture_key(origin, destination, mode) + '.json')
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def respond(self, params):
+        """Return (http_status, body) for a directions query."""
+        self._count('requests')
+        jitter_roll, http_roll, error_roll = self._roll()
+
+        delay = self.latency_ms + (2 * jitter_roll - 1) * self.jitter_ms
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if http_roll < self.http_error_rate:
+            self._count('http_errors')
+            return 503, {'error_message': 'Injected HTTP error'}
+
+        def status_only(status, message=''):
+            self._count_status(status)
+            body = {'routes': [], 'status': status}
+            if message:
+                body['error_message'] = message
+            return 200, body
+
+        if not params.get('key'):
+            return status_only('REQUEST_DENIED', 'The provided API key is invalid.')
+        if self.status and self.status != 'OK':
+            return status_only(self.status)
+        if error_roll < self.error_rate:
+            return status_only(self.error_status)
+
+        try:
+            origin = tuple(float(v) for v in params['origin'].split(','))
+            destination = tuple(float(v) for v in params['destination'].split(','))
+            if len(origin) != 2 or len(destination) != 2:
+                raise ValueError
+        except (KeyError, ValueError):
+            return status_only('INVALID_REQUEST', 'Invalid origin or destination.')
+        mode = params.get('mode', 'driving')
+
+        fixture = self._load_fixture(origin, destination, mode)
+        if fixture is not None:
+            self._count('fixture_hits')
+            self._count_status(fixture.get('status', 'OK'))
+            return 200, fixture
+
+        self._count_status('OK')
+        return 200, {
+            'geocoded_waypoints': [],
+            'routes': [synthesize_route(origin, destination, mode)],
+            'status': 'OK',
+        }
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/stats':
+                code, body = 200, fake.snapshot_stats()
+            else:
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                code, body = fake.respond(params)
+
+            payload = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json; charset=UTF-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local fake Google Directions API server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0,
+                        help='Base response latency in milliseconds')
+    parser.add_argument('--jitter-ms', type=float, default=0,
+                        help='Uniform +/- jitter added to the latency')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with --error-status')
+    parser.add_argument('--error-status', choices=STATUSES[1:], default='OVER_QUERY_LIMIT')
+    parser.add_argument('--status', choices=STATUSES, default=None,
+                        help='Answer every request with this status')
+    parser.add_argument('--http-error-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with HTTP 503')
+    parser.add_argument('--fixtures', default=None,
+                        help='Directory of recorded responses named <mode>_<olat>_<olng>_<dlat>_<dlng>.json')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Seed for latency jitter and error injection')
+    args = parser.parse_args()
+
+    fake = FakeDirections(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, error_status=args.error_status,
+        status=args.status, http_error_rate=args.http_error_rate,
+        fixtures_dir=args.fixtures, seed=args.seed,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(fake))
+    print(f"Fake Directions API on http://{args.host}:{args.port}/maps/api/directions/json")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+"""In-process stand-in for the PostGIS database, for load tests and offline runs.
+
+install() replaces db.query / db.query_all with a fixture seeded from the
+repository instead of a connection pool:
+
+- pois: every file under data/pois, parsed and validated by the importer's
+  own poi_row() (scripts/import_pois.py), so the rows match what an import
+  would write.
+- properties: data/maps/properties.json, plus any casino_property that only
+  appears in the POIs (located at the centroid of its POIs).
+- navigation_nodes / synthetic_routes: a seeded graph per property (main and
+  rideshare entrances, junctions, elevators, stairs) and routes between POIs
+  of the same property along it.
+
+Each SQL statement the app issues is answered by a handler matched on its
+text; the handler returns whole rows and the SELECT list picks the columns.
+A statement without a handler raises FixtureQueryError instead of being
+silently faked; the load test stops the app on it, so a new query fails the
+run. install() must run before app (or any module doing `from db import
+query`) is imported.
+"""
+
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+
+import db
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(PROJECT_ROOT, 'scripts')
+
+NODES_PER_PROPERTY = 12     # junctions, elevators and stairs around the POIs' centroid
+ROUTES_PER_PROPERTY = 200   # POI pairs with a stored synthetic route
+NODE_TYPES = ['junction'] * 8 + ['elevator'] * 2 + ['stairs'] * 2
+WALK_SPEED_MPS = 1.4
+UPDATED_AT = '2025-01-01 00:00:00'
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """Calculate distance in meters between two lat/lng points."""
+    R = 6371000
+    lat1, lng1, lat2, lng2 = map(math.radians, [lat1, lng1, lat2, lng2])
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng / 2) ** 2
+    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _offset(lat, lng, north_m, east_m):
+    return (lat + north_m / 110540, lng + east_m / (111320 * math.cos(math.radians(lat))))
+
+
+class FixtureQueryError(Exception):
+    """A SQL statement the fixture has no handler for."""
+
+
+class FixtureDB:
+    """The pois, properties, navigation_nodes and synthetic_routes tables as lists of dicts."""
+
+    def __init__(self, seed=0, latency_ms=0.0):
+        self.latency = latency_ms / 1000
+        self.statements = {}  # handler name -> calls
+        rng = random.Random(seed)
+        self.pois = self._load_pois()
+        self.poi_by_id = {p['id']: p for p in self.pois}
+        self.properties = self._load_properties()
+        self.property_by_name = {p['name']: p for p in self.properties}
+        self.nodes, self.routes = self._build_navigation(rng)
+        self.node_by_id = {n['id']: n for n in self.nodes}
+
+    # ── Seeding ──
+
+    def _load_pois(self):
+        sys.path.insert(0, SCRIPTS_DIR)
+        from import_pois import STAGING_COLUMNS, LOADED, load_poi
+        from manifest import Manifest
+
+        names = [name for name, _ in STAGING_COLUMNS]
+        manifest = Manifest(os.path.join(PROJECT_ROOT, 'data', 'pois'))
+        pois = []
+        for poi_id in sorted(manifest.entries):
+            status, row, _ = load_poi(manifest.abspath(poi_id))
+            if status != LOADED:
+                continue
+            poi = dict(zip(names, row))
+            for column in ('hours', 'ratings', 'special_features', 'size_details'):
+                poi[column] = json.loads(poi[column])
+            poi['updated_at'] = UPDATED_AT
+            pois.append(poi)
+        pois.sort(key=lambda p: (p['casino_property'] or '', p['name']))
+        return pois
+
+    def _load_properties(self):
+        from property_locations import load_properties
+
+        located = load_properties()
+        members = {}
+        for poi in self.pois:
+            if poi['casino_property']:
+                members.setdefault(poi['casino_property'], []).append(poi)
+        properties = []
+        for number, name in enumerate(sorted(set(located) | set(members)), start=1):
+            entry = located.get(name) or {}
+            lat, lng = entry.get('lat'), entry.get('lng')
+            if lat is None:
+                pois = members[name]
+                lat = sum(p['lat'] for p in pois) / len(pois)
+                lng = sum(p['lng'] for p in pois) / len(pois)
+            properties.append({
+                'id': number, 'name': name, 'type': 'casino_resort', 'address': entry.get('address'),
+                'area': entry.get('area'), 'lat': lat, 'lng': lng, 'owner': None,
+                'room_count': None, 'casino_sq_ft': None, 'features': [], 'amenities': [],
+                'updated_at': UPDATED_AT,
+            })
+        return properties
+
+    def _build_navigation(self, rng):
+        nodes, routes = [], []
+        for prop in self.properties:
+            pois = [p for p in self.pois if p['casino_property'] == prop['name']]
+            if not pois:
+                continue
+            center_lat = sum(p['lat'] for p in pois) / len(pois)
+            center_lng = sum(p['lng'] for p in pois) / len(pois)
+
+            def add(node_type, lat, lng, name=None, role=None, level=0):
+                node = {'id': len(nodes) + 1, 'property_id': prop['id'], 'node_type': node_type,
+                        'level': 'ground', 'lat': lat, 'lng': lng, 'indoor_level': level,
+                        'name': name, 'entrance_role': role}
+                nodes.append(node)
+                return node
+
+            add('entrance', *_offset(prop['lat'], prop['lng'], 0, 60), f"{prop['name']} Main Entrance", 'main')
+            add('entrance', *_offset(prop['lat'], prop['lng'], -40, 70),
+                f"{prop['name']} Rideshare Pickup", 'rideshare_pickup')
+            inner = []
+            for k, node_type in enumerate(NODE_TYPES[:NODES_PER_PROPERTY]):
+                angle = 2 * math.pi * k / NODES_PER_PROPERTY
+                radius = rng.uniform(20, 120)
+                lat, lng = _offset(center_lat, center_lng, radius * math.sin(angle), radius * math.cos(angle))
+                inner.append(add(node_type, lat, lng, level=rng.choice((0, 0, 1))))
+
+            pairs = [(a, b) for a in pois for b in pois if a is not b]
+            for start, end in rng.sample(pairs, min(ROUTES_PER_PROPERTY, len(pairs))):
+                path = sorted(inner, key=lambda n: haversine(start['lat'], start['lng'], n['lat'], n['lng']))[:1]
+                path += sorted(inner, key=lambda n: haversine(end['lat'], end['lng'], n['lat'], n['lng']))[:1]
+                points = [start] + path + [end]
+                distance = sum(haversine(a['lat'], a['lng'], b['lat'], b['lng']) for a, b in zip(points, points[1:]))
+                types = {n['node_type'] for n in path}
+                routes.append({
+                    'id': len(routes) + 1, 'property_id': prop['id'],
+                    'start_poi_id': start['id'], 'end_poi_id': end['id'],
+                    'path_nodes': [n['id'] for n in path],
+                    'total_distance_meters': round(distance, 2),
+                    'estimated_time_seconds': int(distance / WALK_SPEED_MPS),
+                    'has_stairs': 'stairs' in types, 'has_elevator': 'elevator' in types,
+                    'accessibility_score': 0.6 if 'stairs' in types else 1.0,
+                })
+        return nodes, {(r['start_poi_id'], r['end_poi_id']): r for r in routes}
+
+    # ── Handlers: params -> whole rows ──
+
+    def health(self, params):
+        return [{'ok': 1}]
+
+    def catalog_version(self, params):
+        return [{'count': len(self.pois), 'updated_at': UPDATED_AT,
+                 'property_count': len(self.properties), 'property_updated_at': UPDATED_AT}]
+
+    def all_pois(self, params):
+        return self.pois
+
+    def open_pois(self, params):
+        category = params[0]
+        return [p for p in self.pois if not p['is_closed'] and (category is None or p['category'] == category)]
+
+    def recommended_pois(self, params):
+        return sorted((p for p in self.pois if not p['is_closed'] and 'recommended' in (p['tags'] or [])),
+                      key=lambda p: p['name'])
+
+    def poi_by_id_one(self, params):
+        poi = self.poi_by_id.get(params[0])
+        return [poi] if poi else []
+
+    def pois_in(self, params):
+        return [self.poi_by_id[i] for i in params if i in self.poi_by_id]
+
+    def poi_distance(self, params):
+        a, b = self.poi_by_id.get(params[0]), self.poi_by_id.get(params[1])
+        return [{'dist': haversine(a['lat'], a['lng'], b['lat'], b['lng']) if a and b else None}]
+
+    def all_properties(self, params):
+        return self.properties
+
+    def route(self, params):
+        route = self.routes.get((params[0], params[1]))
+        return [route] if route else []
+
+    def nodes_in_property(self, params):
+        ids, property_id = set(params[0]), params[1]
+        return [self.node_by_id[i] for i in ids if i in self.node_by_id
+                and self.node_by_id[i]['property_id'] == property_id]
+
+    def nodes_in(self, params):
+        return [self.node_by_id[i] for i in set(params[0]) if i in self.node_by_id]
+
+    def node_by_id_one(self, params):
+        node = self.node_by_id.get(params[0])
+        return [node] if node else []
+
+    def entrances(self, params):
+        return [n for n in self.nodes if n['node_type'] == 'entrance']
+
+    def nearest_path_nodes(self, params):
+        property_name, exclude_id, lng, lat = params
+        prop = self.property_by_name.get(property_name)
+        candidates = [n for n in self.nodes if prop and n['property_id'] == prop['id'] and n['id'] != exclude_id
+                      and n['node_type'] in ('junction', 'elevator', 'stairs')]
+        return sorted(candidates, key=lambda n: haversine(lat, lng, n['lat'], n['lng']))[:3]
+
+    def nearest_entrance(self, params):
+        poi, role = self.poi_by_id.get(params[0]), params[1]
+        prop = self.property_by_name.get(poi['casino_property']) if poi else None
+        if not prop:
+            return []
+        candidates = [n for n in self.nodes if n['property_id'] == prop['id'] and n['node_type'] == 'entrance'
+                      and (role == 'main' or n['entrance_role'] == role)]
+        rows = [{'node_id': n['id'], 'node_name': n['name'], 'node_lat': n['lat'], 'node_lng': n['lng'],
+                 'distance_meters': haversine(poi['lat'], poi['lng'], n['lat'], n['lng'])} for n in candidates]
+        return sorted(rows, key=lambda r: r['distance_meters'])[:1]
+
+    # ── Dispatch ──
+
+    # (regex on the whitespace-normalized statement, handler name); first match wins
+    HANDLERS = [
+        (r'^SELECT 1 AS ok$', 'health'),
+        (r'COUNT\(\*\) FROM pois', 'catalog_version'),
+        (r'FROM pois WHERE \(%s IS NULL OR category', 'open_pois'),
+        (r"FROM pois WHERE tags @> ARRAY\['recommended'\]", 'recommended_pois'),
+        (r'FROM pois ORDER BY casino_property, name$', 'all_pois'),
+        (r'FROM pois WHERE id = %s$', 'poi_by_id_one'),
+        (r'FROM pois WHERE id IN \(%s, %s\)$', 'pois_in'),
+        (r'calculate_poi_distance\(%s, %s\)', 'poi_distance'),
+        (r'FROM find_nearest_entrance\(%s, %s\)$', 'nearest_entrance'),
+        (r'FROM synthetic_routes( sr)? WHERE (sr\.)?start_poi_id = %s AND (sr\.)?end_poi_id = %s LIMIT 1$',
+         'route'),
+        (r'FROM navigation_nodes WHERE id = ANY\(%s\) AND property_id = %s$', 'nodes_in_property'),
+        (r'FROM navigation_nodes WHERE id = ANY\(%s\)$', 'nodes_in'),
+        (r'FROM navigation_nodes WHERE id = %s$', 'node_by_id_one'),
+        (r"FROM navigation_nodes WHERE node_type = 'entrance' AND location IS NOT NULL$", 'entrances'),
+        (r"JOIN properties p ON nn\.property_id = p\.id WHERE p\.name = %s .* LIMIT 3$", 'nearest_path_nodes'),
+        (r'FROM properties( WHERE location IS NOT NULL)? ORDER BY id$|FROM properties$', 'all_properties'),
+    ]
+    _compiled = [(re.compile(pattern), name) for pattern, name in HANDLERS]
+
+    def execute(self, sql, params=None):
+        statement = ' '.join(sql.split())
+        for pattern, name in self._compiled:
+            if pattern.search(statement):
+                break
+        else:
+            raise FixtureQueryError(f"fixture DB has no handler for: {statement[:120]}")
+        self.statements[name] = self.statements.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+        rows = getattr(self, name)(tuple(params or ()))
+        columns = select_columns(statement)
+        if columns is None:
+            return [dict(row) for row in rows]
+        return [{column: row.get(column) for column in columns} for row in rows]
+
+    def query(self, sql, params=None, fetchone=False):
+        rows = self.execute(sql, params)
+        return (rows[0] if rows else None) if fetchone else rows
+
+    def query_all(self, queries):
+        return [self.query(sql, params, fetchone) for sql, params, fetchone in queries]
+
+
+def _split_top_level(text):
+    items, depth, start = [], 0, 0
+    for i, ch in enumerate(text):
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            items.append(text[start:i])
+            start = i + 1
+    items.append(text[start:])
+    return [item.strip() for item in items]
+
+
+def select_columns(statement):
+    """Output column names of a SELECT (alias, or the column without table prefix and cast); None for *."""
+    m = re.match(r'SELECT (.*?) FROM (?![^(]*\))', statement)
+    if not m or m.group(1).strip() == '*':
+        return None
+    columns = []
+    for item in _split_top_level(m.group(1)):
+        alias = re.search(r'\bAS (\w+)$', item, re.I)
+        columns.append(alias.group(1) if alias else item.split('::')[0].split('.')[-1])
+    return columns
+
+
+def install(seed=0, latency_ms=0.0):
+    """Route db.query / db.query_all to a new FixtureDB; returns it."""
+    fixture = FixtureDB(seed=seed, latency_ms=latency_ms)
+    db.query = fixture.query
+    db.query_all = fixture.query_all
+    db.init_pool = lambda *args, **kwargs: None
+    return fixture
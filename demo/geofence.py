@@ -0,0 +1,233 @@
+"""Point-in-footprint lookup of the property a coordinate is in.
+
+Building footprints are the ones scripts/osm_ingest.py writes to
+data/maps/property_footprints.geojson (PROPERTY_FOOTPRINTS_PATH), one
+MultiPolygon per property named as in data/maps/properties.json
+(PROPERTIES_PATH); aliases there resolve the properties table names to the
+same entries. deploy.sh ships both files with the app. Footprints are packed into an STR-tree
+(Sort-Tile-Recursive bulk-loaded R-tree) so a lookup only ray-casts the few
+polygons whose bounding boxes contain the point; entrances (navigation_nodes
+of type 'entrance') go into a second STR-tree for nearest-neighbour search.
+
+Coordinates are (lng, lat) pairs throughout, as in OSM and GeoJSON.
+"""
+
+import functools
+import heapq
+import json
+import logging
+import math
+
+from config import PROPERTIES_PATH, PROPERTY_FOOTPRINTS_PATH, STRTREE_NODE_CAPACITY
+import catalog
+from db import query
+from spatial_index import METERS_PER_DEGREE_LAT, geodesic_distance, haversine
+
+logger = logging.getLogger(__name__)
+
+PROPERTIES_SQL = """
+    SELECT id, name, area,
+           ST_Y(location::geometry) AS lat, ST_X(location::geometry) AS lng
+    FROM properties
+"""
+
+ENTRANCES_SQL = """
+    SELECT id, property_id, name, entrance_role,
+           ST_Y(location::geometry) AS lat, ST_X(location::geometry) AS lng
+    FROM navigation_nodes
+    WHERE node_type = 'entrance' AND location IS NOT NULL
+"""
+
+
+def point_in_ring(x, y, ring):
+    """Ray-casting test of (x, y) against a closed [(x, y)] ring."""
+    inside = False
+    for (x0, y0), (x1, y1) in zip(ring, ring[1:]):
+        if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
+
+
+def _ring_area(ring):
+    """Planar shoelace area in square degrees (only used for ranking)."""
+    return abs(sum(ring[i - 1][0] * ring[i][1] - ring[i][0] * ring[i - 1][1]
+                   for i in range(len(ring)))) / 2
+
+
+def _bbox(points):
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+class STRTree:
+    """Static R-tree over (bbox, item) pairs, bulk-loaded with Sort-Tile-Recursive."""
+
+    def __init__(self, entries, capacity=STRTREE_NODE_CAPACITY):
+        # Node: (bbox, children, is_leaf); leaf children are (bbox, item)
+        level = list(entries)
+        self.size = len(level)
+        is_leaf = True
+        while True:
+            nodes = []
+            for group in self._tile(level, capacity):
+                box = (min(b[0][0] for b in group), min(b[0][1] for b in group),
+                       max(b[0][2] for b in group), max(b[0][3] for b in group))
+                nodes.append((box, group, is_leaf))
+            if len(nodes) <= 1:
+                self.root = nodes[0] if nodes else None
+                return
+            level, is_leaf = nodes, False
+
+    @staticmethod
+    def _tile(entries, capacity):
+        if not entries:
+            return []
+        n_leaves = math.ceil(len(entries) / capacity)
+        n_slices = math.ceil(math.sqrt(n_leaves))
+        per_slice = n_slices * capacity
+        by_x = sorted(entries, key=lambda e: e[0][0] + e[0][2])
+        groups = []
+        for s in range(0, len(by_x), per_slice):
+            column = sorted(by_x[s:s + per_slice], key=lambda e: e[0][1] + e[0][3])
+            groups.extend(column[i:i + capacity] for i in range(0, len(column), capacity))
+        return groups
+
+    def query_point(self, x, y):
+        """Items whose bbox contains (x, y)."""
+        if self.root is None:
+            return []
+        hits, stack = [], [self.root]
+        while stack:
+            box, children, is_leaf = stack.pop()
+            if not (box[0] <= x <= box[2] and box[1] <= y <= box[3]):
+                continue
+            if is_leaf:
+                hits.extend(item for b, item in children
+                            if b[0] <= x <= b[2] and b[1] <= y <= b[3])
+            else:
+                stack.extend(children)
+        return hits
+
+    def nearest(self, x, y, distance):
+        """Nearest item by distance(x, y, item), best-first over bbox lower bounds.
+
+        Bbox bounds are in degrees scaled to meters at y's latitude, so
+        `distance` must return meters and never be less than that bound.
+        """
+        if self.root is None:
+            return None, None
+        kx = METERS_PER_DEGREE_LAT * math.cos(math.radians(y)) * 0.99
+        ky = METERS_PER_DEGREE_LAT * 0.99
+
+        def bound(box):
+            dx = max(box[0] - x, 0, x - box[2]) * kx
+            dy = max(box[1] - y, 0, y - box[3]) * ky
+            return math.hypot(dx, dy)
+
+        heap = [(0.0, 0, self.root, False)]
+        counter = 1
+        best, best_dist = None, math.inf
+        while heap:
+            d, _, entry, is_item = heapq.heappop(heap)
+            if d >= best_dist:
+                break
+            if is_item:
+                best, best_dist = entry, d
+                continue
+            box, children, is_leaf = entry
+            for child in children:
+                if is_leaf:
+                    item = child[1]
+                    heapq.heappush(heap, (distance(x, y, item), counter, item, True))
+                else:
+                    heapq.heappush(heap, (bound(child[0]), counter, child, False))
+                counter += 1
+        return best, (best_dist if best is not None else None)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_footprints(footprints_path=PROPERTY_FOOTPRINTS_PATH, properties_path=PROPERTIES_PATH):
+    """Footprints [{osm_id, name, polygons}] and the properties.json aliases.
+
+    Each polygon is (outer_ring, [inner_rings]) with rings as [(lng, lat), ...].
+    """
+    try:
+        with open(footprints_path, encoding='utf-8') as f:
+            features = json.load(f)['features']
+        with open(properties_path, encoding='utf-8') as f:
+            aliases = json.load(f).get('aliases', {})
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Building footprints unavailable ({footprints_path}): {e}")
+        return [], {}
+    footprints = [{
+        'osm_id': feature['properties'].get('osm_id'),
+        'name': feature['properties']['name'],
+        'polygons': [([tuple(p) for p in rings[0]], [[tuple(p) for p in r] for r in rings[1:]])
+                     for rings in feature['geometry']['coordinates'] if rings],
+    } for feature in features]
+    logger.info(f"Loaded {len(footprints)} building footprints from {footprints_path}")
+    return footprints, aliases
+
+
+class Geofence:
+    def __init__(self, footprints, aliases, properties, entrances):
+        by_name = {aliases.get(p['name'], p['name']): p for p in properties}
+        entries = []
+        for fp in footprints:
+            prop = by_name.get(fp['name'])
+            for outer, holes in fp['polygons']:
+                if len(outer) < 4:
+                    continue
+                entries.append((_bbox(outer), {
+                    'osm_id': fp['osm_id'], 'name': fp['name'],
+                    'property': prop, 'outer': outer, 'holes': holes,
+                    'area': _ring_area(outer),
+                }))
+        self.footprints = STRTree(entries)
+
+        entrances = [dict(e, lat=float(e['lat']), lng=float(e['lng'])) for e in entrances]
+        self.entrances = STRTree([((e['lng'], e['lat']) * 2, e) for e in entrances])
+        self.entrances_by_property = {}
+        for e in entrances:
+            self.entrances_by_property.setdefault(e['property_id'], []).append(e)
+
+    def containing(self, lat, lng):
+        """Footprints containing the point, smallest first."""
+        hits = [fp for fp in self.footprints.query_point(lng, lat)
+                if point_in_ring(lng, lat, fp['outer'])
+                and not any(point_in_ring(lng, lat, h) for h in fp['holes'])]
+        return sorted(hits, key=lambda fp: fp['area'])
+
+    def locate(self, lat, lng):
+        """Building, property, area and nearest entrance for a coordinate."""
+        hits = self.containing(lat, lng)
+        building = hits[0] if hits else None
+        prop = next((fp['property'] for fp in hits if fp['property']), None)
+
+        candidates = self.entrances_by_property.get(prop['id']) if prop else None
+        if candidates:
+            entrance = min(candidates, key=lambda e: haversine(lat, lng, e['lat'], e['lng']))
+        else:
+            entrance, _ = self.entrances.nearest(
+                lng, lat, lambda x, y, e: haversine(y, x, e['lat'], e['lng']))
+        distance = geodesic_distance(lat, lng, entrance['lat'], entrance['lng']) if entrance else None
+
+        return {
+            'lat': lat, 'lng': lng,
+            'inside': building is not None,
+            'building': {'osm_id': building['osm_id'], 'name': building['name']} if building else None,
+            'property': {'id': prop['id'], 'name': prop['name']} if prop else None,
+            'area': prop['area'] if prop else None,
+            'nearest_entrance': {
+                'id': entrance['id'], 'name': entrance['name'],
+                'entrance_role': entrance['entrance_role'],
+                'property_id': entrance['property_id'],
+                'lat': entrance['lat'], 'lng': entrance['lng'],
+                'distance_meters': round(distance, 1),
+            } if entrance else None,
+        }
+
+
+catalog.register_index('geofence', lambda snapshot, previous: Geofence(
+    *_load_footprints(), query(PROPERTIES_SQL), query(ENTRANCES_SQL)))
@@ -50,6 +50,26 @@ def decode_polyline(encoded):
     return points
 
 
+def encode_polyline(points):
+    """Encode a list of {lat, lng} dicts as a Google Maps polyline string."""
+    result = []
+    prev_lat = 0
+    prev_lng = 0
+
+    for point in points:
+        lat = int(round(point['lat'] * 1e5))
+        lng = int(round(point['lng'] * 1e5))
+        for delta in (lat - prev_lat, lng - prev_lng):
+            value = ~(delta << 1) if delta < 0 else (delta << 1)
+            while value >= 0x20:
+                result.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            result.append(chr(value + 63))
+        prev_lat, prev_lng = lat, lng
+
+    return ''.join(result)
+
+
 def _build_cache_key(origin, destination, mode):
     """Build a deterministic cache key from coordinates and travel mode."""
     o_lat, o_lng = round(origin[0], 5), round(origin[1], 5)
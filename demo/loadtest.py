@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""End-to-end HTTP load test for the demo app.
+
+Starts the app in a child process on a fixture database seeded from data/pois
+(fixture_db.py) with Google Directions pointed at fake_directions.py, then
+replays a seeded, weighted mix of /api/pois, /api/nearby, /api/route and
+/api/navigate from keep-alive client threads. Rate limits are disabled in the
+child so they don't cap throughput. Writes throughput and p50/p95/p99 latency
+per endpoint as JSON, and compares a run against an earlier report.
+
+Usage:
+    python loadtest.py --duration 30 --out bench/loadtest.json
+    python loadtest.py --requests 5000 --concurrency 16 --seed 7
+    python loadtest.py --db-latency-ms 2 --directions-latency-ms 80
+    python loadtest.py --db postgres          # app on DB_* env (e.g. docker-compose PostGIS)
+    python loadtest.py --url http://127.0.0.1:5000 --duration 60   # an already running server
+    python loadtest.py --out new.json --compare bench/loadtest.json
+
+Requirements:
+    pip install -r requirements.txt
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode, urlparse
+
+DEMO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Share of requests per endpoint
+MIX = {'pois': 4, 'nearby': 3, 'route': 2, 'navigate': 1}
+CATEGORIES = [None, 'restaurant', 'nightlife', 'shopping', 'attraction', 'entertainment']
+NEARBY_RADII = [200, 500, 1000, 2000]
+CROSS_PROPERTY_SHARE = 0.5  # /api/navigate pairs in different properties (outdoor Directions leg)
+STARTUP_TIMEOUT = 60
+FIXTURE_ERROR_EXIT = 3  # app child exit status after an unhandled fixture query
+REQUEST_TIMEOUT = 30
+
+
+# ── Server side ──
+
+def serve(port, db_mode, seed, db_latency_ms):
+    """Run the app with the chosen data layer; prints the bound port on stdout."""
+    sys.path.insert(0, DEMO_DIR)
+    if db_mode == 'fixture':
+        import fixture_db
+        fixture = fixture_db.install(seed=seed, latency_ms=db_latency_ms)
+        execute = fixture.execute
+
+        # The app turns exceptions into 500s; exit instead so the run can't pass
+        def execute_or_exit(sql, params=None):
+            try:
+                return execute(sql, params)
+            except fixture_db.FixtureQueryError as e:
+                print(f"FixtureQueryError: {e}", file=sys.stderr, flush=True)
+                os._exit(FIXTURE_ERROR_EXIT)
+
+        fixture.execute = execute_or_exit
+    from werkzeug.serving import make_server
+    import app as demo_app
+
+    demo_app.limiter.enabled = False
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # no per-request access log
+    server = make_server('127.0.0.1', port, demo_app.app, threaded=True)
+    print(server.port, flush=True)
+    server.serve_forever()
+
+
+def start_directions_stub(latency_ms, seed):
+    """Start fake_directions.py in a thread on a free port; returns (server, base_url)."""
+    sys.path.insert(0, DEMO_DIR)
+    from http.server import ThreadingHTTPServer
+    from fake_directions import FakeDirections, make_handler
+
+    fake = FakeDirections(latency_ms=latency_ms, seed=seed)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/maps/api/directions/json"
+
+
+def start_app(args, directions_url, cache_dir):
+    """Spawn the app child process; returns (process, base_url)."""
+    env = dict(os.environ, GOOGLE_MAPS_API_KEY='fake', GOOGLE_DIRECTIONS_BASE_URL=directions_url,
+               DIRECTIONS_CACHE_DIR=cache_dir)
+    cmd = [sys.executable, os.path.abspath(__file__), '--serve', '--db', args.db,
+           '--seed', str(args.seed), '--db-latency-ms', str(args.db_latency_ms)]
+    proc = subprocess.Popen(cmd, cwd=DEMO_DIR, env=env, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline().strip()
+    if not line.isdigit():
+        proc.kill()
+        sys.exit(f"App failed to start (exit code {proc.wait()})")
+    return proc, f"http://127.0.0.1:{line}"
+
+
+# ── Client side ──
+
+def fetch_json(base_url, path):
+    deadline = time.time() + STARTUP_TIMEOUT
+    while True:
+        conn = http.client.HTTPConnection(urlparse(base_url).netloc, timeout=REQUEST_TIMEOUT)
+        try:
+            conn.request('GET', path)
+            resp = conn.getresponse()
+            body = resp.read()
+            if resp.status == 200:
+                return json.loads(body)
+            error = f"HTTP {resp.status}"
+        except OSError as e:
+            error = str(e)
+        finally:
+            conn.close()
+        if time.time() > deadline:
+            sys.exit(f"{base_url}{path} not ready: {error}")
+        time.sleep(0.5)
+
+
+def build_workload(pois, count, seed):
+    """A seeded list of (endpoint, method, path, body) drawn from MIX."""
+    rng = random.Random(seed)
+    by_property = {}
+    for poi in pois:
+        if poi.get('casino_property'):
+            by_property.setdefault(poi['casino_property'], []).append(poi)
+    properties = [name for name, members in by_property.items() if len(members) > 1]
+
+    def same_property_pair():
+        return rng.sample(by_property[rng.choice(properties)], 2)
+
+    def cross_property_pair():
+        a, b = rng.sample(properties, 2)
+        return rng.choice(by_property[a]), rng.choice(by_property[b])
+
+    endpoints = list(MIX)
+    weights = [MIX[e] for e in endpoints]
+    workload = []
+    for endpoint in rng.choices(endpoints, weights, k=count):
+        if endpoint == 'pois':
+            category = rng.choice(CATEGORIES)
+            workload.append((endpoint, 'GET', '/api/pois' + (f"?category={category}" if category else ''), None))
+        elif endpoint == 'nearby':
+            poi = rng.choice(pois)
+            params = {'lat': round(poi['lat'] + rng.uniform(-0.002, 0.002), 6),
+                      'lng': round(poi['lng'] + rng.uniform(-0.002, 0.002), 6),
+                      'radius': rng.choice(NEARBY_RADII)}
+            workload.append((endpoint, 'GET', '/api/nearby?' + urlencode(params), None))
+        elif endpoint == 'route':
+            start, end = same_property_pair()
+            workload.append((endpoint, 'GET', f"/api/route/{start['id']}/{end['id']}", None))
+        else:
+            pair = cross_property_pair() if rng.random() < CROSS_PROPERTY_SHARE else same_property_pair()
+            body = json.dumps({'start_poi_id': pair[0]['id'], 'end_poi_id': pair[1]['id']})
+            workload.append((endpoint, 'POST', '/api/navigate', body))
+    return workload
+
+
+class Recorder:
+    """Per-endpoint latencies and status counts, shared by the client threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {e: [] for e in MIX}
+        self.statuses = {e: {} for e in MIX}
+
+    def add(self, endpoint, status, seconds):
+        with self.lock:
+            self.latencies[endpoint].append(seconds * 1000)
+            counts = self.statuses[endpoint]
+            counts[status] = counts.get(status, 0) + 1
+
+
+def client(base_url, workload, cursor, stop_at, recorder):
+    """Take requests from the shared workload until it runs out or stop_at passes."""
+    netloc = urlparse(base_url).netloc
+    conn = http.client.HTTPConnection(netloc, timeout=REQUEST_TIMEOUT)
+    headers = {'Content-Type': 'application/json'}
+    while time.perf_counter() < stop_at:
+        with cursor['lock']:
+            i = cursor['next']
+            cursor['next'] += 1
+        endpoint, method, path, body = workload[i % len(workload)]
+        if cursor['limit'] and i >= cursor['limit']:
+            break
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            status = str(resp.status)
+        except (OSError, http.client.HTTPException) as e:
+            status = type(e).__name__
+            conn.close()
+            conn = http.client.HTTPConnection(netloc, timeout=REQUEST_TIMEOUT)
+        recorder.add(endpoint, status, time.perf_counter() - started)
+        if status == 'ConnectionRefusedError':
+            break  # the server is gone
+    conn.close()
+
+
+def run_phase(base_url, workload, concurrency, seconds, limit):
+    """Run the client threads; returns (recorder, elapsed seconds)."""
+    recorder = Recorder()
+    cursor = {'lock': threading.Lock(), 'next': 0, 'limit': limit}
+    started = time.perf_counter()
+    stop_at = started + seconds if seconds else math.inf
+    threads = [threading.Thread(target=client, args=(base_url, workload, cursor, stop_at, recorder))
+               for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder, time.perf_counter() - started
+
+
+# ── Report ──
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, statuses, elapsed):
+    values = sorted(latencies)
+    errors = sum(n for status, n in statuses.items() if not status.startswith(('2', '3')))
+    client_errors = sum(n for status, n in statuses.items() if status.startswith('4'))
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'client_errors': client_errors,  # 4xx, included in errors
+        'status': dict(sorted(statuses.items())),
+        'rps': round(len(values) / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(values) / len(values), 3) if values else None,
+        'p50_ms': round(percentile(values, 50), 3) if values else None,
+        'p95_ms': round(percentile(values, 95), 3) if values else None,
+        'p99_ms': round(percentile(values, 99), 3) if values else None,
+        'max_ms': round(values[-1], 3) if values else None,
+    }
+
+
+def build_report(recorder, elapsed, args, target):
+    endpoints = {e: summarize(recorder.latencies[e], recorder.statuses[e], elapsed) for e in MIX}
+    all_statuses = {}
+    for counts in recorder.statuses.values():
+        for status, n in counts.items():
+            all_statuses[status] = all_statuses.get(status, 0) + n
+    all_latencies = [v for values in recorder.latencies.values() for v in values]
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'target': target,
+            'db': None if args.url else args.db,
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'request_limit': args.requests,
+            'seed': args.seed,
+            'db_latency_ms': args.db_latency_ms,
+            'directions_latency_ms': args.directions_latency_ms,
+            'mix': MIX,
+            'elapsed_s': round(elapsed, 3),
+        },
+        'total': summarize(all_latencies, all_statuses, elapsed),
+        'endpoints': endpoints,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=DEMO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report, out):
+    meta = report['meta']
+    print(f"\n  {meta['target']}  commit {meta['commit']}  {meta['concurrency']} clients  {meta['elapsed_s']}s", file=out)
+    print(f"  {'endpoint':<10} {'reqs':>7} {'errors':>6} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9}", file=out)
+    for name, s in list(report['endpoints'].items()) + [('total', report['total'])]:
+        if not s['requests']:
+            continue
+        print(f"  {name:<10} {s['requests']:>7} {s['errors']:>6} {s['rps']:>9.1f} "
+              f"{s['p50_ms']:>8.1f}ms {s['p95_ms']:>7.1f}ms {s['p99_ms']:>7.1f}ms", file=out)
+
+
+def print_comparison(report, baseline, out):
+    """Per-endpoint change against an earlier report (negative latency deltas are improvements)."""
+    def change(new, old):
+        if new is None or not old:
+            return '      n/a'
+        return f"{(new - old) / old * 100:+8.1f}%"
+
+    print(f"\n  vs {baseline['meta'].get('commit')} ({baseline['meta'].get('started_at')})", file=out)
+    print(f"  {'endpoint':<10} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9}", file=out)
+    rows = [(name, report['endpoints'][name], baseline['endpoints'].get(name)) for name in report['endpoints']]
+    rows.append(('total', report['total'], baseline['total']))
+    for name, new, old in rows:
+        if not old or not new['requests']:
+            continue
+        print(f"  {name:<10} {change(new['rps'], old['rps'])} {change(new['p50_ms'], old['p50_ms'])} "
+              f"{change(new['p95_ms'], old['p95_ms'])} {change(new['p99_ms'], old['p99_ms'])}", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end HTTP load test for the demo app')
+    parser.add_argument('--url', default=None,
+                        help='Load an already running server instead of starting one')
+    parser.add_argument('--db', choices=['fixture', 'postgres'], default='fixture',
+                        help='Data layer for the started app: in-process fixture or the DB_* database')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds to run (0 = until --requests)')
+    parser.add_argument('--requests', type=int, default=0, help='Stop after this many requests (0 = no limit)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Client threads')
+    parser.add_argument('--warmup', type=float, default=2, help='Seconds of unrecorded warm-up traffic')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for the workload, fixture and stub')
+    parser.add_argument('--db-latency-ms', type=float, default=0, help='Fixture DB delay per statement')
+    parser.add_argument('--directions-latency-ms', type=float, default=50,
+                        help='Directions stub delay per request')
+    parser.add_argument('--out', default=None, help='Write the JSON report here (default: stdout)')
+    parser.add_argument('--compare', default=None, help='Earlier JSON report to compare against')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.db, args.seed, args.db_latency_ms)
+        return
+    if not args.duration and not args.requests:
+        parser.error('--duration or --requests must be set')
+
+    proc = None
+    try:
+        if args.url:
+            base_url = args.url.rstrip('/')
+        else:
+            stub, directions_url = start_directions_stub(args.directions_latency_ms, args.seed)
+            cache_dir = tempfile.mkdtemp(prefix='loadtest-directions-')
+            proc, base_url = start_app(args, directions_url, cache_dir)
+        pois = fetch_json(base_url, '/api/pois')
+        print(f"Target {base_url}: {len(pois)} POIs", file=sys.stderr)
+
+        workload = build_workload(pois, max(args.requests, 10000), args.seed)
+        if args.warmup:
+            run_phase(base_url, workload, args.concurrency, args.warmup, 0)
+        recorder, elapsed = run_phase(base_url, workload, args.concurrency, args.duration, args.requests)
+        if proc and any('ConnectionRefusedError' in counts for counts in recorder.statuses.values()):
+            try:
+                proc.wait(timeout=5)  # the socket closes before the child is reaped
+            except subprocess.TimeoutExpired:
+                pass
+        if proc and proc.poll() is not None:
+            sys.exit(f"App exited during the run (exit code {proc.returncode}); see its output above")
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    report = build_report(recorder, elapsed, args, args.url or f"app ({args.db} db)")
+    # Tables go to stderr when stdout carries the JSON report
+    out = sys.stdout if args.out else sys.stderr
+    print_report(report, out)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f), out)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.out}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
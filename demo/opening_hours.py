@@ -0,0 +1,193 @@
+"""Parsing of free-form POI `hours` and an "open at" index.
+
+`hours` is JSONB keyed by weekday ("monday": "5:00 PM - 10:00 PM"), with
+values such as "Closed", "24 Hours", "5:30 PM & 8:30 PM seatings" and spans
+past midnight ("6:00 PM - 2:00 AM"). Extra keys like "brunch" carry their own
+day range ("Friday-Sunday 11:00 AM - 2:30 PM"). parse_hours() turns all of
+that into sorted, merged [start, end) intervals in minutes of the week, with
+Monday 00:00 as minute 0; spans that run past Sunday midnight wrap to Monday.
+
+OpenHoursIndex cuts the week at every interval boundary and stores the set of
+open POI ids for each segment, so "which POIs are open at t" is one bisect.
+POIs whose hours are missing or unparseable are never reported as open.
+"""
+
+import bisect
+import datetime
+import re
+from zoneinfo import ZoneInfo
+
+from config import LOCAL_TIMEZONE, SEATING_DURATION_MINUTES
+import catalog
+
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+_TIME = r'(\d{1,2})(?::(\d{2}))?\s*([AaPp])\.?[Mm]\.?'
+_SPAN_RE = re.compile(_TIME + r'\s*(?:-|–|to)\s*' + _TIME)
+_TIME_RE = re.compile(_TIME)
+_DAY_RANGE_RE = re.compile(r'^([A-Za-z]+)\s*(?:-|–|to)\s*([A-Za-z]+)\b')
+
+LOCAL_TZ = ZoneInfo(LOCAL_TIMEZONE)
+
+
+def _day_index(name):
+    name = name.lower()
+    for i, day in enumerate(DAYS):
+        if day.startswith(name[:3]):
+            return i
+    return None
+
+
+def _minutes(hour, minute, meridiem):
+    hour = int(hour) % 12 + (12 if meridiem.lower() == 'p' else 0)
+    return hour * 60 + int(minute or 0)
+
+
+def parse_day(text):
+    """Minute-of-day [start, end) spans for one day's text; None if unparseable.
+
+    End may exceed MINUTES_PER_DAY for spans that close after midnight.
+    """
+    text = text.strip()
+    lowered = text.lower()
+    if not lowered or lowered == 'closed':
+        return []
+    if lowered in ('24 hours', 'open 24 hours', '24/7'):
+        return [(0, MINUTES_PER_DAY)]
+
+    spans = []
+    for m in _SPAN_RE.finditer(text):
+        start = _minutes(*m.group(1, 2, 3))
+        end = _minutes(*m.group(4, 5, 6))
+        if end <= start:
+            end += MINUTES_PER_DAY
+        spans.append((start, end))
+    if spans:
+        return spans
+
+    if 'seating' in lowered:
+        return [(t, t + SEATING_DURATION_MINUTES)
+                for t in (_minutes(*m.group(1, 2, 3)) for m in _TIME_RE.finditer(text))]
+    return None
+
+
+def _extra_days(text):
+    """Weekdays named by a leading "Friday-Sunday" / "Saturday" prefix, and the rest of the text."""
+    m = _DAY_RANGE_RE.match(text)
+    if m and _day_index(m.group(1)) is not None and _day_index(m.group(2)) is not None:
+        first, last = _day_index(m.group(1)), _day_index(m.group(2))
+        return [(first + i) % 7 for i in range((last - first) % 7 + 1)], text[m.end():]
+    word = text.split(' ', 1)
+    if len(word) == 2 and len(word[0]) >= 3 and _day_index(word[0]) is not None:
+        return [_day_index(word[0])], word[1]
+    return None, text
+
+
+def _merge(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(iv) for iv in merged]
+
+
+def parse_hours(hours):
+    """Weekly open intervals [(start, end), ...] in minutes since Monday 00:00.
+
+    Returns None when hours are missing or nothing in them can be parsed.
+    """
+    if not isinstance(hours, dict) or not hours:
+        return None
+
+    intervals = []
+    parsed_any = False
+    for key, text in hours.items():
+        if not isinstance(text, str):
+            continue
+        day = _day_index(key) if key.lower() in DAYS else None
+        days = [day] if day is not None else None
+        if days is None:
+            days, text = _extra_days(text)
+            if days is None:
+                continue
+        spans = parse_day(text)
+        if spans is None:
+            continue
+        parsed_any = True
+        for d in days:
+            for start, end in spans:
+                start += d * MINUTES_PER_DAY
+                end += d * MINUTES_PER_DAY
+                if end > MINUTES_PER_WEEK:
+                    intervals.append((0, end - MINUTES_PER_WEEK))
+                    end = MINUTES_PER_WEEK
+                intervals.append((start, end))
+
+    return _merge(intervals) if parsed_any else None
+
+
+def minute_of_week(when):
+    """Minute of the week for a datetime, in Las Vegas local time."""
+    if when.tzinfo is not None:
+        when = when.astimezone(LOCAL_TZ)
+    return when.weekday() * MINUTES_PER_DAY + when.hour * 60 + when.minute
+
+
+def parse_timestamp(value):
+    """Parse an open_at value: 'now', unix seconds or ISO 8601 (naive = local time)."""
+    value = value.strip()
+    if value.lower() == 'now':
+        return datetime.datetime.now(LOCAL_TZ)
+    try:
+        seconds = float(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    try:
+        return datetime.datetime.fromtimestamp(seconds, LOCAL_TZ)
+    except (OverflowError, OSError) as e:
+        raise ValueError(f'timestamp out of range: {value}') from e
+
+
+class OpenHoursIndex:
+    def __init__(self, pois):
+        self.intervals = {}
+        for poi in pois:
+            if poi['is_closed']:
+                continue
+            parsed = parse_hours(poi['hours'])
+            if parsed:
+                self.intervals[poi['id']] = parsed
+
+        events = {}
+        for poi_id, intervals in self.intervals.items():
+            for start, end in intervals:
+                events.setdefault(start, []).append((poi_id, True))
+                events.setdefault(end, []).append((poi_id, False))
+
+        # Segment i covers [boundaries[i], boundaries[i + 1]) and has open_sets[i] open
+        self.boundaries = [0]
+        self.open_sets = [frozenset()]
+        current = set()
+        for minute in sorted(events):
+            for poi_id, opening in sorted(events[minute], key=lambda e: e[1]):
+                if opening:
+                    current.add(poi_id)
+                else:
+                    current.discard(poi_id)
+            if minute == self.boundaries[-1]:
+                self.open_sets[-1] = frozenset(current)
+            else:
+                self.boundaries.append(minute)
+                self.open_sets.append(frozenset(current))
+
+    def open_at(self, when):
+        """Ids of POIs open at the given datetime."""
+        minute = minute_of_week(when)
+        return self.open_sets[bisect.bisect_right(self.boundaries, minute) - 1]
+
+
+catalog.register_index('open_hours', lambda snapshot, previous: OpenHoursIndex(snapshot.pois))
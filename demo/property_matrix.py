@@ -0,0 +1,118 @@
+"""Dense in-process distance matrix between properties.
+
+Replaces lookups in the property_distances table (a full cross join of
+properties). The matrix is a float32 numpy array indexed through a
+name -> row map, computed from the properties table with the same WGS84
+geodesic PostGIS uses for geography ST_Distance, and rebuilt whenever the
+catalog data version changes. Row-wise queries (everything within X meters,
+walk/rideshare mode per destination) are single vectorized operations.
+"""
+
+import numpy as np
+
+from config import WALK_THRESHOLD_METERS
+import catalog
+from db import query
+from spatial_index import WGS84_A, WGS84_B, WGS84_F
+
+PROPERTIES_SQL = """
+    SELECT name, ST_Y(location::geometry) AS lat, ST_X(location::geometry) AS lng
+    FROM properties
+    WHERE location IS NOT NULL
+    ORDER BY id
+"""
+
+
+def geodesic_matrix(lats, lngs):
+    """Pairwise WGS84 distances in meters (Vincenty's inverse formula, vectorized)."""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lng = np.radians(np.asarray(lngs, dtype=np.float64))
+    U = np.arctan((1 - WGS84_F) * np.tan(lat))
+    sin_u1, cos_u1 = np.sin(U)[:, None], np.cos(U)[:, None]
+    sin_u2, cos_u2 = np.sin(U)[None, :], np.cos(U)[None, :]
+    L = lng[None, :] - lng[:, None]
+
+    lam = L.copy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for _ in range(100):
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            sin_sigma = np.hypot(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)
+            cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            sin_alpha = np.where(sin_sigma == 0, 0.0, cos_u1 * cos_u2 * sin_lam / sin_sigma)
+            cos2_alpha = 1 - sin_alpha ** 2
+            cos_2sm = np.where(cos2_alpha == 0, 0.0, cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha)
+            C = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+            lam_prev = lam
+            lam = L + (1 - C) * WGS84_F * sin_alpha * (
+                sigma + C * sin_sigma * (cos_2sm + C * cos_sigma * (-1 + 2 * cos_2sm ** 2)))
+            if np.nanmax(np.abs(lam - lam_prev)) < 1e-12:
+                break
+
+        u2 = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+        A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+        B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+        delta_sigma = B * sin_sigma * (cos_2sm + B / 4 * (
+            cos_sigma * (-1 + 2 * cos_2sm ** 2) -
+            B / 6 * cos_2sm * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sm ** 2)))
+        dist = WGS84_B * A * (sigma - delta_sigma)
+    return np.where(sin_sigma == 0, 0.0, dist)
+
+
+class PropertyMatrix:
+    def __init__(self, properties):
+        self.names = [p['name'] for p in properties]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.distances = geodesic_matrix(
+            [float(p['lat']) for p in properties],
+            [float(p['lng']) for p in properties],
+        ).astype(np.float32)
+        self._pairs = None
+
+    def distance(self, from_name, to_name):
+        """Meters between two properties, or None if either is unknown."""
+        i = self.index.get(from_name)
+        j = self.index.get(to_name)
+        if i is None or j is None:
+            return None
+        return float(self.distances[i, j])
+
+    def within(self, name, max_meters):
+        """[(name, meters)] of other properties within max_meters, nearest first."""
+        i = self.index.get(name)
+        if i is None:
+            return None
+        row = self.distances[i]
+        hits = np.flatnonzero(row <= max_meters)
+        hits = hits[hits != i]
+        hits = hits[np.argsort(row[hits], kind='stable')]
+        return [(self.names[j], float(row[j])) for j in hits]
+
+    def modes(self, name, walk_threshold=WALK_THRESHOLD_METERS):
+        """Travel mode from `name` to every property, in matrix order."""
+        i = self.index.get(name)
+        if i is None:
+            return None
+        return np.where(self.distances[i] <= walk_threshold, 'walk', 'rideshare')
+
+    def pairs(self):
+        """Every ordered pair of distinct properties, nearest first (computed once)."""
+        if self._pairs is None:
+            n = len(self.names)
+            flat = self.distances.ravel()
+            order = np.argsort(flat, kind='stable')
+            order = order[order // n != order % n]
+            walk = flat[order] <= WALK_THRESHOLD_METERS
+            self._pairs = [
+                {
+                    'from_property_name': self.names[k // n],
+                    'to_property_name': self.names[k % n],
+                    'distance_meters': int(round(float(flat[k]))),
+                    'mode': 'walk' if is_walk else 'rideshare',
+                }
+                for k, is_walk in zip(order.tolist(), walk.tolist())
+            ]
+        return self._pairs
+
+
+catalog.register_index('property_matrix', lambda snapshot, previous: PropertyMatrix(query(PROPERTIES_SQL)))
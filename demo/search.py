@@ -0,0 +1,230 @@
+"""Typo-tolerant POI search over an in-memory trigram index.
+
+Documents are open POIs; the indexed fields are name, cuisine, chef, tags
+and casino_property. Each distinct token is split into pg_trgm-style
+trigrams, so a misspelled query token ("bouchn") still finds vocabulary
+tokens ("bouchon") that share most of its trigrams. Token postings carry the
+best field weight per document; scores can be blended with distance to a
+lat/lng.
+
+Rebuilds are incremental: only POIs whose indexed fields changed are
+re-tokenized, and the postings/trigram tables are copied on write so the
+index still served by the previous snapshot is never mutated.
+"""
+
+import functools
+import heapq
+import math
+import re
+import unicodedata
+
+from config import (
+    SEARCH_FIELD_WEIGHTS, SEARCH_MIN_SIMILARITY,
+    SEARCH_DISTANCE_WEIGHT, SEARCH_DISTANCE_SCALE_METERS
+)
+import catalog
+from spatial_index import haversine
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize(text):
+    """Lowercase, strip accents and punctuation: "Café Américain" -> "cafe americain"."""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(' ', text.lower().replace("'", '')).strip()
+
+
+def tokenize(text):
+    return normalize(text).split() if text else []
+
+
+def trigrams(token):
+    """pg_trgm-style trigrams of a single token."""
+    padded = f'  {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@functools.lru_cache(maxsize=65536)
+def _gram_count(token):
+    return len(trigrams(token))
+
+
+def _field_tokens(poi):
+    """{token: best field weight} for one POI's indexed fields."""
+    values = {
+        'name': [poi.get('name')],
+        'cuisine': [c.replace('_', ' ') for c in poi.get('cuisine') or []],
+        'chef': [poi.get('chef')],
+        'tags': [t.replace('_', ' ') for t in poi.get('tags') or []],
+        'casino_property': [poi.get('casino_property')],
+    }
+    weights = {}
+    for field, texts in values.items():
+        weight = SEARCH_FIELD_WEIGHTS[field]
+        for text in texts:
+            for token in tokenize(text):
+                if weights.get(token, 0) < weight:
+                    weights[token] = weight
+    return weights
+
+
+class SearchIndex:
+    def __init__(self, docs, token_weights, postings, grams):
+        self.docs = docs                    # id -> result stub
+        self.token_weights = token_weights  # id -> {token: weight}
+        self.postings = postings            # token -> {id: weight}
+        self.grams = grams                  # trigram -> frozenset(tokens)
+
+    @classmethod
+    def build(cls, pois, previous=None):
+        """Build from scratch, or incrementally from `previous`."""
+        if previous is None:
+            index = cls({}, {}, {}, {})
+        else:
+            # Shallow copies; inner containers are copied before their first change
+            index = cls(dict(previous.docs), dict(previous.token_weights),
+                        dict(previous.postings), dict(previous.grams))
+        index._copied_postings = set()
+        index._dirty_grams = {}
+
+        current = {}
+        for poi in pois:
+            if not poi['is_closed']:
+                current[poi['id']] = poi
+
+        for poi_id in list(index.docs):
+            if poi_id not in current:
+                index._remove(poi_id)
+
+        for poi_id, poi in current.items():
+            stub = {
+                'id': poi_id, 'name': poi['name'], 'category': poi['category'],
+                'casino_property': poi['casino_property'],
+                'lat': float(poi['lat']) if poi['lat'] is not None else None,
+                'lng': float(poi['lng']) if poi['lng'] is not None else None,
+                '_norm_name': normalize(poi['name']),
+            }
+            weights = _field_tokens(poi)
+            if index.docs.get(poi_id) == stub and index.token_weights.get(poi_id) == weights:
+                continue
+            if poi_id in index.docs:
+                index._remove(poi_id)
+            index._add(poi_id, stub, weights)
+
+        index._freeze()
+        return index
+
+    def _posting_rw(self, token):
+        """Writable posting for token, copied once per build."""
+        if token not in self._copied_postings:
+            self.postings[token] = dict(self.postings.get(token, ()))
+            self._copied_postings.add(token)
+        return self.postings[token]
+
+    def _gram_rw(self, gram):
+        """Writable token set for gram; frozen again by _freeze()."""
+        grams = self._dirty_grams.get(gram)
+        if grams is None:
+            grams = self._dirty_grams[gram] = set(self.grams.get(gram, ()))
+        return grams
+
+    def _add(self, poi_id, stub, weights):
+        self.docs[poi_id] = stub
+        self.token_weights[poi_id] = weights
+        for token, weight in weights.items():
+            if not self.postings.get(token):
+                for gram in trigrams(token):
+                    self._gram_rw(gram).add(token)
+            self._posting_rw(token)[poi_id] = weight
+
+    def _remove(self, poi_id):
+        del self.docs[poi_id]
+        for token in self.token_weights.pop(poi_id):
+            posting = self._posting_rw(token)
+            del posting[poi_id]
+            if not posting:
+                for gram in trigrams(token):
+                    self._gram_rw(gram).discard(token)
+
+    def _freeze(self):
+        for token in self._copied_postings:
+            if not self.postings[token]:
+                del self.postings[token]
+        for gram, tokens in self._dirty_grams.items():
+            if tokens:
+                self.grams[gram] = frozenset(tokens)
+            else:
+                self.grams.pop(gram, None)
+        del self._copied_postings, self._dirty_grams
+
+    def _match_token(self, q_token):
+        """Vocabulary tokens similar to q_token -> similarity in 0..1."""
+        if q_token in self.postings and len(q_token) < 3:
+            return {q_token: 1.0}
+        q_grams = trigrams(q_token)
+        shared = {}
+        for gram in q_grams:
+            for token in self.grams.get(gram, ()):
+                shared[token] = shared.get(token, 0) + 1
+
+        matches = {}
+        for token, n in shared.items():
+            if token.startswith(q_token):
+                # As-you-type prefix: nearly as good as an exact hit
+                sim = 1.0 if token == q_token else 0.9
+            else:
+                sim = n / (len(q_grams) + _gram_count(token) - n)
+            if sim >= SEARCH_MIN_SIMILARITY:
+                matches[token] = sim
+        return matches
+
+    def search(self, q, lat=None, lng=None, category=None, limit=20, ids=None):
+        """Ranked POIs matching q, optionally boosted by proximity to (lat, lng).
+
+        `ids`, if given, restricts results to that set of POI ids.
+        """
+        q_tokens = tokenize(q)
+        if not q_tokens:
+            return []
+
+        scores = {}
+        for q_token in q_tokens:
+            best = {}
+            for token, sim in self._match_token(q_token).items():
+                for poi_id, weight in self.postings[token].items():
+                    s = sim * weight
+                    if s > best.get(poi_id, 0):
+                        best[poi_id] = s
+            for poi_id, s in best.items():
+                scores[poi_id] = scores.get(poi_id, 0) + s
+
+        q_norm = ' '.join(q_tokens)
+        ranked = []
+        for poi_id, score in scores.items():
+            doc = self.docs[poi_id]
+            if category and doc['category'] != category:
+                continue
+            if ids is not None and poi_id not in ids:
+                continue
+            score /= len(q_tokens)
+            if doc['_norm_name'].startswith(q_norm):
+                score += 0.5
+            dist = None
+            if lat is not None and lng is not None and doc['lat'] is not None:
+                dist = haversine(lat, lng, doc['lat'], doc['lng'])
+                score *= 1 - SEARCH_DISTANCE_WEIGHT + SEARCH_DISTANCE_WEIGHT * math.exp(
+                    -dist / SEARCH_DISTANCE_SCALE_METERS)
+            ranked.append((-score, doc['name'], poi_id, dist))
+
+        results = []
+        for neg_score, _, poi_id, dist in heapq.nsmallest(limit, ranked):
+            result = {k: v for k, v in self.docs[poi_id].items() if k != '_norm_name'}
+            if dist is not None:
+                result['distance_meters'] = round(dist, 1)
+            result['score'] = round(-neg_score, 4)
+            results.append(result)
+        return results
+
+
+catalog.register_index('search', lambda snapshot, previous: SearchIndex.build(snapshot.pois, previous))
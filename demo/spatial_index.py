@@ -0,0 +1,135 @@
+"""In-memory grid index over POI coordinates for radius searches.
+
+Replaces the per-request call to the plpgsql find_nearby_pois(). POIs are
+grouped by distinct coordinate (most share their property's location) and
+bucketed into a fixed lat/lng grid. A query scans only the cells overlapping
+the search circle, prefilters with haversine and refines with the WGS84
+geodesic distance, which is what PostGIS uses for geography ST_Distance and
+ST_DWithin, so the result set and distances match the database function.
+"""
+
+import math
+
+from config import NEARBY_GRID_CELL_DEGREES
+import catalog
+
+EARTH_RADIUS_METERS = 6371008.8
+METERS_PER_DEGREE_LAT = 111320.0
+
+# WGS84 ellipsoid
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+
+# Haversine and the geodesic differ by well under 0.6% at any latitude
+_PREFILTER_SLACK = 1.006
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """Great-circle distance in meters on the mean-radius sphere."""
+    lat1, lng1, lat2, lng2 = map(math.radians, [lat1, lng1, lat2, lng2])
+    a = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+    return EARTH_RADIUS_METERS * 2 * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geodesic_distance(lat1, lng1, lat2, lng2):
+    """Distance in meters on the WGS84 ellipsoid (Vincenty's inverse formula)."""
+    if lat1 == lat2 and lng1 == lng2:
+        return 0.0
+
+    L = math.radians(lng2 - lng1)
+    U1 = math.atan((1 - WGS84_F) * math.tan(math.radians(lat1)))
+    U2 = math.atan((1 - WGS84_F) * math.tan(math.radians(lat2)))
+    sin_u1, cos_u1 = math.sin(U1), math.cos(U1)
+    sin_u2, cos_u2 = math.sin(U2), math.cos(U2)
+
+    lam = L
+    for _ in range(100):
+        sin_lam, cos_lam = math.sin(lam), math.cos(lam)
+        sin_sigma = math.hypot(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)
+        if sin_sigma == 0:
+            return 0.0
+        cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+        sigma = math.atan2(sin_sigma, cos_sigma)
+        sin_alpha = cos_u1 * cos_u2 * sin_lam / sin_sigma
+        cos2_alpha = 1 - sin_alpha ** 2
+        cos_2sm = cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha if cos2_alpha else 0.0
+        C = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+        lam_prev = lam
+        lam = L + (1 - C) * WGS84_F * sin_alpha * (
+            sigma + C * sin_sigma * (cos_2sm + C * cos_sigma * (-1 + 2 * cos_2sm ** 2)))
+        if abs(lam - lam_prev) < 1e-12:
+            break
+    else:
+        # Nearly antipodal points do not converge; the sphere is close enough there
+        return haversine(lat1, lng1, lat2, lng2)
+
+    u2 = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    delta_sigma = B * sin_sigma * (cos_2sm + B / 4 * (
+        cos_sigma * (-1 + 2 * cos_2sm ** 2) -
+        B / 6 * cos_2sm * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sm ** 2)))
+    return WGS84_B * A * (sigma - delta_sigma)
+
+
+class SpatialIndex:
+    """Fixed-size lat/lng grid of distinct POI locations."""
+
+    def __init__(self, pois, cell_degrees=NEARBY_GRID_CELL_DEGREES):
+        self.cell = cell_degrees
+        self.size = len(pois)
+        self.cells = {}
+
+        locations = {}
+        for poi in pois:
+            if poi['lat'] is None or poi['lng'] is None:
+                continue
+            key = (float(poi['lat']), float(poi['lng']))
+            if key not in locations:
+                locations[key] = []
+                self.cells.setdefault(self._cell_of(*key), []).append((key[0], key[1], locations[key]))
+            locations[key].append((poi['id'], poi['name'], poi['category']))
+        for entries in locations.values():
+            entries.sort()
+
+    def _cell_of(self, lat, lng):
+        return (math.floor(lat / self.cell), math.floor(lng / self.cell))
+
+    def nearby(self, lat, lng, radius_meters, category=None):
+        """POIs within radius_meters of (lat, lng), nearest first.
+
+        Returns rows shaped like find_nearby_pois():
+        {id, name, category, distance_meters}.
+        """
+        d_lat = radius_meters * _PREFILTER_SLACK / METERS_PER_DEGREE_LAT
+        cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+        d_lng = d_lat / cos_lat
+        row_min, col_min = self._cell_of(lat - d_lat, lng - d_lng)
+        row_max, col_max = self._cell_of(lat + d_lat, lng + d_lng)
+
+        prefilter = radius_meters * _PREFILTER_SLACK + 1
+        hits = []
+        for row in range(row_min, row_max + 1):
+            for col in range(col_min, col_max + 1):
+                for p_lat, p_lng, entries in self.cells.get((row, col), ()):
+                    if abs(p_lat - lat) > d_lat:
+                        continue
+                    if haversine(lat, lng, p_lat, p_lng) > prefilter:
+                        continue
+                    dist = geodesic_distance(lat, lng, p_lat, p_lng)
+                    if dist <= radius_meters:
+                        hits.append((dist, entries))
+
+        # Sort distinct locations, not rows; entries are pre-sorted by id
+        hits.sort(key=lambda h: h[0])
+        return [
+            {'id': poi_id, 'name': name, 'category': poi_category, 'distance_meters': dist}
+            for dist, entries in hits
+            for poi_id, name, poi_category in entries
+            if category is None or poi_category == category
+        ]
+
+
+catalog.register_index('spatial', lambda snapshot, previous: SpatialIndex(snapshot.pois))
@@ -20,16 +20,56 @@ const API = {
         return this.get(`/api/pois${params}`);
     },
 
+    queryPois(filters, offset = 0, limit = 50) {
+        const params = new URLSearchParams({ offset, limit });
+        Object.entries(filters).forEach(([facet, values]) => {
+            if (values && values.length) params.set(facet, [].concat(values).join(','));
+        });
+        return this.get(`/api/pois/query?${params}`);
+    },
+
     getProperties() {
         return this.get('/api/properties');
     },
 
+    getFloorplans() {
+        return this.get('/api/floorplans');
+    },
+
     getNearby(lat, lng, radius, category) {
         let params = `?lat=${lat}&lng=${lng}&radius=${radius}`;
         if (category) params += `&category=${category}`;
         return this.get(`/api/nearby${params}`);
     },
 
+    locate(lat, lng) {
+        return this.get(`/api/locate?lat=${lat}&lng=${lng}`);
+    },
+
+    search(q, lat, lng, category) {
+        let params = `?q=${encodeURIComponent(q)}`;
+        if (lat != null && lng != null) params += `&lat=${lat}&lng=${lng}`;
+        if (category) params += `&category=${category}`;
+        return this.get(`/api/search${params}`);
+    },
+
+    autocomplete(q, category) {
+        let params = `?q=${encodeURIComponent(q)}`;
+        if (category) params += `&category=${category}`;
+        return this.get(`/api/autocomplete${params}`);
+    },
+
+    getClusters(bounds, zoom, category) {
+        let params = `?bbox=${bounds.getWest()},${bounds.getSouth()},${bounds.getEast()},${bounds.getNorth()}&zoom=${zoom}`;
+        if (category) params += `&category=${category}`;
+        return this.get(`/api/clusters${params}`);
+    },
+
+    getClusterLeaves(clusterId, category) {
+        const params = category ? `?category=${category}` : '';
+        return this.get(`/api/clusters/${clusterId}/leaves${params}`);
+    },
+
     getRoute(startId, endId) {
         return this.get(`/api/route/${startId}/${endId}`);
     },
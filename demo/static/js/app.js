@@ -12,6 +12,11 @@ document.addEventListener('DOMContentLoaded', async () => {
         // Add property labels
         properties.forEach(prop => SinCityMap.addPropertyLabel(prop));
 
+        // Floor plans are optional (rendered offline); the map works without them
+        API.getFloorplans()
+            .then(floorplans => floorplans.forEach(fp => SinCityMap.addFloorplan(fp)))
+            .catch(err => console.warn('No floor plans:', err));
+
         // Add POI markers
         pois.forEach(poi => SinCityMap.addMarker(poi));
 
@@ -10,6 +10,7 @@ const SinCityMap = {
     markers: {},
     markerLayer: null,
     propertyLayer: null,
+    floorplanLayer: null,
     routeLayer: null,
     nearbyCircle: null,
     allPois: [],
@@ -33,6 +34,7 @@ const SinCityMap = {
             }
         ).addTo(this.map);
 
+        this.floorplanLayer = L.layerGroup().addTo(this.map);
         this.markerLayer = L.layerGroup().addTo(this.map);
         this.propertyLayer = L.layerGroup().addTo(this.map);
         this.routeLayer = L.layerGroup().addTo(this.map);
@@ -68,6 +70,20 @@ const SinCityMap = {
         this.markerLayer.addLayer(marker);
     },
 
+    addFloorplan(floorplan) {
+        // Raster floor plan; Leaflet only requests tiles inside its bounds
+        // The fingerprint changes on every re-render, so versioned tiles can be cached for good
+        const [west, south, east, north] = floorplan.bounds;
+        const version = floorplan.fingerprint ? `?v=${floorplan.fingerprint}` : '';
+        L.tileLayer(`/tiles/floorplans/${floorplan.slug}/{z}/{x}/{y}.png${version}`, {
+            bounds: [[south, west], [north, east]],
+            minZoom: floorplan.minzoom,
+            maxNativeZoom: floorplan.maxzoom,
+            maxZoom: MAP_CONFIG.max_zoom,
+            opacity: 0.85
+        }).addTo(this.floorplanLayer);
+    },
+
     addPropertyLabel(property) {
         const label = L.marker([property.lat, property.lng], {
             icon: L.divIcon({
@@ -0,0 +1,131 @@
+"""Mapbox Vector Tiles for POIs, generated with ST_AsMVT and cached on disk.
+
+Tiles live under TILE_CACHE_DIR/<data version>/<z>/<x>/<y>.mvt, so each tile
+is computed once per catalog version. The tile query also reads the data
+version in the same statement, so a tile is always cached under the version
+it was rendered from, even when this process's catalog snapshot is stale.
+Only the TILE_CACHE_VERSIONS most recently used version directories are kept,
+which leaves room for workers that briefly serve different versions.
+Attributes are pruned by zoom level so low-zoom tiles only carry what the map
+needs to draw a dot.
+"""
+
+import logging
+import os
+import shutil
+
+import catalog
+from config import TILE_CACHE_DIR, TILE_CACHE_VERSIONS, TILE_EXTENT, TILE_BUFFER
+from db import query
+
+logger = logging.getLogger(__name__)
+
+LAYER_NAME = 'pois'
+
+# (min zoom, attributes added from that zoom on)
+ZOOM_ATTRIBUTES = [
+    (0, ['id', 'category']),
+    (14, ['name']),
+    (16, ['subcategory', 'casino_property', 'price_range', 'area']),
+]
+
+# Attribute -> SQL expression (MVT values must be plain text/numbers)
+_COLUMNS = {
+    'id': 'p.id',
+    'category': 'p.category::text',
+    'name': 'p.name',
+    'subcategory': 'p.subcategory',
+    'casino_property': 'p.casino_property',
+    'price_range': 'p.price_range::text',
+    'area': 'p.area',
+}
+
+_TILE_SQL = """
+    WITH bounds AS (
+        SELECT ST_TileEnvelope(%(z)s, %(x)s, %(y)s) AS geom
+    ),
+    mvtgeom AS (
+        SELECT ST_AsMVTGeom(
+                   ST_Transform(p.location::geometry, 3857), bounds.geom,
+                   %(extent)s, %(buffer)s, true
+               ) AS geom,
+               {columns}
+        FROM pois p, bounds
+        WHERE p.is_closed = FALSE
+          AND p.location && ST_Transform(
+                  ST_TileEnvelope(%(z)s, %(x)s, %(y)s, margin => %(margin)s), 4326
+              )::geography
+    ),
+    tile AS (
+        SELECT ST_AsMVT(mvtgeom.*, %(layer)s, %(extent)s, 'geom') AS mvt FROM mvtgeom
+    ),
+    version AS ({version_sql})
+    SELECT tile.mvt, version.* FROM tile, version
+"""
+
+
+def attributes_for_zoom(z):
+    """Attribute names included in tiles at zoom z."""
+    attrs = []
+    for min_zoom, names in ZOOM_ATTRIBUTES:
+        if z >= min_zoom:
+            attrs.extend(names)
+    return attrs
+
+
+def render_tile(z, x, y):
+    """Render a single tile from the pois table; returns (tile bytes, version tag of the data)."""
+    columns = ', '.join(f'{_COLUMNS[a]} AS {a}' for a in attributes_for_zoom(z))
+    row = query(_TILE_SQL.format(columns=columns, version_sql=catalog.VERSION_SQL), {
+        'z': z, 'x': x, 'y': y,
+        'extent': TILE_EXTENT, 'buffer': TILE_BUFFER,
+        'margin': TILE_BUFFER / TILE_EXTENT,
+        'layer': LAYER_NAME,
+    }, fetchone=True)
+    tile = bytes(row['mvt']) if row['mvt'] is not None else b''
+    return tile, catalog.version_tag(row)
+
+
+def _tile_path(version, z, x, y):
+    return os.path.join(TILE_CACHE_DIR, version, str(z), str(x), f'{y}.mvt')
+
+
+def _prune_old_versions():
+    """Remove all but the TILE_CACHE_VERSIONS most recently modified version directories."""
+    try:
+        dirs = [entry for entry in os.scandir(TILE_CACHE_DIR) if entry.is_dir()]
+        dirs.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    except OSError:
+        return
+    for entry in dirs[TILE_CACHE_VERSIONS:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def get_tile(z, x, y, version):
+    """Return (tile bytes, version tag) for a tile, rendering on a cache miss.
+
+    The returned tag differs from `version` when the database has moved on
+    since the caller's snapshot was taken; the tile then belongs to the newer
+    version and is cached there.
+    """
+    try:
+        with open(_tile_path(version, z, x, y), 'rb') as f:
+            return f.read(), version
+    except OSError:
+        pass
+
+    tile, rendered_version = render_tile(z, x, y)
+    version_dir = os.path.join(TILE_CACHE_DIR, rendered_version)
+    tile_path = _tile_path(rendered_version, z, x, y)
+    try:
+        if not os.path.isdir(version_dir):
+            os.makedirs(version_dir, exist_ok=True)
+            _prune_old_versions()
+        os.makedirs(os.path.dirname(tile_path), exist_ok=True)
+        tmp_path = f'{tile_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(tile)
+        os.replace(tmp_path, tile_path)
+    except OSError as e:
+        logger.warning(f"Tile cache write error for {z}/{x}/{y}: {e}")
+    return tile, rendered_version
@@ -80,7 +80,7 @@ python3 scripts/import_pois.py
 
 echo ""
 echo "► Step 4b: Generating synthetic navigation data..."
-pip3 install -q numpy
+pip3 install -q numpy scipy
 python3 scripts/generate_synthetic_routes.py
 
 # ─── 5. Set up application directory ─────────────────────────────────────────
@@ -89,6 +89,9 @@ echo "► Step 5: Setting up application..."
 
 mkdir -p "${APP_DIR}"
 cp -r "${REPO_DIR}/demo/"* "${APP_DIR}/"
+# Property footprints and aliases for the geofence (written by scripts/osm_ingest.py)
+mkdir -p "${APP_DIR}/maps"
+cp "${REPO_DIR}/data/maps/property_footprints.geojson" "${REPO_DIR}/data/maps/properties.json" "${APP_DIR}/maps/"
 
 # Create virtual environment
 python3 -m venv "${APP_DIR}/venv"
@@ -102,6 +105,8 @@ DB_NAME=${DB_NAME}
 DB_USER=${DB_USER}
 DB_PASSWORD=${DB_PASS}
 GOOGLE_MAPS_API_KEY=${GOOGLE_MAPS_API_KEY:-}
+PROPERTY_FOOTPRINTS_PATH=${APP_DIR}/maps/property_footprints.geojson
+PROPERTIES_PATH=${APP_DIR}/maps/properties.json
 ENVEOF
 
 chmod 600 "${APP_DIR}/.env"
@@ -6,6 +6,7 @@ CREATE EXTENSION IF NOT EXISTS postgis;
 CREATE EXTENSION IF NOT EXISTS postgis_topology;
 
 -- Drop existing objects for clean re-initialization
+DROP TABLE IF EXISTS poi_imports CASCADE;
 DROP TABLE IF EXISTS property_distances CASCADE;
 DROP TABLE IF EXISTS synthetic_routes CASCADE;
 DROP TABLE IF EXISTS navigation_edges CASCADE;
@@ -97,6 +98,14 @@ CREATE INDEX idx_pois_tags ON pois USING GIN(tags);
 CREATE INDEX idx_pois_features ON pois USING GIN(features);
 CREATE INDEX idx_pois_cuisine ON pois USING GIN(cuisine);
 
+-- Content hash of each POI file at its last import (scripts/import_pois.py)
+CREATE TABLE poi_imports (
+    poi_id VARCHAR(20) PRIMARY KEY,
+    content_hash CHAR(64) NOT NULL,
+    path TEXT,
+    imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Casinos/Properties table
 CREATE TABLE properties (
     id SERIAL PRIMARY KEY,
@@ -104,6 +113,8 @@ CREATE TABLE properties (
     type VARCHAR(50),
     address TEXT,
     location GEOGRAPHY(POINT, 4326),
+    footprint GEOGRAPHY(MULTIPOLYGON, 4326),  -- OSM building outline (scripts/osm_ingest.py)
+    osm_id VARCHAR(30),                       -- e.g. 'way/25723909'
     area VARCHAR(50),
     opened_year INTEGER,
     owner VARCHAR(100),
@@ -142,6 +153,7 @@ CREATE TABLE navigation_nodes (
     name VARCHAR(255),
     entrance_role VARCHAR(50),  -- 'main', 'rideshare_pickup', 'valet', etc.
     accessibility_features TEXT[],
+    osm_id BIGINT UNIQUE,       -- entrance=* node, upserted by scripts/osm_ingest.py
 
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -259,6 +271,8 @@ CREATE TRIGGER update_properties_updated_at BEFORE UPDATE ON properties
 
 -- Insert property data for all properties with POIs
 -- Names MUST match the casino_property field in POI JSON files exactly
+-- Seed locations only: scripts/osm_ingest.py --db replaces them with OSM
+-- footprint centroids (the same coordinates as data/maps/properties.json)
 INSERT INTO properties (name, location, area, owner, has_floor_plan) VALUES
 -- ═══════════════════════════════════════════════════════════════
 -- SOUTH STRIP (Tropicana to Mandalay Bay)
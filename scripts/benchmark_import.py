@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Sin City Travels - POI load benchmark
+Times import_pois.load_pois() (read + parse + normalize + validate) on a
+synthetic POI tree, serially and on a process pool. No database needed.
+
+The tree is built in a temp directory by cloning the real POIs under
+data/pois with fresh ids, spread over category subdirectories. About 1% of
+the files lack coordinates and 0.2% are truncated JSON, so the skip and
+error paths are exercised too.
+
+Usage:
+    python scripts/benchmark_import.py                    (50k files)
+    python scripts/benchmark_import.py --files 10000 --workers 1 4 8
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from import_pois import load_pois, LOADED, SKIPPED, FAILED
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "data" / "pois"
+
+
+def load_templates():
+    templates = []
+    for root, dirs, files in os.walk(DATA_DIR):
+        dirs[:] = sorted(d for d in dirs if d != 'raw' and not d.startswith('.'))
+        for filename in sorted(files):
+            if filename.endswith('.json') and not filename.startswith('.'):
+                with open(os.path.join(root, filename), 'r', encoding='utf-8') as f:
+                    poi = json.load(f)
+                if isinstance(poi, dict) and 'id' in poi:
+                    templates.append((os.path.relpath(root, DATA_DIR), poi))
+    return templates
+
+
+def build_tree(out_dir, count):
+    """Write `count` synthetic POI files under out_dir; returns their paths."""
+    templates = load_templates()
+    paths = []
+    for i in range(count):
+        subdir, poi = templates[i % len(templates)]
+        poi = dict(poi, id=f"poi_{100000 + i}", name=f"{poi['name']} #{i}")
+        if i % 100 == 1:
+            poi['location'] = dict(poi['location'], coordinates={})
+        text = json.dumps(poi, indent=2, ensure_ascii=False)
+        if i % 500 == 3:
+            text = text[:len(text) // 2]
+        directory = os.path.join(out_dir, subdir, f"batch_{i // 5000:02d}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"poi_{100000 + i}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        paths.append(path)
+    return paths
+
+
+def run(paths, workers):
+    counts = {LOADED: 0, SKIPPED: 0, FAILED: 0}
+    start = time.perf_counter()
+    for status, row, message in load_pois(paths, workers):
+        counts[status] += 1
+    elapsed = time.perf_counter() - start
+    return elapsed, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the parallel POI loader')
+    parser.add_argument('--files', type=int, default=50000, help='Synthetic files to generate')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+                        help='Worker counts to time (1 = serial)')
+    parser.add_argument('--keep', action='store_true', help='Keep the synthetic tree')
+    args = parser.parse_args()
+
+    out_dir = tempfile.mkdtemp(prefix='poi_bench_')
+    try:
+        print(f"Building {args.files} synthetic POI files in {out_dir}...")
+        start = time.perf_counter()
+        paths = build_tree(out_dir, args.files)
+        print(f"  built in {time.perf_counter() - start:.1f}s")
+
+        print(f"\n{'workers':>8} {'seconds':>9} {'files/s':>10} {'speedup':>8}  loaded/skipped/failed")
+        baseline = None
+        for workers in args.workers:
+            elapsed, counts = run(paths, workers)
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {len(paths) / elapsed:>10.0f} {baseline / elapsed:>7.2f}x  "
+                  f"{counts[LOADED]}/{counts[SKIPPED]}/{counts[FAILED]}")
+    finally:
+        if args.keep:
+            print(f"\nTree kept at {out_dir}")
+        else:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Sin City Travels - Property detector benchmark
+Times property_detector against the per-pattern loops it replaced, over the
+cached corpus of detail pages in .cache/pages (filled by scrape_pois.py /
+enrich_pois.py runs), and reports where the two disagree.
+
+Without a page cache the corpus is synthesized from the POI files: each
+POI's name and description wrapped in navigation text that mentions other
+properties, as on the real pages.
+
+Usage:
+    python scripts/benchmark_property_detector.py
+    python scripts/benchmark_property_detector.py --repeat 20
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from enrich_pois import extract_content_text, PAGE_CACHE_DIR, PROPERTIES
+from manifest import Manifest
+from property_detector import (VENUE_ALIASES, VENUE_BARE_ALIASES, META_NAMES,
+                               detect_property, detect_property_from_meta)
+
+DATA_DIR = Path(__file__).parent.parent / "data" / "pois"
+
+# The previous implementation: one re.search per pattern, first pattern in list order wins
+LEGACY_PATTERNS = [
+    (rf'(?:at |inside |in )(?:the )?{alias}(?:\s|,|\.|$)', name) for alias, name in VENUE_ALIASES
+] + list(VENUE_BARE_ALIASES)
+LEGACY_META = META_NAMES
+
+
+def legacy_detect_property(text):
+    for pattern, prop_name in LEGACY_PATTERNS:
+        if re.search(pattern, text, re.I):
+            return prop_name
+    return None
+
+
+def legacy_detect_property_from_meta(meta_text):
+    if not meta_text:
+        return None
+    for search_name, canonical in LEGACY_META:
+        if search_name.lower() in meta_text.lower():
+            return canonical
+    return None
+
+
+def cached_corpus():
+    """[(meta description, content text)] from cached detail pages."""
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(str(PAGE_CACHE_DIR), '*', '*.html'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            soup = BeautifulSoup(f.read(), 'lxml')
+        meta = soup.find('meta', attrs={'name': 'description'})
+        corpus.append((meta.get('content', '') if meta else '', extract_content_text(soup)))
+    return corpus
+
+
+def synthetic_corpus():
+    rng = random.Random(42)
+    names = list(PROPERTIES)
+    corpus = []
+    manifest = Manifest(DATA_DIR)
+    for poi_id in manifest.entries:
+        with open(manifest.abspath(poi_id), 'r', encoding='utf-8') as f:
+            poi = json.load(f)
+        nav = ' | '.join(f"Restaurants at {name}" for name in rng.sample(names, 8))
+        description = poi.get('description') or ''
+        content = (f"{poi['name']} {poi.get('subcategory', '')} located inside "
+                   f"{poi.get('casino_property', '')}. {description} {nav}")
+        corpus.append((description[:300], content[:2000]))
+    return corpus
+
+
+def timed(func, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [func(text) for text in texts]
+    return (time.perf_counter() - start) / repeat, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the shared property detector')
+    parser.add_argument('--repeat', type=int, default=10, help='Timing repetitions')
+    args = parser.parse_args()
+
+    corpus = cached_corpus()
+    source = f"{PAGE_CACHE_DIR} (cached detail pages)"
+    if not corpus:
+        corpus = synthetic_corpus()
+        source = "synthetic pages built from data/pois (no page cache found)"
+    metas = [meta for meta, _ in corpus]
+    contents = [content for _, content in corpus]
+    print(f"Corpus: {len(corpus)} pages from {source}, "
+          f"{sum(map(len, contents)) / 1024:.0f} KiB of content text\n")
+
+    print(f"{'':24} {'legacy ms':>10} {'shared ms':>10} {'speedup':>8} {'differ':>7}")
+    for label, legacy, shared, texts in (
+            ('content (at/inside/in)', legacy_detect_property, detect_property, contents),
+            ('meta description', legacy_detect_property_from_meta, detect_property_from_meta, metas)):
+        old_time, old = timed(legacy, texts, args.repeat)
+        new_time, new = timed(shared, texts, args.repeat)
+        differ = [(o, n, t) for o, n, t in zip(old, new, texts) if o != n]
+        print(f"{label:24} {old_time * 1000:>10.2f} {new_time * 1000:>10.2f} "
+              f"{old_time / new_time:>7.1f}x {len(differ):>7}")
+        for o, n, t in differ[:3]:
+            print(f"    legacy={o!r} shared={n!r}: {t[:100]!r}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Sin City Travels - Near-duplicate POI detection
+Finds POIs that are probably the same venue, across the POI files in
+data/pois and the OSM extract in data/pois/raw/osm_pois.json, and writes
+merge suggestions to data/build/merge_suggestions.json. Nothing is merged
+automatically. import_pois.py runs this after refreshing the manifest,
+unless the suggestions file was written for the same POI files and OSM
+extract.
+
+Names are normalized to tokens: accents, apostrophes and punctuation are
+stripped, and filler words and the tokens of the POI's own property are
+dropped. "Hell's Kitchen - Caesars" at Caesars Palace becomes
+{hells, kitchen}.
+
+Candidates are found without comparing every pair:
+  1. LSH: each name gets a MinHash signature over its character 3-grams,
+     cut into bands, and POIs are bucketed by band. Only POIs that share a
+     bucket are looked at. With 32 bands of 2 rows, pairs with a 3-gram
+     similarity of 0.45 or more almost always collide; unrelated names
+     rarely do.
+  2. Blocking: of those, a POI is only paired with POIs at the same
+     property, or in its geohash cell or a neighbouring one. OSM records
+     have no coordinates, so their property is detected from the name
+     ("Skylofts at MGM Grand"). POIs with neither property nor coordinates
+     can pair with anything.
+
+Candidate pairs are scored with the best of token Jaccard, 3-gram Jaccard
+and token containment. Containment counts 90%, needs at least two tokens
+on the smaller side, and only counts when the 3-gram Jaccard is at least
+0.7 too: on its own it paired "Times Square Hotdogs" with "The Bar at Times
+Square" and "Julius Tower" with "Julius Tower Extension". Pairs at different properties, or more than 1 km apart,
+are never suggested. Area values such as "Off-Strip" don't count as a
+property. Neither are pairs of different kinds of venue: categories are
+grouped (restaurants and bars together, since the scrapes list many venues
+as both) and a hotel is never a restaurant, so "Nobu" and "Nobu Hotel at
+Caesars Palace" stay apart; nor are pairs where only one name says hotel,
+pool or spa.
+
+Usage:
+    python scripts/dedupe_pois.py
+    python scripts/dedupe_pois.py --threshold 0.6 --show 50
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+import unicodedata
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+
+from journal import atomic_write_json
+from manifest import Manifest, poi_number
+from poi_dataset import PoiDataset, BUILD_DIR, source_digest
+from property_detector import META_DETECTOR
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "data" / "pois"
+OSM_FILE = DATA_DIR / "raw" / "osm_pois.json"
+SUGGESTIONS_FILE = BUILD_DIR / "merge_suggestions.json"
+
+DEFAULT_THRESHOLD = 0.7
+GEOHASH_PRECISION = 7  # cells of about 150 m x 150 m
+MAX_DISTANCE_M = 1000  # located POIs further apart are never the same venue
+CONTAINMENT_MIN_SHINGLES = 0.7  # 3-gram Jaccard a containment match needs as well
+# casino_property values that name an area rather than a building
+AREA_PROPERTIES = {'off-strip', 'downtown', 'strip'}
+NUM_PERM = 64
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+MERSENNE_PRIME = (1 << 61) - 1
+
+STOPWORDS = {'the', 'a', 'an', 'and', 'at', 'by', 'of', 'in', 'on', 'las', 'vegas',
+             'lv', 'restaurant', 'bar', 'lounge', 'hotel', 'casino', 'resort'}
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# POI category -> kind of venue; records of different kinds are never merged
+CATEGORY_KINDS = {
+    'restaurant': 'food_drink', 'nightlife': 'food_drink',
+    'entertainment': 'attraction', 'attraction': 'attraction',
+    'shopping': 'shopping', 'pool_spa': 'pool_spa',
+    'hotel': 'hotel', 'casino': 'hotel',
+}
+# OSM (tag, values) -> kind, first match wins; None matches any value
+OSM_TAG_KINDS = [
+    ('tourism', {'hotel', 'motel', 'apartment'}, 'hotel'),
+    ('amenity', {'casino'}, 'hotel'),
+    ('amenity', {'restaurant', 'cafe', 'fast_food', 'food_court', 'bar', 'pub', 'nightclub'}, 'food_drink'),
+    ('shop', None, 'shopping'),
+    ('leisure', {'spa', 'swimming_pool', 'water_park'}, 'pool_spa'),
+    ('tourism', {'attraction', 'museum', 'theme_park', 'gallery'}, 'attraction'),
+]
+# Kinds of OSM extract sections, for items without a telling tag
+OSM_SECTION_KINDS = {'restaurants': 'food_drink', 'bars': 'food_drink',
+                     'shops': 'shopping', 'attractions': 'attraction'}
+# Name words that say what a venue is; "Nobu" is not "Nobu Hotel"
+TYPE_WORDS = {'hotel', 'pool', 'spa'}
+
+
+def _permutations():
+    """(a, b) pairs for the MinHash hash family h(x) = (a*x + b) mod p, fixed per run."""
+    seed = 0x5EED
+    perms = []
+    for _ in range(NUM_PERM):
+        seed = (seed * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+        a = seed % (MERSENNE_PRIME - 1) + 1
+        seed = (seed * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+        perms.append((a, seed % MERSENNE_PRIME))
+    return perms
+
+
+PERMUTATIONS = _permutations()
+
+
+def geohash(lat, lng, precision=GEOHASH_PRECISION):
+    """Standard base-32 geohash of a point."""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = bit_count = 0
+    return ''.join(chars)
+
+
+@lru_cache(maxsize=None)
+def geohash_neighborhood(lat, lng, precision=GEOHASH_PRECISION):
+    """The point's geohash cell and its 8 neighbours."""
+    total_bits = 5 * precision
+    lat_step = 180.0 / (1 << (total_bits // 2))
+    lng_step = 360.0 / (1 << (total_bits - total_bits // 2))
+    return {geohash(lat + dy * lat_step, lng + dx * lng_step, precision)
+            for dy in (-1, 0, 1) for dx in (-1, 0, 1)}
+
+
+def distance_m(a, b):
+    """Equirectangular distance in meters; plenty for points a few km apart."""
+    lat = math.radians((a[0] + b[0]) / 2)
+    dy = math.radians(b[0] - a[0])
+    dx = math.radians(b[1] - a[1]) * math.cos(lat)
+    return 6371000 * math.hypot(dx, dy)
+
+
+def name_tokens(text):
+    """Lowercase ASCII word tokens; apostrophes are dropped ("Hell's" -> "hells")."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = re.sub(r"['’]", '', text).replace('&', ' and ')
+    return re.findall(r'[a-z0-9]+', text)
+
+
+def normalized_tokens(name, property_name):
+    """Distinctive name tokens: no filler words, no tokens of the POI's own property."""
+    tokens = [t for t in name_tokens(name) if t not in STOPWORDS]
+    property_tokens = set(name_tokens(property_name))
+    distinctive = [t for t in tokens if t not in property_tokens]
+    return set(distinctive or tokens)
+
+
+def shingles(tokens):
+    """Character 3-grams of each padded token, so word order doesn't matter."""
+    grams = set()
+    for token in tokens:
+        padded = f' {token} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def minhash(grams):
+    hashes = [zlib.crc32(g.encode('utf-8')) for g in grams] or [0]
+    return [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in PERMUTATIONS]
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def similarity(a, b):
+    """Name similarity of two records in [0, 1]."""
+    grams = jaccard(a['shingles'], b['shingles'])
+    score = max(jaccard(a['tokens'], b['tokens']), grams)
+    smaller = min(len(a['tokens']), len(b['tokens']))
+    if smaller >= 2 and grams >= CONTAINMENT_MIN_SHINGLES:
+        score = max(score, 0.9 * len(a['tokens'] & b['tokens']) / smaller)
+    return score
+
+
+def osm_kind(section, tags):
+    """Kind of venue of an OSM item, from its tags or else its extract section."""
+    for key, values, kind in OSM_TAG_KINDS:
+        if key in tags and (values is None or tags[key] in values):
+            return kind
+    return OSM_SECTION_KINDS.get(section)
+
+
+def make_record(key, source, name, property_name, coords, kind=None):
+    if property_name and property_name.lower() in AREA_PROPERTIES:
+        property_name = None
+    tokens = normalized_tokens(name, property_name)
+    grams = shingles(tokens)
+    return {'key': key, 'source': source, 'name': name, 'property': property_name,
+            'coords': coords, 'kind': kind, 'type_words': TYPE_WORDS.intersection(name_tokens(name)),
+            'tokens': tokens, 'shingles': grams, 'signature': minhash(grams)}
+
+
+def different_venues(a, b):
+    """True if two records are clearly different kinds of venue, whatever their names."""
+    if a['kind'] and b['kind'] and a['kind'] != b['kind']:
+        return True
+    return a['type_words'] != b['type_words']
+
+
+def tree_records(manifest, build_dir=BUILD_DIR):
+    """Records for the POI files; read from the built dataset when it is current."""
+    try:
+        dataset = PoiDataset(build_dir)
+    except (OSError, ValueError):
+        dataset = None
+    if dataset is not None and dataset.is_current(manifest):
+        names, properties = dataset.column('name'), dataset.column('casino_property')
+        categories = dataset.column('category')
+        lats, lngs = dataset.column('lat'), dataset.column('lng')
+        rows = ((dataset.ids[i], names[i], properties[i], categories[i], lats[i], lngs[i])
+                for i in range(len(dataset)))
+    else:
+        rows = []
+        for poi_id in manifest.entries:
+            with open(manifest.abspath(poi_id), 'r', encoding='utf-8') as f:
+                poi = json.load(f)
+            coords = (poi.get('location') or {}).get('coordinates') or {}
+            rows.append((poi_id, poi.get('name'), poi.get('casino_property'), poi.get('category'),
+                         coords.get('lat', math.nan), coords.get('lng', math.nan)))
+
+    records = []
+    for poi_id, name, property_name, category, lat, lng in rows:
+        try:
+            coords = (float(lat), float(lng))
+        except (TypeError, ValueError):
+            coords = None
+        if coords and (math.isnan(coords[0]) or math.isnan(coords[1])):
+            coords = None
+        records.append(make_record(poi_id, 'pois', name or '', property_name, coords,
+                                   CATEGORY_KINDS.get(category)))
+    return records
+
+
+def osm_records(path=OSM_FILE):
+    """Records for the OSM extract ({category: [{name, type, tags, lat/lon?}]})."""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    records = []
+    for category, items in data.items():
+        for i, item in enumerate(items):
+            name = item.get('name') or (item.get('tags') or {}).get('name')
+            if not name:
+                continue
+            center = item.get('center') or item
+            coords = (float(center['lat']), float(center['lon'])) if 'lat' in center and 'lon' in center else None
+            key = f"osm:{item['type']}/{item['id']}" if 'id' in item else f"osm:{category}[{i}]"
+            records.append(make_record(key, 'osm', name, META_DETECTOR.find(name), coords,
+                                       osm_kind(category, item.get('tags') or {})))
+    return records
+
+
+def blocking_key(record):
+    """(property, geohash cell, neighbouring cells) of a record; parts may be None."""
+    property_key = record['property'].lower() if record['property'] else None
+    if not record['coords']:
+        return property_key, None, None
+    cell = geohash(*record['coords'])
+    return property_key, cell, geohash_neighborhood(*record['coords'])
+
+
+def same_block(a, b):
+    """True if two records share a property or neighbouring geohash cells.
+    Records with neither are in every block."""
+    a_property, a_cell, a_cells = a
+    b_property, b_cell, b_cells = b
+    if a_property is None and a_cell is None or b_property is None and b_cell is None:
+        return True
+    if a_property is not None and a_property == b_property:
+        return True
+    return a_cell is not None and b_cell is not None and b_cell in a_cells
+
+
+def candidate_pairs(records):
+    """Index pairs that share an LSH band and a block."""
+    buckets = defaultdict(list)
+    for i, record in enumerate(records):
+        signature = record['signature']
+        for b in range(BANDS):
+            buckets[(b, tuple(signature[b * ROWS:(b + 1) * ROWS]))].append(i)
+
+    keys = [blocking_key(record) for record in records]
+    pairs = set()
+    for members in buckets.values():
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                i, j = members[x], members[y]
+                if (i, j) not in pairs and same_block(keys[i], keys[j]):
+                    pairs.add((i, j))
+    return pairs
+
+
+def _keep_order(record):
+    """POI files before OSM records, then the lowest POI number."""
+    number = poi_number(record['key'])
+    return (record['source'] != 'pois', number if number is not None else math.inf, record['key'])
+
+
+def find_duplicates(records, threshold=DEFAULT_THRESHOLD):
+    """Merge suggestions, best first: [{keep, merge, score, names, property, distance_m}]."""
+    suggestions = []
+    for i, j in candidate_pairs(records):
+        a, b = records[i], records[j]
+        if a['property'] and b['property'] and a['property'].lower() != b['property'].lower():
+            continue
+        if different_venues(a, b):
+            continue
+        distance = distance_m(a['coords'], b['coords']) if a['coords'] and b['coords'] else None
+        if distance is not None and distance > MAX_DISTANCE_M:
+            continue
+        score = similarity(a, b)
+        if score < threshold:
+            continue
+        keep, merge = sorted((a, b), key=_keep_order)
+        suggestions.append({
+            'keep': keep['key'],
+            'merge': merge['key'],
+            'score': round(score, 3),
+            'names': [keep['name'], merge['name']],
+            'property': keep['property'] or merge['property'],
+            'distance_m': None if distance is None else round(distance),
+        })
+    suggestions.sort(key=lambda s: (-s['score'], s['keep'], s['merge']))
+    return suggestions
+
+
+def inputs_digest(manifest, osm_path=OSM_FILE):
+    """source_digest of the POI files plus the OSM extract's size and mtime."""
+    try:
+        st = os.stat(osm_path)
+        osm = f"{st.st_size}:{st.st_mtime_ns}"
+    except OSError:
+        osm = 'none'
+    return f"{source_digest(manifest)}/{osm}"
+
+
+def current_suggestions(manifest, threshold=DEFAULT_THRESHOLD, out_path=SUGGESTIONS_FILE):
+    """Suggestions in out_path if they were found for these inputs and threshold, else None."""
+    try:
+        with open(out_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('source_digest') != inputs_digest(manifest) or data.get('threshold') != threshold:
+        return None
+    return data.get('suggestions')
+
+
+def run(manifest, threshold=DEFAULT_THRESHOLD, out_path=SUGGESTIONS_FILE):
+    """Detect duplicates across the POI files and OSM and write the suggestions file."""
+    records = tree_records(manifest) + osm_records()
+    suggestions = find_duplicates(records, threshold)
+    os.makedirs(os.path.dirname(str(out_path)), exist_ok=True)
+    atomic_write_json(out_path, {
+        'generated_at': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        'source_digest': inputs_digest(manifest),
+        'threshold': threshold,
+        'records': len(records),
+        'suggestions': suggestions,
+    })
+    return records, suggestions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Suggest merges for near-duplicate POIs')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Minimum name similarity (default {DEFAULT_THRESHOLD})')
+    parser.add_argument('--show', type=int, default=20, help='Suggestions to print')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = Manifest(DATA_DIR)
+    manifest.refresh()
+    manifest.save()
+    records, suggestions = run(manifest, args.threshold)
+    print(f"Compared {len(records)} POIs in {time.perf_counter() - start:.2f}s: "
+          f"{len(suggestions)} merge suggestions -> {SUGGESTIONS_FILE}")
+    for s in suggestions[:args.show]:
+        where = f", {s['distance_m']} m apart" if s['distance_m'] is not None else ''
+        print(f"  {s['score']:.2f}  {s['keep']} {s['names'][0]!r} <- {s['merge']} {s['names'][1]!r} "
+              f"({s['property'] or 'no property'}{where})")
+    if len(suggestions) > args.show:
+        print(f"  ... {len(suggestions) - args.show} more")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
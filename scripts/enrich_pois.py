@@ -11,20 +11,30 @@ Usage:
     python enrich_pois.py --category restaurants
     python enrich_pois.py --category all
     python enrich_pois.py --category all --tbd-only   (only fix TBD properties)
+    python enrich_pois.py --category all --concurrency 8 --rate 2
+    python enrich_pois.py --category all --offline   (re-parse cached pages only)
+    python enrich_pois.py --category all --retry-failures   (only POIs that failed last time)
+    python enrich_pois.py --category all --shard 0/4   (one of 4 parallel workers)
+
+Progress is checkpointed in .checkpoints/; an interrupted run resumes where it
+stopped. Use --restart to discard this worker's (shard's) checkpoints and process
+its POIs again; other shards' journals are left alone.
 """
 
 import json
 import os
 import re
-import time
 import argparse
 from pathlib import Path
 from datetime import datetime, timezone
 
-import requests
 from bs4 import BeautifulSoup
 
-REQUEST_DELAY = 1.2  # seconds between requests
+from fetcher import Fetcher, PageCache, MAX_CONCURRENCY, REQUESTS_PER_SECOND
+from journal import Journal, DONE, SKIPPED, FAILED, atomic_write_json, file_hash, shard_of
+from manifest import Manifest
+from property_detector import detect_property, detect_property_from_meta
+from property_locations import load_properties
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -35,160 +45,22 @@ HEADERS = {
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data" / "pois"
 
-# Canonical property coordinates for updating location data
-PROPERTIES = {
-    "Aria": {"lat": 36.1067, "lng": -115.1761, "address": "3730 Las Vegas Blvd S, Las Vegas, NV 89158", "area": "Mid Strip"},
-    "Bellagio": {"lat": 36.1127, "lng": -115.1765, "address": "3600 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "Mid Strip"},
-    "Caesars Palace": {"lat": 36.1162, "lng": -115.1744, "address": "3570 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "Mid Strip"},
-    "Casino Royale": {"lat": 36.1200, "lng": -115.1721, "address": "3411 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "Mid Strip"},
-    "Circus Circus": {"lat": 36.1367, "lng": -115.1631, "address": "2880 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "North Strip"},
-    "Cosmopolitan": {"lat": 36.1095, "lng": -115.1742, "address": "3708 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "Mid Strip"},
-    "Encore": {"lat": 36.1289, "lng": -115.1650, "address": "3121 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "North Strip"},
-    "Excalibur": {"lat": 36.0987, "lng": -115.1754, "address": "3850 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "South Strip"},
-    "Fashion Show Mall": {"lat": 36.1268, "lng": -115.1700, "address": "3200 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "North Strip"},
-    "Flamingo": {"lat": 36.1162, "lng": -115.1714, "address": "3555 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "Mid Strip"},
-    "Fontainebleau": {"lat": 36.1361, "lng": -115.1568, "address": "2777 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "North Strip"},
-    "Four Seasons": {"lat": 36.0909, "lng": -115.1753, "address": "3960 Las Vegas Blvd S, Las Vegas, NV 89119", "area": "South Strip"},
-    "Hard Rock": {"lat": 36.1246, "lng": -115.1679, "address": "3580 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "Mid Strip"},
-    "Harrah's": {"lat": 36.1190, "lng": -115.1726, "address": "3475 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "Mid Strip"},
-    "Horseshoe": {"lat": 36.1190, "lng": -115.1726, "address": "3475 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "Mid Strip"},
-    "Luxor": {"lat": 36.0955, "lng": -115.1761, "address": "3900 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "South Strip"},
-    "Mandalay Bay": {"lat": 36.0909, "lng": -115.1743, "address": "3950 Las Vegas Blvd S, Las Vegas, NV 89119", "area": "South Strip"},
-    "MGM Grand": {"lat": 36.1024, "lng": -115.1698, "address": "3799 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "South Strip"},
-    "New York New York": {"lat": 36.1022, "lng": -115.1745, "address": "3790 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "South Strip"},
-    "NoMad": {"lat": 36.1028, "lng": -115.1709, "address": "3772 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "South Strip"},
-    "Palazzo": {"lat": 36.1228, "lng": -115.1693, "address": "3325 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "North Strip"},
-    "Paris": {"lat": 36.1125, "lng": -115.1707, "address": "3655 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "Mid Strip"},
-    "Park MGM": {"lat": 36.1028, "lng": -115.1709, "address": "3770 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "South Strip"},
-    "Planet Hollywood": {"lat": 36.1097, "lng": -115.1708, "address": "3663 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "Mid Strip"},
-    "Resorts World": {"lat": 36.1380, "lng": -115.1652, "address": "3000 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "North Strip"},
-    "Sahara": {"lat": 36.1413, "lng": -115.1567, "address": "2535 Las Vegas Blvd S, Las Vegas, NV 89104", "area": "North Strip"},
-    "The Cromwell": {"lat": 36.1168, "lng": -115.1722, "address": "3595 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "Mid Strip"},
-    "The LINQ": {"lat": 36.1176, "lng": -115.1710, "address": "3535 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "Mid Strip"},
-    "The Palazzo": {"lat": 36.1228, "lng": -115.1693, "address": "3325 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "North Strip"},
-    "The Signature": {"lat": 36.1024, "lng": -115.1665, "address": "145 E Harmon Ave, Las Vegas, NV 89109", "area": "South Strip"},
-    "The STRAT": {"lat": 36.1474, "lng": -115.1557, "address": "2000 Las Vegas Blvd S, Las Vegas, NV 89104", "area": "North Strip"},
-    "The Strip": {"lat": 36.1147, "lng": -115.1728, "address": "Las Vegas Blvd S, Las Vegas, NV 89109", "area": "Mid Strip"},
-    "The Venetian": {"lat": 36.1212, "lng": -115.1697, "address": "3355 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "North Strip"},
-    "Treasure Island": {"lat": 36.1247, "lng": -115.1709, "address": "3300 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "North Strip"},
-    "Tropicana": {"lat": 36.1012, "lng": -115.1730, "address": "3801 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "South Strip"},
-    "Trump": {"lat": 36.1270, "lng": -115.1686, "address": "2000 Fashion Show Dr, Las Vegas, NV 89109", "area": "North Strip"},
-    "Vdara": {"lat": 36.1080, "lng": -115.1773, "address": "2600 W Harmon Ave, Las Vegas, NV 89158", "area": "Mid Strip"},
-    "W Las Vegas": {"lat": 36.1024, "lng": -115.1665, "address": "3950 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "South Strip"},
-    "Waldorf Astoria": {"lat": 36.1070, "lng": -115.1755, "address": "3752 Las Vegas Blvd S, Las Vegas, NV 89158", "area": "Mid Strip"},
-    "Wynn": {"lat": 36.1264, "lng": -115.1660, "address": "3131 Las Vegas Blvd S, Las Vegas, NV 89109", "area": "North Strip"},
-    # Downtown & Off-Strip
-    "Downtown Grand": {"lat": 36.1699, "lng": -115.1424, "address": "206 N 3rd St, Las Vegas, NV 89101", "area": "Downtown"},
-    "Golden Nugget": {"lat": 36.1708, "lng": -115.1445, "address": "129 E Fremont St, Las Vegas, NV 89101", "area": "Downtown"},
-    "Circa": {"lat": 36.1712, "lng": -115.1461, "address": "8 Fremont St, Las Vegas, NV 89101", "area": "Downtown"},
-    "Palms": {"lat": 36.1145, "lng": -115.1848, "address": "4321 W Flamingo Rd, Las Vegas, NV 89103", "area": "Off-Strip"},
-    "Rio": {"lat": 36.1167, "lng": -115.1878, "address": "3700 W Flamingo Rd, Las Vegas, NV 89103", "area": "Off-Strip"},
-    "Durango": {"lat": 36.1464, "lng": -115.2797, "address": "5770 S Durango Dr, Las Vegas, NV 89113", "area": "Off-Strip"},
-    "M Resort": {"lat": 36.0125, "lng": -115.1559, "address": "12300 Las Vegas Blvd S, Henderson, NV 89044", "area": "Off-Strip"},
-    "Red Rock": {"lat": 36.1696, "lng": -115.3120, "address": "11011 W Charleston Blvd, Las Vegas, NV 89135", "area": "Off-Strip"},
-    "Silverton": {"lat": 36.0765, "lng": -115.1863, "address": "3333 Blue Diamond Rd, Las Vegas, NV 89139", "area": "Off-Strip"},
-    "AREA15": {"lat": 36.1262, "lng": -115.1943, "address": "3215 S Rancho Dr, Las Vegas, NV 89102", "area": "Off-Strip"},
-}
-
-# Extended property detection patterns for page text matching
-# Maps text patterns to canonical property names
-PROPERTY_PATTERNS = [
-    # Strip properties - most specific first
-    (r'(?:at |inside |in )(?:the )?Encore(?:\s|,|\.|$)', 'Encore'),
-    (r'(?:at |inside |in )(?:the )?Wynn(?:\s|,|\.|$)', 'Wynn'),
-    (r'(?:at |inside |in )(?:the )?Bellagio(?:\s|,|\.|$)', 'Bellagio'),
-    (r'(?:at |inside |in )(?:the )?Aria(?:\s|,|\.|$)', 'Aria'),
-    (r'(?:at |inside |in )(?:the )?Cosmopolitan(?:\s|,|\.|$)', 'Cosmopolitan'),
-    (r'(?:at |inside |in )(?:the )?MGM Grand(?:\s|,|\.|$)', 'MGM Grand'),
-    (r'(?:at |inside |in )(?:the )?Mandalay Bay(?:\s|,|\.|$)', 'Mandalay Bay'),
-    (r'(?:at |inside |in )(?:the )?Caesars Palace(?:\s|,|\.|$)', 'Caesars Palace'),
-    (r'(?:at |inside |in )(?:the )?Venetian(?:\s|,|\.|$)', 'The Venetian'),
-    (r'(?:at |inside |in )(?:the )?Palazzo(?:\s|,|\.|$)', 'The Palazzo'),
-    (r'(?:at |inside |in )(?:the )?Paris(?:\s|,|\.|$)', 'Paris'),
-    (r'(?:at |inside |in )(?:the )?Planet Hollywood(?:\s|,|\.|$)', 'Planet Hollywood'),
-    (r'(?:at |inside |in )(?:the )?Flamingo(?:\s|,|\.|$)', 'Flamingo'),
-    (r'(?:at |inside |in )(?:the )?LINQ(?:\s|,|\.|$)', 'The LINQ'),
-    (r'(?:at |inside |in )(?:the )?Cromwell(?:\s|,|\.|$)', 'The Cromwell'),
-    (r'(?:at |inside |in )(?:the )?Horseshoe(?:\s|,|\.|$)', 'Horseshoe'),
-    (r"(?:at |inside |in )(?:the )?Harrah'?s(?:\s|,|\.|$)", 'Harrah\'s'),
-    (r'(?:at |inside |in )(?:the )?Luxor(?:\s|,|\.|$)', 'Luxor'),
-    (r'(?:at |inside |in )(?:the )?Excalibur(?:\s|,|\.|$)', 'Excalibur'),
-    (r'(?:at |inside |in )(?:the )?New York.New York(?:\s|,|\.|$)', 'New York New York'),
-    (r'(?:at |inside |in )(?:the )?Park MGM(?:\s|,|\.|$)', 'Park MGM'),
-    (r'(?:at |inside |in )(?:the )?Treasure Island(?:\s|,|\.|$)', 'Treasure Island'),
-    (r'(?:at |inside |in )(?:the )?Circus Circus(?:\s|,|\.|$)', 'Circus Circus'),
-    (r'(?:at |inside |in )(?:the )?STRAT(?:\s|,|\.|$)', 'The STRAT'),
-    (r'(?:at |inside |in )(?:the )?Resorts World(?:\s|,|\.|$)', 'Resorts World'),
-    (r'(?:at |inside |in )(?:the )?Fontainebleau(?:\s|,|\.|$)', 'Fontainebleau'),
-    (r'(?:at |inside |in )(?:the )?Sahara(?:\s|,|\.|$)', 'Sahara'),
-    (r'(?:at |inside |in )(?:the )?Tropicana(?:\s|,|\.|$)', 'Tropicana'),
-    # Downtown
-    (r'(?:at |inside |in )(?:the )?Golden Nugget(?:\s|,|\.|$)', 'Golden Nugget'),
-    (r'(?:at |inside |in )(?:the )?Downtown Grand(?:\s|,|\.|$)', 'Downtown Grand'),
-    (r'(?:at |inside |in )(?:the )?Circa(?:\s|,|\.|$)', 'Circa'),
-    (r'Fremont Street', 'Downtown'),
-    # Off-Strip
-    (r'(?:at |inside |in )(?:the )?Palms(?:\s|,|\.|$)', 'Palms'),
-    (r'(?:at |inside |in )(?:the )?Rio(?:\s|,|\.|$)', 'Rio'),
-    (r'AREA ?15', 'AREA15'),
-]
-
-
-def fetch_page(url, delay=REQUEST_DELAY):
-    """Fetch a page with rate limiting."""
-    time.sleep(delay)
-    try:
-        resp = requests.get(url, headers=HEADERS, timeout=30)
-        resp.raise_for_status()
-        return BeautifulSoup(resp.text, "lxml")
-    except requests.RequestException as e:
-        print(f"    [ERROR] {url}: {e}")
-        return None
+# Canonical property coordinates for updating location data (data/maps/properties.json)
+PROPERTIES = load_properties()
 
+PAGE_CACHE_DIR = PROJECT_ROOT / ".cache" / "pages"
+CHECKPOINT_DIR = PROJECT_ROOT / ".checkpoints"
 
-def detect_property(text):
-    """Detect which property a venue belongs to from page text.
-
-    Only uses the "at/inside/in" prefix patterns to avoid false positives
-    from property names appearing in site navigation or ads.
-    """
-    for pattern, prop_name in PROPERTY_PATTERNS:
-        if re.search(pattern, text, re.I):
-            return prop_name
-    return None
-
+# Shared rate-limited session; replaced in main() according to the command line
+FETCHER = Fetcher(HEADERS, cache=PageCache(PAGE_CACHE_DIR))
 
-def detect_property_from_meta(meta_text):
-    """Detect property from meta description - more reliable than full page text.
 
-    Uses broader patterns since meta descriptions are short and specific.
-    """
-    if not meta_text:
+def fetch_page(url):
+    """Fetch and parse a page through the shared rate-limited session."""
+    html = FETCHER.get(url)
+    if html is None:
         return None
-
-    # Check for explicit property mentions in meta description
-    prop_names_to_check = [
-        ('Encore', 'Encore'), ('Wynn', 'Wynn'), ('Bellagio', 'Bellagio'),
-        ('Cosmopolitan', 'Cosmopolitan'), ('MGM Grand', 'MGM Grand'),
-        ('Mandalay Bay', 'Mandalay Bay'), ('Caesars Palace', 'Caesars Palace'),
-        ('Venetian', 'The Venetian'), ('Palazzo', 'The Palazzo'),
-        ('Paris Las Vegas', 'Paris'), ('Paris Hotel', 'Paris'),
-        ('Planet Hollywood', 'Planet Hollywood'), ('Flamingo', 'Flamingo'),
-        ('LINQ', 'The LINQ'), ('Cromwell', 'The Cromwell'),
-        ('Horseshoe', 'Horseshoe'), ("Harrah's", "Harrah's"),
-        ('Luxor', 'Luxor'), ('Excalibur', 'Excalibur'),
-        ('New York-New York', 'New York New York'), ('New York New York', 'New York New York'),
-        ('Park MGM', 'Park MGM'), ('Treasure Island', 'Treasure Island'),
-        ('Circus Circus', 'Circus Circus'), ('STRAT', 'The STRAT'),
-        ('Resorts World', 'Resorts World'), ('Fontainebleau', 'Fontainebleau'),
-        ('Sahara', 'Sahara'), ('Golden Nugget', 'Golden Nugget'),
-        ('Palms', 'Palms'), ('Rio', 'Rio'), ('Circa', 'Circa'),
-        ('Downtown Grand', 'Downtown Grand'), ('AREA15', 'AREA15'),
-    ]
-    for search_name, canonical in prop_names_to_check:
-        if search_name.lower() in meta_text.lower():
-            return canonical
-    return None
+    return BeautifulSoup(html, "lxml")
 
 
 def extract_content_text(soup):
@@ -221,10 +93,13 @@ def extract_content_text(soup):
 
 
 def scrape_venue_details(url):
-    """Scrape a SmarterVegas venue page for description, property, phone, price."""
+    """Scrape a SmarterVegas venue page for description, property, phone, price.
+
+    Returns None if the page could not be fetched, {} if it has no details.
+    """
     soup = fetch_page(url)
     if not soup:
-        return {}
+        return None
 
     details = {}
 
@@ -325,8 +200,7 @@ def update_poi_file(filepath, details):
         poi['updated_at'] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
         if 'smartervegas_enriched' not in poi.get('data_sources', []):
             poi.setdefault('data_sources', []).append('smartervegas_enriched')
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(poi, f, indent=2, ensure_ascii=False)
+        atomic_write_json(filepath, poi)
 
     return changed
 
@@ -351,53 +225,116 @@ def get_venue_url(poi):
     return None
 
 
-def enrich_category(category_dir, tbd_only=False):
-    """Enrich all POIs in a category directory."""
+def scrape_venue_details_safe(url):
+    """scrape_venue_details() that reports errors instead of aborting the run."""
+    try:
+        return scrape_venue_details(url), None
+    except Exception as e:
+        return None, e
+
+
+def enrich_category(category_dir, tbd_only=False, journal=None, shard=None, retry_failures=False,
+                    manifest=None):
+    """Enrich all POIs in a category directory.
+
+    Candidate files are collected first; their venue pages are then scraped
+    concurrently and each file is updated as its result comes back. With a
+    journal, POIs whose file is unchanged since they were last handled are
+    skipped and every outcome is checkpointed. `shard` is (index, count);
+    with `retry_failures` only POIs that failed last time are processed.
+    Updated files are re-indexed in `manifest`, if given.
+    """
     enriched = 0
     skipped = 0
     failed = 0
+    resumed = 0
     total = 0
 
+    retry_ids = journal.failed_ids() if journal and retry_failures else None
+    candidates = []
     for root, dirs, files in os.walk(category_dir):
         json_files = [f for f in files if f.endswith('.json')]
         for filename in sorted(json_files):
             filepath = os.path.join(root, filename)
             try:
+                content_hash = file_hash(filepath)
                 with open(filepath, 'r', encoding='utf-8') as f:
                     poi = json.load(f)
-            except (json.JSONDecodeError, ValueError):
+            except (OSError, json.JSONDecodeError, ValueError):
+                continue
+
+            poi_id = poi.get('id', filepath)
+            if shard and shard_of(poi_id, shard[1]) != shard[0]:
+                continue
+            if retry_ids is not None and poi_id not in retry_ids:
                 continue
 
             total += 1
 
+            if journal and journal.is_current(poi_id, content_hash):
+                resumed += 1
+                continue
+
             if not needs_enrichment(poi, tbd_only):
                 skipped += 1
+                if journal:
+                    journal.record(poi_id, SKIPPED, content_hash)
                 continue
 
             url = get_venue_url(poi)
             if not url:
                 skipped += 1
+                if journal:
+                    journal.record(poi_id, SKIPPED, content_hash)
                 continue
 
-            name = poi.get('name', filename)
-            prop = poi.get('casino_property', 'TBD')
-            details = scrape_venue_details(url)
-
-            if details:
-                updated = update_poi_file(filepath, details)
-                if updated:
-                    new_prop = details.get('property', prop)
-                    desc_preview = (details.get('description', '')[:60] + '...') if details.get('description') else 'no desc'
-                    print(f"    [UPDATED] {name} | {prop} -> {new_prop} | {desc_preview}")
-                    enriched += 1
-                else:
-                    skipped += 1
+            candidates.append((filepath, poi, url))
+
+    if resumed:
+        print(f"  Resuming: {resumed} POIs already done in an earlier run")
+    print(f"  Scraping {len(candidates)} venue pages "
+          f"({FETCHER.max_workers} workers, {FETCHER.rate:g} req/s per host)...")
+    results = FETCHER.map(scrape_venue_details_safe, [url for _, _, url in candidates])
+    for (filepath, poi, url), (details, error) in zip(candidates, results):
+        poi_id = poi.get('id', filepath)
+        name = poi.get('name', os.path.basename(filepath))
+        prop = poi.get('casino_property', 'TBD')
+
+        if details is not None:
+            # A fetched page without details is done too; retrying it won't help
+            updated = update_poi_file(filepath, details) if details else False
+            if updated and manifest:
+                manifest.update(filepath)
+            if updated:
+                new_prop = details.get('property', prop)
+                desc_preview = (details.get('description', '')[:60] + '...') if details.get('description') else 'no desc'
+                print(f"    [UPDATED] {name} | {prop} -> {new_prop} | {desc_preview}")
+                enriched += 1
             else:
-                failed += 1
+                skipped += 1
+            if journal:
+                journal.record(poi_id, DONE, file_hash(filepath))
+        else:
+            failed += 1
+            if error:
+                print(f"    [ERROR] {name}: {error}")
+            if journal:
+                journal.record(poi_id, FAILED, error=error or f"no details from {url}")
 
     return total, enriched, skipped, failed
 
 
+def parse_shard(value):
+    """'2/4' -> (2, 4)."""
+    try:
+        index, count = (int(v) for v in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError("shard must look like INDEX/COUNT, e.g. 0/4")
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError("shard index must be in 0..COUNT-1")
+    return index, count
+
+
 def main():
     parser = argparse.ArgumentParser(description='Enrich POI data from SmarterVegas')
     parser.add_argument('--category', choices=['restaurants', 'shows', 'nightlife',
@@ -405,16 +342,41 @@ def main():
                         default='all', help='Category to enrich')
     parser.add_argument('--tbd-only', action='store_true',
                         help='Only fix POIs with TBD/generic property names')
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY,
+                        help=f'Parallel page fetches (default {MAX_CONCURRENCY})')
+    parser.add_argument('--rate', type=float, default=REQUESTS_PER_SECOND,
+                        help=f'Max requests per second per host (default {REQUESTS_PER_SECOND:.2g}; '
+                             'raise only for sites that allow it)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Do not read or write the page cache ({PAGE_CACHE_DIR})')
+    parser.add_argument('--offline', action='store_true',
+                        help='Replay from the page cache only; never touch the network')
+    parser.add_argument('--shard', type=parse_shard, default=None,
+                        help='Process only shard INDEX/COUNT of the POIs (for parallel workers)')
+    parser.add_argument('--retry-failures', action='store_true',
+                        help='Only retry POIs that failed in earlier runs')
+    parser.add_argument('--restart', action='store_true',
+                        help="Discard this shard's checkpoints and process its POIs again")
     args = parser.parse_args()
+    if args.offline and args.no_cache:
+        parser.error('--offline needs the page cache')
+
+    global FETCHER
+    FETCHER = Fetcher(HEADERS, max_workers=args.concurrency, rate=args.rate,
+                      cache=None if args.no_cache else PageCache(PAGE_CACHE_DIR),
+                      offline=args.offline)
 
     print("=" * 70)
     print("Sin City Travels - POI Enrichment")
     print(f"Category: {args.category}")
     print(f"TBD-only mode: {args.tbd_only}")
+    print(f"Concurrency: {args.concurrency} workers, {args.rate:g} req/s per host")
+    print(f"Page cache: {'off' if args.no_cache else PAGE_CACHE_DIR}{' (offline replay)' if args.offline else ''}")
     print("=" * 70)
 
     grand_total = 0
     grand_enriched = 0
+    manifest = Manifest(DATA_DIR)
 
     categories = {
         'restaurants': DATA_DIR / 'restaurants',
@@ -430,7 +392,24 @@ def main():
             continue
 
         print(f"\n=== Enriching {cat_name} ===")
-        total, enriched, skipped, failed = enrich_category(str(cat_dir), args.tbd_only)
+        # One journal per category, mode and shard; resume reads all shards' journals
+        base = f"enrich_{cat_name}{'_tbd' if args.tbd_only else ''}"
+        suffix = f".shard{args.shard[0]}of{args.shard[1]}" if args.shard else ""
+        pattern = CHECKPOINT_DIR / f"{base}.*jsonl"
+        journal_path = CHECKPOINT_DIR / f"{base}{suffix}.jsonl"
+        if args.restart:
+            # Only this worker's journal; other shards may still be running
+            if journal_path.exists():
+                journal_path.unlink()
+            pattern = journal_path
+        journal = Journal(journal_path, pattern=pattern)
+        try:
+            total, enriched, skipped, failed = enrich_category(
+                str(cat_dir), args.tbd_only, journal=journal,
+                shard=args.shard, retry_failures=args.retry_failures, manifest=manifest)
+        finally:
+            journal.close()
+            manifest.save()
         grand_total += total
         grand_enriched += enriched
         print(f"  Total: {total} | Enriched: {enriched} | Skipped: {skipped} | Failed: {failed}")
@@ -0,0 +1,206 @@
+"""
+Sin City Travels - Concurrent page fetcher
+Shared by scrape_pois.py and enrich_pois.py.
+
+One keep-alive requests.Session is shared by a pool of worker threads. Every
+request first takes a token from its host's token bucket, so the politeness
+budget (requests per second per host) holds no matter how many workers are
+running. The default budget is the old one request every REQUEST_DELAY
+seconds with no burst; faster rates are opt-in via the scripts' --rate.
+Connection errors, timeouts, 429s and 5xx responses are retried with
+jittered exponential backoff, honouring Retry-After.
+
+With a PageCache, bodies are kept on disk with their ETag/Last-Modified and
+re-runs send conditional GETs; a 304 is served from disk. In offline mode
+nothing touches the network and only cached pages are returned, so parsing
+changes can be iterated on without any network time.
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MAX_CONCURRENCY = 8
+REQUEST_DELAY = 1.5  # seconds between requests to one host, as before concurrent fetching
+REQUESTS_PER_SECOND = 1 / REQUEST_DELAY  # per host
+BURST = 1
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0  # seconds; attempt n waits up to BACKOFF_BASE * 2**n
+BACKOFF_MAX = 30.0
+TIMEOUT = 30
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class PageCache:
+    """On-disk page cache keyed by URL: <sha256>.html body plus <sha256>.json headers."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = str(cache_dir)
+
+    def _path(self, url, ext):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{ext}")
+
+    def load(self, url):
+        """(body, meta) for a cached URL, or (None, None)."""
+        try:
+            with open(self._path(url, 'json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(self._path(url, 'html'), 'r', encoding='utf-8') as f:
+                return f.read(), meta
+        except (OSError, ValueError):
+            return None, None
+
+    def store(self, url, body, etag=None, last_modified=None):
+        meta = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        # Body first, then meta: a reader never sees meta without its body
+        for ext, content in (('html', body), ('json', json.dumps(meta, indent=2))):
+            path = self._path(url, ext)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+    def touch(self, url):
+        """Record a successful revalidation (304) of a cached URL."""
+        body, meta = self.load(url)
+        if body is not None:
+            self.store(url, body, meta.get('etag'), meta.get('last_modified'))
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class Fetcher:
+    """Rate-limited, retrying HTTP GETs over a shared session and thread pool."""
+
+    def __init__(self, headers=None, max_workers=MAX_CONCURRENCY, rate=REQUESTS_PER_SECOND,
+                 burst=BURST, retries=MAX_RETRIES, timeout=TIMEOUT, cache=None, offline=False):
+        self.max_workers = max_workers
+        self.cache = cache
+        self.offline = offline
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+
+    def _bucket(self, url):
+        host = urlsplit(url).netloc
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def _backoff(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(BACKOFF_MAX, int(retry_after)))
+        time.sleep(delay)
+
+    def get(self, url):
+        """Page body for url, from the cache when unchanged; None on failure.
+
+        Offline, only cached bodies are returned.
+        """
+        body, meta = self.cache.load(url) if self.cache else (None, None)
+        if self.offline:
+            if body is None:
+                print(f"  [OFFLINE] Not cached: {url}")
+            return body
+
+        headers = {}
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        resp = self._request(url, headers)
+        if resp is None:
+            return None
+        if resp.status_code == 304 and body is not None:
+            self.cache.touch(url)
+            return body
+        if self.cache:
+            self.cache.store(url, resp.text, resp.headers.get('ETag'), resp.headers.get('Last-Modified'))
+        return resp.text
+
+    def _request(self, url, headers):
+        """Rate-limited GET with retries; returns the Response or None."""
+        bucket = self._bucket(url)
+        for attempt in range(self.retries + 1):
+            bucket.acquire()
+            try:
+                resp = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.retries:
+                    print(f"  [ERROR] Failed to fetch {url}: {e}")
+                    return None
+                self._backoff(attempt)
+                continue
+
+            if resp.status_code in RETRY_STATUSES and attempt < self.retries:
+                self._backoff(attempt, resp.headers.get('Retry-After'))
+                continue
+            try:
+                resp.raise_for_status()
+            except requests.HTTPError as e:
+                print(f"  [ERROR] Failed to fetch {url}: {e}")
+                return None
+            return resp
+        return None
+
+    def map(self, func, items):
+        """Apply func to items on the worker pool; yields results in input order."""
+        items = list(items)
+        if not items:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            yield from pool.map(func, items)
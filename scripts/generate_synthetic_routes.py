@@ -5,22 +5,53 @@ Generate synthetic navigation data for pathfinding model training
 Creates:
 1. Navigation nodes (entrances, junctions, POI connections)
 2. Navigation edges (walkways, stairs, elevators)
-3. Synthetic routes between POIs
+3. Synthetic routes between POIs: shortest paths over the generated graph
+
+Nodes and edges are bulk-loaded with COPY. Edges come from one vectorized
+k-nearest-neighbour query per property against a KD-tree of the nodes'
+indoor coordinates, so edge generation scales to thousands of nodes per
+property. An edge found from both ends is stored once (edges are
+bidirectional).
+
+Routes are computed once nodes and edges exist for every property: each POI
+is attached to its nearest node and a multi-source Dijkstra from the route
+start nodes gives the paths, so path_nodes, distance, time, stairs/elevator
+flags and accessibility come from real edges. Properties are spread over a
+process pool.
+
+Scale mode (--scale) builds a benchmark dataset from a seed instead:
+synthetic properties along the Strip, each a multi-floor graph (walkway
+mesh per floor, elevators/stairs/escalators linking floors by indoor_level)
+with N POIs, plus a workload of origin/destination POI pairs drawn from a
+gravity model. It is written to data/build/scale (nodes.csv, edges.csv,
+properties.jsonl, pois.jsonl, workload.jsonl, params.json) and, with --db,
+loaded into the database in place of the previous scale dataset. The same
+seed and parameters always give the same files.
 
 Usage:
     python scripts/generate_synthetic_routes.py
+    python scripts/generate_synthetic_routes.py --workers 1   (routes in this process only)
+    python scripts/generate_synthetic_routes.py --scale --nodes 20000 --floors 4 --pois 500 --seed 7
+    python scripts/generate_synthetic_routes.py --scale --db
 
 Requirements:
-    pip install psycopg2-binary numpy
+    pip install psycopg2-binary numpy scipy
 """
 
+import argparse
+import csv
+import io
+import json
 import os
 import sys
 import random
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import psycopg2
-from psycopg2.extras import execute_batch
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, dijkstra
+from scipy.spatial import cKDTree
 
 # Database connection parameters
 DB_CONFIG = {
@@ -34,8 +65,18 @@ DB_CONFIG = {
 # Constants for synthetic data generation
 NODES_PER_PROPERTY = 50  # Average number of nav nodes per property
 EDGES_PER_NODE = 3  # Average connections per node
+MIN_NEIGHBORS = 3  # Each node connects to 3-5 of its nearest neighbors
+MAX_NEIGHBORS = 5
 ROUTES_PER_PROPERTY = 100  # Synthetic routes to generate
 
+NODE_COLUMNS = ['property_id', 'node_type', 'level', 'location', 'indoor_x', 'indoor_y',
+                'indoor_level', 'name', 'accessibility_features']
+EDGE_COLUMNS = ['from_node_id', 'to_node_id', 'edge_type', 'distance_meters',
+                'estimated_time_seconds', 'accessibility_rating', 'is_bidirectional']
+ROUTE_COLUMNS = ['property_id', 'start_poi_id', 'end_poi_id', 'total_distance_meters',
+                 'estimated_time_seconds', 'path_nodes', 'has_stairs', 'has_elevator',
+                 'accessibility_score']
+
 def connect_db():
     """Connect to PostgreSQL database"""
     try:
@@ -45,6 +86,26 @@ def connect_db():
         print(f"Error connecting to database: {e}")
         sys.exit(1)
 
+def copy_escape(value):
+    """Format a value for COPY ... FROM STDIN (text format)"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (list, tuple)):
+        value = '{' + ','.join('"' + str(v).replace('\\', '\\\\').replace('"', '\\"') + '"'
+                               for v in value) + '}'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+def copy_rows(cur, table, columns, rows):
+    """Bulk-load rows (tuples in column order) with COPY"""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(copy_escape(value) for value in row) + '\n')
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
 def get_properties(cur):
     """Get all properties from database"""
     cur.execute("""
@@ -133,186 +194,273 @@ def generate_navigation_nodes(cur, property_id, property_name, center_lng, cente
         })
 
     # Insert nodes
-    execute_batch(cur, """
-        INSERT INTO navigation_nodes (
-            property_id, node_type, level, location,
-            indoor_x, indoor_y, indoor_level, name, accessibility_features
-        ) VALUES (
-            %(property_id)s, %(node_type)s, %(level)s,
-            ST_SetSRID(ST_MakePoint(%(lng)s, %(lat)s), 4326)::geography,
-            %(indoor_x)s, %(indoor_y)s, %(indoor_level)s,
-            %(name)s, %(accessibility_features)s
-        )
-    """, nodes)
+    copy_rows(cur, 'navigation_nodes', NODE_COLUMNS, [
+        (node['property_id'], node['node_type'], node['level'],
+         f"SRID=4326;POINT({node['lng']} {node['lat']})",
+         node['indoor_x'], node['indoor_y'], node['indoor_level'],
+         node['name'], node['accessibility_features'])
+        for node in nodes])
 
     print(f"  Generated {len(nodes)} navigation nodes")
     return len(nodes)
 
+def nearest_neighbor_edges(xy, connections):
+    """Undirected (i, j, distance) edges joining each node to its nearest neighbors
+
+    xy: (n, 2) indoor coordinates. connections: (n,) number of neighbors for
+    each node. Returns index arrays i < j and their distances; an edge picked
+    from both ends appears once.
+    """
+    n = len(xy)
+    k = min(int(connections.max(initial=0)) + 1, n)  # +1: the node itself
+    if k < 2:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0)
+
+    distances, neighbors = cKDTree(xy).query(xy, k=k)
+    sources = np.arange(n)[:, None]
+    # Skip the node itself (not always column 0 when nodes share a position)
+    # and keep the first `connections` of the remaining neighbors
+    others = neighbors != sources
+    keep = others & (np.cumsum(others, axis=1) <= connections[:, None])
+
+    i = np.broadcast_to(sources, neighbors.shape)[keep]
+    j = neighbors[keep]
+    distance = distances[keep]
+    low, high = np.minimum(i, j), np.maximum(i, j)
+    _, first = np.unique(low * n + high, return_index=True)
+    return low[first], high[first], distance[first]
+
+def connect_components(xy, i, j, distance):
+    """Add edges until the graph (xy, i-j edges) is connected
+
+    A kNN mesh with few neighbors often splits into islands. Each smaller
+    component, largest first, is joined to the growing main component by
+    one edge between their closest pair of nodes. Returns the edge arrays
+    with the joining edges appended.
+    """
+    n = len(xy)
+    graph = csr_matrix((np.ones(len(i)), (i, j)), shape=(n, n))
+    count, labels = connected_components(graph, directed=False)
+    if count <= 1:
+        return i, j, distance
+
+    sizes = np.bincount(labels)
+    order = np.argsort(-sizes, kind='stable')
+    main = np.flatnonzero(labels == order[0])
+    new_i, new_j, new_distance = [], [], []
+    for label in order[1:]:
+        members = np.flatnonzero(labels == label)
+        gaps, nearest = cKDTree(xy[main]).query(xy[members])
+        best = int(np.argmin(gaps))
+        a, b = int(members[best]), int(main[nearest[best]])
+        new_i.append(min(a, b))
+        new_j.append(max(a, b))
+        new_distance.append(gaps[best])
+        main = np.concatenate([main, members])
+    return (np.concatenate([i, new_i]).astype(np.int64), np.concatenate([j, new_j]).astype(np.int64),
+            np.concatenate([distance, new_distance]))
+
 def generate_navigation_edges(cur, property_id):
     """Generate edges connecting navigation nodes"""
     # Get all nodes for this property
+    # Nodes without indoor coordinates (e.g. imported by an older osm_ingest.py) can't be meshed
     cur.execute("""
-        SELECT id, node_type, indoor_x, indoor_y,
-               ST_X(location::geometry) as lng, ST_Y(location::geometry) as lat
+        SELECT id, node_type, indoor_x, indoor_y
         FROM navigation_nodes
-        WHERE property_id = %s
+        WHERE property_id = %s AND indoor_x IS NOT NULL AND indoor_y IS NOT NULL
+        ORDER BY id
     """, (property_id,))
 
     nodes = cur.fetchall()
-    edges = []
-
-    # Create a simple connectivity graph
-    # Connect each node to its nearest neighbors
-    for i, node in enumerate(nodes):
-        node_id, node_type, x, y, lng, lat = node
-
-        # Find k nearest neighbors
-        distances = []
-        for j, other_node in enumerate(nodes):
-            if i == j:
-                continue
-
-            other_id, other_type, other_x, other_y, other_lng, other_lat = other_node
-
-            # Calculate Euclidean distance in indoor coordinates
-            distance = np.sqrt((x - other_x)**2 + (y - other_y)**2)
-            distances.append((distance, j, other_id, other_type))
-
-        # Sort by distance and connect to 3-5 nearest neighbors
-        distances.sort()
-        connections = random.randint(3, min(5, len(distances)))
-
-        for k in range(connections):
-            if k >= len(distances):
-                break
-
-            distance, _, other_id, other_type = distances[k]
-
-            # Determine edge type
-            if node_type == 'elevator' or other_type == 'elevator':
-                edge_type = 'elevator'
-                time_multiplier = 2.0  # Elevators take longer
-            elif node_type == 'stairs' or other_type == 'stairs':
-                edge_type = 'stairs'
-                time_multiplier = 1.5
-            else:
-                edge_type = 'walkway'
-                time_multiplier = 1.0
-
-            # Calculate distance in meters (approximate)
-            distance_meters = distance * 5  # Rough conversion from indoor units
-
-            # Estimate walking time (average 1.4 m/s walking speed)
-            estimated_time = int((distance_meters / 1.4) * time_multiplier)
-
-            # Accessibility rating (stairs are less accessible)
-            if edge_type == 'stairs':
-                accessibility = 2
-            elif edge_type == 'elevator':
-                accessibility = 5
-            else:
-                accessibility = 5
-
-            edges.append({
-                'from_node_id': int(node_id),
-                'to_node_id': int(other_id),
-                'edge_type': edge_type,
-                'distance_meters': float(distance_meters),
-                'estimated_time_seconds': int(estimated_time),
-                'accessibility_rating': int(accessibility),
-                'is_bidirectional': True
-            })
+    if len(nodes) < 2:
+        print(f"  Generated 0 navigation edges")
+        return 0
+
+    node_ids = np.array([node[0] for node in nodes], dtype=np.int64)
+    node_types = np.array([node[1] for node in nodes], dtype=object)
+    xy = np.array([(node[2], node[3]) for node in nodes], dtype=float)
+
+    # Connect each node to 3-5 nearest neighbors (Euclidean, indoor coordinates),
+    # then join any islands so every node can reach every other
+    connections = np.minimum(
+        np.random.randint(MIN_NEIGHBORS, MAX_NEIGHBORS + 1, size=len(nodes)), len(nodes) - 1)
+    i, j, distance = connect_components(xy, *nearest_neighbor_edges(xy, connections))
+
+    # Determine edge type: elevators take longer, stairs are less accessible
+    elevator = (node_types[i] == 'elevator') | (node_types[j] == 'elevator')
+    stairs = ~elevator & ((node_types[i] == 'stairs') | (node_types[j] == 'stairs'))
+    edge_types = np.where(elevator, 'elevator', np.where(stairs, 'stairs', 'walkway'))
+    time_multiplier = np.where(elevator, 2.0, np.where(stairs, 1.5, 1.0))
+    accessibility = np.where(stairs, 2, 5)
+
+    # Calculate distance in meters (approximate)
+    distance_meters = distance * 5  # Rough conversion from indoor units
+
+    # Estimate walking time (average 1.4 m/s walking speed)
+    estimated_time = ((distance_meters / 1.4) * time_multiplier).astype(np.int64)
 
     # Insert edges
-    execute_batch(cur, """
-        INSERT INTO navigation_edges (
-            from_node_id, to_node_id, edge_type,
-            distance_meters, estimated_time_seconds,
-            accessibility_rating, is_bidirectional
-        ) VALUES (
-            %(from_node_id)s, %(to_node_id)s, %(edge_type)s,
-            %(distance_meters)s, %(estimated_time_seconds)s,
-            %(accessibility_rating)s, %(is_bidirectional)s
-        )
-    """, edges)
-
-    print(f"  Generated {len(edges)} navigation edges")
-    return len(edges)
-
-def generate_synthetic_routes(cur, property_id, property_name):
-    """Generate synthetic routes between POIs"""
-    # Get POIs for this property
-    pois = get_pois_for_property(cur, property_name)
-
-    if len(pois) < 2:
-        print(f"  Skipping routes (insufficient POIs)")
-        return 0
+    copy_rows(cur, 'navigation_edges', EDGE_COLUMNS, zip(
+        node_ids[i].tolist(), node_ids[j].tolist(), edge_types.tolist(),
+        distance_meters.tolist(), estimated_time.tolist(), accessibility.tolist(),
+        [True] * len(i)))
 
-    routes = []
+    print(f"  Generated {len(i)} navigation edges")
+    return len(i)
 
-    # Generate random routes between POIs
-    route_count = min(ROUTES_PER_PROPERTY, len(pois) * (len(pois) - 1))
+def get_route_graph(cur, property_id):
+    """Nodes [(id, lng, lat)] and edges [(from, to, distance, time, type, rating)] of a property"""
+    cur.execute("""
+        SELECT id, ST_X(location::geometry) AS lng, ST_Y(location::geometry) AS lat
+        FROM navigation_nodes
+        WHERE property_id = %s
+        ORDER BY id
+    """, (property_id,))
+    nodes = cur.fetchall()
+    cur.execute("""
+        SELECT e.from_node_id, e.to_node_id, e.distance_meters, e.estimated_time_seconds,
+               e.edge_type, e.accessibility_rating
+        FROM navigation_edges e
+        JOIN navigation_nodes n ON n.id = e.from_node_id
+        WHERE n.property_id = %s
+    """, (property_id,))
+    return nodes, cur.fetchall()
 
-    for _ in range(route_count):
-        # Pick random start and end POIs
-        start_poi = random.choice(pois)
-        end_poi = random.choice([p for p in pois if p[0] != start_poi[0]])
-
-        # Calculate straight-line distance
-        start_lng, start_lat = start_poi[3], start_poi[4]
-        end_lng, end_lat = end_poi[3], end_poi[4]
-
-        # Distance in degrees
-        distance_deg = np.sqrt((end_lng - start_lng)**2 + (end_lat - start_lat)**2)
-
-        # Convert to meters (rough approximation: 1 degree ≈ 111km)
-        distance_meters = distance_deg * 111000
-
-        # Add indoor routing overhead (1.3x longer than straight line)
-        total_distance = distance_meters * 1.3
-
-        # Estimate time (1.4 m/s walking speed)
-        estimated_time = int(total_distance / 1.4)
-
-        # Generate a simple path (random nodes)
-        # In a real system, this would use Dijkstra's algorithm
-        path_length = random.randint(5, 15)
-        path_nodes = [random.randint(1, 100) for _ in range(path_length)]
-
-        # Random accessibility features
-        has_stairs = random.random() < 0.3
-        has_elevator = random.random() < 0.5
-        accessibility_score = 3 if has_stairs else 5
-
-        routes.append({
-            'property_id': int(property_id),
-            'start_poi_id': start_poi[0],
-            'end_poi_id': end_poi[0],
-            'total_distance_meters': float(total_distance),
-            'estimated_time_seconds': int(estimated_time),
-            'path_nodes': path_nodes,
-            'has_stairs': bool(has_stairs),
-            'has_elevator': bool(has_elevator),
-            'accessibility_score': int(accessibility_score)
-        })
+def pick_route_pairs(pois):
+    """Up to ROUTES_PER_PROPERTY distinct (start, end) POI index pairs"""
+    route_count = min(ROUTES_PER_PROPERTY, len(pois) * (len(pois) - 1))
+    pairs = set()
+    while len(pairs) < route_count:
+        start, end = random.sample(range(len(pois)), 2)
+        pairs.add((start, end))
+    return sorted(pairs)
+
+def local_meters(lng, lat, origin_lat):
+    """Project lng/lat (degrees) onto a flat plane in meters around origin_lat"""
+    return np.column_stack((np.asarray(lng) * 111320 * np.cos(np.radians(origin_lat)),
+                            np.asarray(lat) * 110540))
+
+def compute_routes(property_id, nodes, edges, pois, pairs):
+    """Shortest paths between POI pairs over a property's navigation graph
+    (runs in a worker process)
+
+    Each POI is attached to its nearest navigation node with an edge. One multi-source
+    Dijkstra run from every start node gives all the routes; distance is the
+    walk to the start node, the path and the walk from the end node.
+    Returns (rows in ROUTE_COLUMNS order, number of unreachable pairs).
+    """
+    if not nodes or not edges or not pairs:
+        return [], len(pairs)
+
+    node_ids = np.array([node[0] for node in nodes], dtype=np.int64)
+    index_of = {node_id: i for i, node_id in enumerate(node_ids.tolist())}
+    edges = [edge for edge in edges if edge[0] in index_of and edge[1] in index_of]
+    if not edges:
+        return [], len(pairs)
+
+    # One weight per node pair (the shortest, if regenerated data left duplicates)
+    low = np.array([min(index_of[e[0]], index_of[e[1]]) for e in edges])
+    high = np.array([max(index_of[e[0]], index_of[e[1]]) for e in edges])
+    distance = np.array([e[2] for e in edges], dtype=float)
+    order = np.lexsort((distance, high, low))
+    _, first = np.unique(low[order] * len(nodes) + high[order], return_index=True)
+    kept = order[first]
+    # csgraph treats stored zeros as missing edges
+    weights = np.maximum(distance[kept], 1e-6)
+    graph = csr_matrix((weights, (low[kept], high[kept])), shape=(len(nodes), len(nodes)))
+    edge_info = {(int(low[k]), int(high[k])): edges[k] for k in kept.tolist()}
+
+    # Attach POIs to their nearest node that has an edge (a node added without
+    # edges, e.g. an OSM entrance imported after the mesh was built, reaches nothing)
+    linked = np.unique(np.concatenate([low, high]))
+    origin_lat = float(np.mean([node[2] for node in nodes]))
+    node_xy = local_meters([nodes[k][1] for k in linked], [nodes[k][2] for k in linked], origin_lat)
+    poi_xy = local_meters([p[3] for p in pois], [p[4] for p in pois], origin_lat)
+    access_meters, nearest = cKDTree(node_xy).query(poi_xy)
+    attached = linked[nearest]
+
+    sources = sorted({int(attached[start]) for start, _ in pairs})
+    row_of = {source: row for row, source in enumerate(sources)}
+    dist, predecessors = dijkstra(graph, directed=False, indices=sources, return_predecessors=True)
+
+    rows = []
+    unreachable = 0
+    for start, end in pairs:
+        source, target = int(attached[start]), int(attached[end])
+        row = row_of[source]
+        if not np.isfinite(dist[row, target]):
+            unreachable += 1
+            continue
+
+        path = [target]
+        while path[-1] != source:
+            path.append(int(predecessors[row, path[-1]]))
+        path.reverse()
+
+        access = float(access_meters[start] + access_meters[end])
+        total_distance = access
+        estimated_time = access / 1.4
+        edge_types = set()
+        accessibility_score = 5
+        for a, b in zip(path, path[1:]):
+            _, _, edge_distance, edge_time, edge_type, rating = edge_info[(min(a, b), max(a, b))]
+            total_distance += edge_distance
+            estimated_time += edge_time
+            edge_types.add(edge_type)
+            accessibility_score = min(accessibility_score, rating)
+
+        rows.append((
+            int(property_id), pois[start][0], pois[end][0],
+            float(total_distance), int(estimated_time),
+            node_ids[path].tolist(),
+            'stairs' in edge_types, 'elevator' in edge_types, int(accessibility_score)))
+    return rows, unreachable
+
+def compute_routes_task(task):
+    return task[0], compute_routes(*task)
+
+def generate_synthetic_routes(conn, properties, workers=None):
+    """Compute routes for every property on a process pool and COPY them in
+
+    Graphs are read here (one connection); workers only compute. Results are
+    written and committed per property as they finish.
+    """
+    cur = conn.cursor()
+    tasks = []
+    for prop_id, prop_name, _, _ in properties:
+        pois = get_pois_for_property(cur, prop_name)
+        if len(pois) < 2:
+            print(f"  {prop_name}: skipping routes (insufficient POIs)")
+            continue
+        nodes, edges = get_route_graph(cur, prop_id)
+        tasks.append((prop_id, nodes, edges, pois, pick_route_pairs(pois)))
+
+    names = {prop_id: prop_name for prop_id, prop_name, _, _ in properties}
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(tasks) <= 1:
+        results = map(compute_routes_task, tasks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = (future.result() for future in
+                   as_completed([pool.submit(compute_routes_task, task) for task in tasks]))
+
+    total = 0
+    try:
+        for prop_id, (rows, unreachable) in results:
+            copy_rows(cur, 'synthetic_routes', ROUTE_COLUMNS, rows)
+            conn.commit()
+            total += len(rows)
+            note = f" ({unreachable} pairs not connected)" if unreachable else ""
+            print(f"  {names[prop_id]}: {len(rows)} routes{note}")
+    finally:
+        if pool:
+            pool.shutdown()
+    cur.close()
+    return total
 
-    # Insert routes
-    execute_batch(cur, """
-        INSERT INTO synthetic_routes (
-            property_id, start_poi_id, end_poi_id,
-            total_distance_meters, estimated_time_seconds,
-            path_nodes, has_stairs, has_elevator, accessibility_score
-        ) VALUES (
-            %(property_id)s, %(start_poi_id)s, %(end_poi_id)s,
-            %(total_distance_meters)s, %(estimated_time_seconds)s,
-            %(path_nodes)s, %(has_stairs)s, %(has_elevator)s, %(accessibility_score)s
-        )
-    """, routes)
-
-    print(f"  Generated {len(routes)} synthetic routes")
-    return len(routes)
-
-def generate_all_synthetic_data():
+def generate_all_synthetic_data(workers=None):
     """Generate all synthetic navigation data"""
     print("Connecting to database...")
     conn = connect_db()
@@ -324,7 +472,6 @@ def generate_all_synthetic_data():
 
     total_nodes = 0
     total_edges = 0
-    total_routes = 0
 
     for prop_id, prop_name, lng, lat in properties:
         print(f"🏨 {prop_name}")
@@ -342,16 +489,16 @@ def generate_all_synthetic_data():
         edges = generate_navigation_edges(cur, prop_id)
         total_edges += edges
 
-        # Generate synthetic routes
-        routes = generate_synthetic_routes(cur, prop_id, prop_name)
-        total_routes += routes
-
         # Commit after each property
         conn.commit()
         print()
 
+    # Generate synthetic routes (shortest paths, all properties in parallel)
+    print("🧭 Computing routes...")
+    total_routes = generate_synthetic_routes(conn, properties, workers)
+
     # Print summary
-    print("="*60)
+    print("\n" + "="*60)
     print("📊 Generation Summary")
     print("="*60)
     print(f"Properties processed: {len(properties)}")
@@ -366,17 +513,383 @@ def generate_all_synthetic_data():
     print("\n✅ Synthetic data generation complete!")
     print("\n💡 Next steps:")
     print("   1. Query synthetic routes for ML training data")
-    print("   2. Implement pathfinding algorithm (A*, Dijkstra)")
-    print("   3. Integrate with Google Maps API for outdoor routing")
+    print("   2. Integrate with Google Maps API for outdoor routing")
+
+# ─── Scale mode: reproducible synthetic datasets for benchmarking ───
+
+SCALE_OUT_DIR = Path(__file__).parent.parent / "data" / "build" / "scale"
+SCALE_PROPERTIES = 31
+SCALE_NODES = 5000  # navigation nodes per property, all floors
+SCALE_FLOORS = 3
+SCALE_POIS = 200  # POIs per property
+SCALE_REQUESTS = 100000
+SYNTHETIC_POI_PREFIX = 'syn_'
+
+INDOOR_EXTENT = 100  # indoor coordinates run from -100 to 100 (about 500 m each way)
+INDOOR_UNIT_METERS = 5  # same rough conversion as generate_navigation_edges
+GRAVITY_BETA = 2.0  # trip probability falls off with distance ** beta
+GRAVITY_MIN_METERS = 150.0  # distance used within a property
+
+# Vertical connectors: (nodes per floor per connector, minimum per property,
+# meters, seconds and accessibility rating per floor climbed)
+CONNECTORS = {
+    'elevator': (500, 2, 5.0, 35, 5),
+    'stairs': (400, 2, 10.0, 20, 2),
+    'escalator': (800, 1, 10.0, 15, 4),
+}
+
+# (category, subcategory, share of POIs)
+SCALE_CATEGORIES = [
+    ('restaurant', 'restaurant', 0.35), ('nightlife', 'bar', 0.15),
+    ('shopping', 'retail', 0.20), ('entertainment', 'show', 0.10),
+    ('attraction', 'attraction', 0.10), ('pool_spa', 'spa', 0.05), ('casino', 'casino', 0.05),
+]
+
+# The Strip, south to north: scale properties are spread along this line
+STRIP_SOUTH = (36.0880, -115.1760)
+STRIP_NORTH = (36.1470, -115.1560)
+
+def scale_rng(seed, *stream):
+    """Independent, reproducible random stream for (seed, stream...)"""
+    return np.random.default_rng(np.random.SeedSequence([seed, *stream]))
+
+def scale_properties(count, seed):
+    """Synthetic properties evenly spaced along the Strip, with a little jitter"""
+    rng = scale_rng(seed, 0)
+    properties = []
+    for i in range(count):
+        t = (i + 0.5) / count
+        lat = STRIP_SOUTH[0] + t * (STRIP_NORTH[0] - STRIP_SOUTH[0]) + rng.uniform(-0.001, 0.001)
+        lng = STRIP_SOUTH[1] + t * (STRIP_NORTH[1] - STRIP_SOUTH[1]) + rng.uniform(-0.002, 0.002)
+        area = 'South Strip' if t < 1 / 3 else 'Mid Strip' if t < 2 / 3 else 'North Strip'
+        properties.append({'id': i + 1, 'name': f"Synthetic Property {i + 1:03d}",
+                           'lat': float(lat), 'lng': float(lng), 'area': area})
+    return properties
+
+def indoor_to_lnglat(prop, x, y):
+    """Indoor coordinates -> lng/lat around the property's location"""
+    meters_per_deg_lng = 111320 * np.cos(np.radians(prop['lat']))
+    return (prop['lng'] + x * INDOOR_UNIT_METERS / meters_per_deg_lng,
+            prop['lat'] + y * INDOOR_UNIT_METERS / 110540)
+
+def scale_property_graph(prop, node_count, floors, seed, first_node_id):
+    """Multi-floor navigation graph for one property
+
+    Each floor gets junctions and a kNN walkway mesh, joined into one
+    component per floor by connect_components; elevators, stairs and
+    escalators have a node at the same position on every floor, joined floor
+    to floor by vertical edges. Floor 0 also gets 4 entrances. Returns
+    (nodes, edges) as column dicts of numpy arrays / lists.
+    """
+    rng = scale_rng(seed, 1, prop['id'])
+    per_floor = max(node_count // floors, 10)
+
+    # Connector positions are shared by every floor
+    connector_types, connector_xy = [], []
+    for node_type, (nodes_per, minimum, _, _, _) in CONNECTORS.items():
+        count = max(minimum, per_floor // nodes_per)
+        connector_types += [node_type] * count
+        connector_xy.append(rng.uniform(-0.8, 0.8, (count, 2)) * INDOOR_EXTENT)
+    connector_xy = np.vstack(connector_xy)
+    entrance_xy = np.array([(1, 0), (0, 1), (-1, 0), (0, -1)], dtype=float) * INDOOR_EXTENT
+
+    types, names, xy, levels = [], [], [], []
+    connector_ids = np.empty((len(connector_types), floors), dtype=np.int64)
+    edges_from, edges_to, edge_types, edge_meters, edge_seconds, edge_rating = [], [], [], [], [], []
+    next_id = first_node_id
+    for floor in range(floors):
+        fixed_xy = [connector_xy] + ([entrance_xy] if floor == 0 else [])
+        fixed_types = connector_types + (['entrance'] * 4 if floor == 0 else [])
+        junctions = max(per_floor - len(fixed_types), 2)
+        floor_xy = np.vstack(fixed_xy + [rng.uniform(-1, 1, (junctions, 2)) * INDOOR_EXTENT])
+        floor_types = fixed_types + ['junction'] * junctions
+        floor_ids = np.arange(next_id, next_id + len(floor_xy), dtype=np.int64)
+        connector_ids[:, floor] = floor_ids[:len(connector_types)]
+        next_id += len(floor_xy)
+
+        types += floor_types
+        names += [f"{t.title()} {floor}-{k + 1}" for k, t in enumerate(floor_types)]
+        xy.append(floor_xy)
+        levels.append(np.full(len(floor_xy), floor))
+
+        # Walkways on this floor
+        connections = rng.integers(MIN_NEIGHBORS, MAX_NEIGHBORS + 1, size=len(floor_xy))
+        i, j, distance = connect_components(floor_xy, *nearest_neighbor_edges(
+            floor_xy, np.minimum(connections, len(floor_xy) - 1)))
+        meters = distance * INDOOR_UNIT_METERS
+        edges_from.append(floor_ids[i])
+        edges_to.append(floor_ids[j])
+        edge_types += ['walkway'] * len(i)
+        edge_meters.append(meters)
+        edge_seconds.append((meters / 1.4).astype(np.int64))
+        edge_rating.append(np.full(len(i), 5))
+
+    # Vertical edges between consecutive floors of each connector
+    for c, node_type in enumerate(connector_types):
+        _, _, meters, seconds, rating = CONNECTORS[node_type]
+        edges_from.append(connector_ids[c, :-1])
+        edges_to.append(connector_ids[c, 1:])
+        edge_types += [node_type] * (floors - 1)
+        edge_meters.append(np.full(floors - 1, meters))
+        edge_seconds.append(np.full(floors - 1, seconds))
+        edge_rating.append(np.full(floors - 1, rating))
+
+    xy = np.vstack(xy)
+    lng, lat = indoor_to_lnglat(prop, xy[:, 0], xy[:, 1])
+    nodes = {
+        'id': np.arange(first_node_id, next_id, dtype=np.int64), 'node_type': types, 'name': names,
+        'indoor_x': xy[:, 0], 'indoor_y': xy[:, 1], 'indoor_level': np.concatenate(levels),
+        'lng': lng, 'lat': lat,
+    }
+    edges = {
+        'from_node_id': np.concatenate(edges_from), 'to_node_id': np.concatenate(edges_to),
+        'edge_type': edge_types, 'distance_meters': np.concatenate(edge_meters),
+        'estimated_time_seconds': np.concatenate(edge_seconds),
+        'accessibility_rating': np.concatenate(edge_rating),
+    }
+    return nodes, edges
+
+def scale_pois(prop, nodes, count, seed):
+    """`count` POIs placed at random junctions of the property's graph
+
+    Each POI gets a lognormal attractiveness (`mass`) for the gravity model.
+    """
+    rng = scale_rng(seed, 2, prop['id'])
+    junctions = np.flatnonzero(np.array(nodes['node_type']) == 'junction')
+    at = rng.choice(junctions, size=count, replace=count > len(junctions))
+    x = nodes['indoor_x'][at] + rng.uniform(-1, 1, count)
+    y = nodes['indoor_y'][at] + rng.uniform(-1, 1, count)
+    lng, lat = indoor_to_lnglat(prop, x, y)
+    shares = np.array([share for _, _, share in SCALE_CATEGORIES])
+    kinds = rng.choice(len(SCALE_CATEGORIES), size=count, p=shares / shares.sum())
+    mass = rng.lognormal(0.0, 1.0, count)
+
+    pois = []
+    for k in range(count):
+        category, subcategory, _ = SCALE_CATEGORIES[kinds[k]]
+        floor = int(nodes['indoor_level'][at[k]])
+        pois.append({
+            'id': f"{SYNTHETIC_POI_PREFIX}{prop['id']:03d}_{k + 1:05d}",
+            'name': f"{subcategory.title()} {prop['id']:03d}-{k + 1}",
+            'category': category, 'subcategory': subcategory,
+            'casino_property': prop['name'], 'area': prop['area'],
+            'level': 'ground' if floor == 0 else f"level_{floor}", 'indoor_level': floor,
+            'node_id': int(nodes['id'][at[k]]),
+            'lat': float(lat[k]), 'lng': float(lng[k]), 'mass': round(float(mass[k]), 4),
+        })
+    return pois
+
+def gravity_workload(properties, pois_by_property, count, seed, beta=GRAVITY_BETA):
+    """`count` origin/destination POI pairs drawn from a gravity model
+
+    P(origin i) is proportional to its mass m_i. The destination property q
+    of an origin at property p is drawn with probability proportional to
+    M_q / d(p, q) ** beta (M_q: total mass at q, d within a property:
+    GRAVITY_MIN_METERS), then the destination POI within q proportional to
+    its mass. Aggregating by property keeps this linear in POIs.
+    """
+    rng = scale_rng(seed, 3)
+    mass = [np.array([poi['mass'] for poi in pois_by_property[p['id']]]) for p in properties]
+    property_mass = np.array([m.sum() for m in mass])
+    xy = local_meters([p['lng'] for p in properties], [p['lat'] for p in properties],
+                      float(np.mean([p['lat'] for p in properties])))
+    distance = np.maximum(np.linalg.norm(xy[:, None, :] - xy[None, :, :], axis=2), GRAVITY_MIN_METERS)
+    attraction = property_mass[None, :] / distance ** beta
+    property_cdf = np.cumsum(attraction / attraction.sum(axis=1, keepdims=True), axis=1)
+    poi_cdf = [np.cumsum(m / m.sum()) for m in mass]
+
+    origin_property = rng.choice(len(properties), size=count, p=property_mass / property_mass.sum())
+    destination_property = np.empty(count, dtype=np.int64)
+    origin = np.empty(count, dtype=np.int64)
+    destination = np.empty(count, dtype=np.int64)
+    draws = rng.random((count, 3))
+    for p in range(len(properties)):
+        rows = np.flatnonzero(origin_property == p)
+        destination_property[rows] = np.minimum(
+            np.searchsorted(property_cdf[p], draws[rows, 0]), len(properties) - 1)
+        origin[rows] = np.minimum(np.searchsorted(poi_cdf[p], draws[rows, 1]), len(mass[p]) - 1)
+    for q in range(len(properties)):
+        rows = np.flatnonzero(destination_property == q)
+        destination[rows] = np.minimum(np.searchsorted(poi_cdf[q], draws[rows, 2]), len(mass[q]) - 1)
+
+    workload = []
+    for k in range(count):
+        p, q = int(origin_property[k]), int(destination_property[k])
+        start = pois_by_property[properties[p]['id']][origin[k]]
+        end = pois_by_property[properties[q]['id']][destination[k]]
+        if start['id'] == end['id']:
+            # Same POI: take its neighbour in the list instead
+            end = pois_by_property[properties[q]['id']][(destination[k] + 1) % len(mass[q])]
+        workload.append({
+            'start_poi_id': start['id'], 'end_poi_id': end['id'],
+            'start_property': properties[p]['name'], 'end_property': properties[q]['name'],
+            'origin': {'lat': start['lat'], 'lng': start['lng']},
+        })
+    return workload
+
+def write_scale_files(out_dir, params, properties, graphs, pois, workload):
+    """Write the scale dataset as CSV (graph) and JSONL (everything else)"""
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, 'properties.jsonl'), 'w', encoding='utf-8') as f:
+        for prop in properties:
+            f.write(json.dumps(prop) + '\n')
+    with open(os.path.join(out_dir, 'nodes.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'property_id', 'node_type', 'name', 'indoor_x', 'indoor_y',
+                         'indoor_level', 'lng', 'lat'])
+        for prop, (nodes, _) in zip(properties, graphs):
+            writer.writerows(zip(
+                nodes['id'].tolist(), [prop['id']] * len(nodes['id']), nodes['node_type'],
+                nodes['name'], nodes['indoor_x'].round(3).tolist(), nodes['indoor_y'].round(3).tolist(),
+                nodes['indoor_level'].tolist(), nodes['lng'].round(7).tolist(), nodes['lat'].round(7).tolist()))
+    with open(os.path.join(out_dir, 'edges.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['from_node_id', 'to_node_id', 'edge_type', 'distance_meters',
+                         'estimated_time_seconds', 'accessibility_rating'])
+        for _, edges in graphs:
+            writer.writerows(zip(
+                edges['from_node_id'].tolist(), edges['to_node_id'].tolist(), edges['edge_type'],
+                edges['distance_meters'].round(2).tolist(), edges['estimated_time_seconds'].tolist(),
+                edges['accessibility_rating'].tolist()))
+    with open(os.path.join(out_dir, 'pois.jsonl'), 'w', encoding='utf-8') as f:
+        for poi in pois:
+            f.write(json.dumps(poi) + '\n')
+    with open(os.path.join(out_dir, 'workload.jsonl'), 'w', encoding='utf-8') as f:
+        for request in workload:
+            f.write(json.dumps(request) + '\n')
+    with open(os.path.join(out_dir, 'params.json'), 'w', encoding='utf-8') as f:
+        json.dump(params, f, indent=2)
+
+def load_scale_db(conn, properties, graphs, pois):
+    """Replace any previous scale dataset in the database with this one
+
+    Properties are upserted by name; their old nodes, edges and routes and
+    all syn_ POIs are deleted first. Node ids are shifted past the current
+    maximum so they never collide with real navigation nodes.
+    """
+    cur = conn.cursor()
+    property_ids = {}
+    for prop in properties:
+        cur.execute("""
+            INSERT INTO properties (name, type, location, area)
+            VALUES (%s, 'synthetic', ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography, %s)
+            ON CONFLICT (name) DO UPDATE SET
+                location = EXCLUDED.location, area = EXCLUDED.area
+            RETURNING id
+        """, (prop['name'], prop['lng'], prop['lat'], prop['area']))
+        property_ids[prop['id']] = cur.fetchone()[0]
+    db_ids = list(property_ids.values())
+
+    cur.execute("DELETE FROM synthetic_routes WHERE property_id = ANY(%s)", (db_ids,))
+    cur.execute("""
+        DELETE FROM navigation_edges WHERE from_node_id IN (
+            SELECT id FROM navigation_nodes WHERE property_id = ANY(%s))
+    """, (db_ids,))
+    cur.execute("DELETE FROM navigation_nodes WHERE property_id = ANY(%s)", (db_ids,))
+    cur.execute("DELETE FROM pois WHERE id LIKE %s", (SYNTHETIC_POI_PREFIX.replace('_', r'\_') + '%',))
+
+    cur.execute("SELECT COALESCE(MAX(id), 0) FROM navigation_nodes")
+    base = cur.fetchone()[0]
+    node_rows, edge_rows = [], []
+    for prop, (nodes, edges) in zip(properties, graphs):
+        property_id = property_ids[prop['id']]
+        for node_id, node_type, name, x, y, level, lng, lat in zip(
+                nodes['id'].tolist(), nodes['node_type'], nodes['name'], nodes['indoor_x'].tolist(),
+                nodes['indoor_y'].tolist(), nodes['indoor_level'].tolist(),
+                nodes['lng'].tolist(), nodes['lat'].tolist()):
+            node_rows.append((node_id + base, property_id, node_type,
+                              'ground' if level == 0 else f"level_{level}",
+                              f"SRID=4326;POINT({lng} {lat})", x, y, level, name,
+                              ['wheelchair_accessible'] if node_type != 'stairs' else []))
+        edge_rows += [(a + base, b + base, edge_type, meters, seconds, rating, True)
+                      for a, b, edge_type, meters, seconds, rating in zip(
+                          edges['from_node_id'].tolist(), edges['to_node_id'].tolist(),
+                          edges['edge_type'], edges['distance_meters'].tolist(),
+                          edges['estimated_time_seconds'].tolist(),
+                          edges['accessibility_rating'].tolist())]
+    copy_rows(cur, 'navigation_nodes', ['id'] + NODE_COLUMNS, node_rows)
+    cur.execute("SELECT setval(pg_get_serial_sequence('navigation_nodes', 'id'), %s)",
+                (max(base + 1, max(row[0] for row in node_rows)),))
+    copy_rows(cur, 'navigation_edges', EDGE_COLUMNS, edge_rows)
+    copy_rows(cur, 'pois', ['id', 'name', 'category', 'subcategory', 'casino_property',
+                            'level', 'area', 'location', 'data_sources'], [
+        (poi['id'], poi['name'], poi['category'], poi['subcategory'], poi['casino_property'],
+         poi['level'], poi['area'], f"SRID=4326;POINT({poi['lng']} {poi['lat']})", ['synthetic'])
+        for poi in pois])
+    conn.commit()
+    cur.close()
+    return len(node_rows), len(edge_rows)
+
+def generate_scale_data(properties_count, nodes_per_property, floors, pois_per_property, requests,
+                        seed, out_dir, use_db=False):
+    """Generate a reproducible scale dataset into out_dir (and optionally the DB)"""
+    params = {'seed': seed, 'properties': properties_count, 'nodes_per_property': nodes_per_property,
+              'floors': floors, 'pois_per_property': pois_per_property, 'requests': requests,
+              'gravity_beta': GRAVITY_BETA}
+    print(f"Scale mode: {json.dumps(params)}")
+
+    properties = scale_properties(properties_count, seed)
+    graphs, pois_by_property = [], {}
+    next_node_id = 1
+    for prop in properties:
+        nodes, edges = scale_property_graph(prop, nodes_per_property, floors, seed, next_node_id)
+        next_node_id = int(nodes['id'][-1]) + 1
+        graphs.append((nodes, edges))
+        pois_by_property[prop['id']] = scale_pois(prop, nodes, pois_per_property, seed)
+    pois = [poi for prop in properties for poi in pois_by_property[prop['id']]]
+    workload = gravity_workload(properties, pois_by_property, requests, seed)
+
+    params['counts'] = {
+        'nodes': sum(len(n['id']) for n, _ in graphs),
+        'edges': sum(len(e['from_node_id']) for _, e in graphs),
+        'pois': len(pois), 'requests': len(workload),
+    }
+    write_scale_files(out_dir, params, properties, graphs, pois, workload)
+    print(f"Wrote {params['counts']} to {out_dir}")
+
+    if use_db:
+        print("Loading into database...")
+        conn = connect_db()
+        node_count, edge_count = load_scale_db(conn, properties, graphs, pois)
+        conn.close()
+        print(f"Loaded {len(properties)} properties, {node_count} nodes, "
+              f"{edge_count} edges and {len(pois)} POIs")
+    return params
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate synthetic navigation data')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Route worker processes (default: one per CPU)')
+    scale = parser.add_argument_group('scale mode (benchmark datasets)')
+    scale.add_argument('--scale', action='store_true',
+                       help='Generate a synthetic multi-floor dataset and request workload')
+    scale.add_argument('--properties', type=int, default=SCALE_PROPERTIES,
+                       help=f'Synthetic properties (default {SCALE_PROPERTIES})')
+    scale.add_argument('--nodes', type=int, default=SCALE_NODES,
+                       help=f'Navigation nodes per property (default {SCALE_NODES})')
+    scale.add_argument('--floors', type=int, default=SCALE_FLOORS,
+                       help=f'Floors per property (default {SCALE_FLOORS})')
+    scale.add_argument('--pois', type=int, default=SCALE_POIS,
+                       help=f'POIs per property (default {SCALE_POIS})')
+    scale.add_argument('--requests', type=int, default=SCALE_REQUESTS,
+                       help=f'Origin/destination pairs in the workload (default {SCALE_REQUESTS})')
+    scale.add_argument('--seed', type=int, default=42, help='Random seed (default 42)')
+    scale.add_argument('--out', default=str(SCALE_OUT_DIR), help=f'Output directory (default {SCALE_OUT_DIR})')
+    scale.add_argument('--db', action='store_true', help='Also load the dataset into the database')
+    args = parser.parse_args()
+
+    if args.scale:
+        generate_scale_data(args.properties, args.nodes, max(args.floors, 1), args.pois,
+                            args.requests, args.seed, args.out, use_db=args.db)
+        sys.exit(0)
+
     print("="*60)
     print("Sin City Travels - Synthetic Navigation Data Generator")
     print("="*60)
     print("\nThis script generates:")
     print("  • Navigation nodes (entrances, junctions, elevators)")
     print("  • Navigation edges (walkways, stairs, elevators)")
-    print("  • Synthetic routes between POIs")
+    print("  • Shortest-path routes between POIs")
     print("\n" + "="*60 + "\n")
 
-    generate_all_synthetic_data()
+    generate_all_synthetic_data(workers=args.workers)
@@ -2,19 +2,44 @@
 """
 Import POI JSON files into PostgreSQL + PostGIS database
 
+Incremental by default: the content hash of every file (from the POI
+manifest) is compared with the hash recorded in the poi_imports table at
+the last import, and only new or changed POIs are upserted. Changed POIs are
+loaded into a temporary staging table with execute_values and merged into
+pois with a single INSERT ... SELECT ... ON CONFLICT. POIs whose files have
+been deleted are marked closed (or removed with --delete).
+
+Reading, parsing, normalizing and validating the files is fanned out over a
+process pool (load_pois); records come back in file order and are streamed
+to the staging table in batches while the workers keep parsing.
+
+Before importing, dedupe_pois.py checks the POI files and the OSM extract
+for near-duplicate venues and writes merge suggestions to
+data/build/merge_suggestions.json (skip with --no-dedupe). The check is
+skipped when neither has changed since the file was written.
+
 Usage:
-    python scripts/import_pois.py
+    python scripts/import_pois.py            (only new/changed files)
+    python scripts/import_pois.py --full     (re-import every file)
+    python scripts/import_pois.py --delete   (delete POIs whose files are gone)
+    python scripts/import_pois.py --workers 1  (parse in this process only)
+    python scripts/import_pois.py --no-dedupe  (skip duplicate detection)
 
 Requirements:
     pip install psycopg2-binary
 """
 
+import argparse
 import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import psycopg2
-from psycopg2.extras import Json
+from psycopg2.extras import execute_values
+
+import dedupe_pois
+from manifest import Manifest
 
 # Database connection parameters
 DB_CONFIG = {
@@ -25,6 +50,75 @@ DB_CONFIG = {
     'password': os.getenv('DB_PASSWORD', 'changeme_in_production')
 }
 
+BATCH_SIZE = 500
+LOAD_CHUNK_SIZE = 256  # files per task sent to a parse worker
+
+# load_poi() outcomes
+LOADED = 'loaded'
+SKIPPED = 'skipped'  # valid JSON but not importable (e.g. no coordinates)
+FAILED = 'failed'    # unreadable or invalid JSON
+
+# Enum values from k8s/init-db.sql; rows outside them would fail the whole merge
+CATEGORIES = {'restaurant', 'shopping', 'entertainment', 'nightlife',
+              'pool_spa', 'attraction', 'casino', 'hotel'}
+PRICE_RANGES = {'$', '$$', '$$$', '$$$$', '$$$$+'}
+
+# Staging columns, in poi_row() order
+STAGING_COLUMNS = [
+    ('id', 'TEXT'), ('name', 'TEXT'), ('category', 'TEXT'), ('subcategory', 'TEXT'),
+    ('casino_property', 'TEXT'),
+    ('address', 'TEXT'), ('city', 'TEXT'), ('state', 'TEXT'), ('zip', 'TEXT'),
+    ('level', 'TEXT'), ('area', 'TEXT'),
+    ('lng', 'DOUBLE PRECISION'), ('lat', 'DOUBLE PRECISION'),
+    ('phone', 'TEXT'), ('website', 'TEXT'), ('reservations_url', 'TEXT'),
+    ('hours', 'JSONB'), ('price_range', 'TEXT'), ('average_per_person', 'TEXT'),
+    ('description', 'TEXT'), ('cuisine', 'TEXT[]'), ('features', 'TEXT[]'),
+    ('chef', 'TEXT'), ('dress_code', 'TEXT'), ('tags', 'TEXT[]'),
+    ('ratings', 'JSONB'), ('special_features', 'JSONB'), ('size_details', 'JSONB'),
+    ('data_sources', 'TEXT[]'), ('image_url', 'TEXT'), ('is_closed', 'BOOLEAN'),
+]
+
+# Every imported column is refreshed on update; created_at is kept and
+# updated_at is set by the update_pois_updated_at trigger
+POI_COLUMNS = [
+    'id', 'name', 'category', 'subcategory', 'casino_property',
+    'address', 'city', 'state', 'zip', 'level', 'area', 'location',
+    'phone', 'website', 'reservations_url',
+    'hours', 'price_range', 'average_per_person',
+    'description', 'cuisine', 'features', 'chef', 'dress_code', 'tags',
+    'ratings', 'special_features', 'size_details',
+    'data_sources', 'image_url', 'is_closed',
+]
+
+MERGE_SQL = """
+    INSERT INTO pois ({columns})
+    SELECT
+        s.id, s.name, s.category::poi_category, s.subcategory, s.casino_property,
+        s.address, s.city, s.state, s.zip, s.level, s.area,
+        ST_SetSRID(ST_MakePoint(s.lng, s.lat), 4326)::geography,
+        s.phone, s.website, s.reservations_url,
+        s.hours, s.price_range::price_range, s.average_per_person,
+        s.description, s.cuisine, s.features, s.chef, s.dress_code, s.tags,
+        s.ratings, s.special_features, s.size_details,
+        s.data_sources, s.image_url, s.is_closed
+    FROM poi_import_staging s
+    {{where}}
+    ON CONFLICT (id) DO UPDATE SET
+        {updates}
+""".format(
+    columns=', '.join(POI_COLUMNS),
+    updates=',\n        '.join(f"{c} = EXCLUDED.{c}" for c in POI_COLUMNS if c != 'id'),
+)
+
+CREATE_IMPORTS_SQL = """
+    CREATE TABLE IF NOT EXISTS poi_imports (
+        poi_id VARCHAR(20) PRIMARY KEY,
+        content_hash CHAR(64) NOT NULL,
+        path TEXT,
+        imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
 def connect_db():
     """Connect to PostgreSQL database"""
     try:
@@ -34,111 +128,188 @@ def connect_db():
         print(f"Error connecting to database: {e}")
         sys.exit(1)
 
-def import_poi(cur, poi_data, filepath):
-    """Import a single POI into the database"""
-    try:
-        # Extract coordinates
-        coords = poi_data.get('location', {}).get('coordinates', {})
-        lat = coords.get('lat')
-        lng = coords.get('lng')
-
-        if not lat or not lng:
-            print(f"  ⚠️  Skipping {poi_data['name']}: Missing coordinates")
-            return False
-
-        # Prepare data
-        hours_json = Json(poi_data.get('hours', {}))
-        ratings_json = Json(poi_data.get('ratings', {}))
-        special_features_json = Json(poi_data.get('special_features', {}))
+def as_list(value):
+    """TEXT[] value: lists as-is, a bare string as a one-element list"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
 
-        # Handle size data (can be 'size' or 'size_details')
-        size_data = poi_data.get('size', {}) or poi_data.get('size_details', {})
-        size_json = Json(size_data)
+def normalize_coordinates(coords):
+    """(lat, lng) as floats; raises ValueError if missing or out of range.
 
-        # Extract nested location data
-        location_data = poi_data.get('location', {})
-
-        # Insert POI
-        cur.execute("""
-            INSERT INTO pois (
-                id, name, category, subcategory, casino_property,
-                address, city, state, zip, level, area,
-                location,
-                phone, website, reservations_url,
-                hours, price_range, average_per_person,
-                description, cuisine, features, chef, dress_code, tags,
-                ratings, special_features, size_details,
-                data_sources, image_url, is_closed
-            ) VALUES (
-                %s, %s, %s, %s, %s,
-                %s, %s, %s, %s, %s, %s,
-                ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography,
-                %s, %s, %s,
-                %s, %s, %s,
-                %s, %s, %s, %s, %s, %s,
-                %s, %s, %s,
-                %s, %s, %s
-            )
-            ON CONFLICT (id) DO UPDATE SET
-                name = EXCLUDED.name,
-                category = EXCLUDED.category,
-                subcategory = EXCLUDED.subcategory,
-                casino_property = EXCLUDED.casino_property,
-                address = EXCLUDED.address,
-                location = EXCLUDED.location,
-                phone = EXCLUDED.phone,
-                website = EXCLUDED.website,
-                hours = EXCLUDED.hours,
-                description = EXCLUDED.description,
-                updated_at = CURRENT_TIMESTAMP
-        """, (
-            poi_data['id'],
-            poi_data['name'],
-            poi_data['category'],
-            poi_data.get('subcategory'),
-            poi_data.get('casino_property'),
-
-            location_data.get('address'),
-            location_data.get('city', 'Las Vegas'),
-            location_data.get('state', 'NV'),
-            location_data.get('zip'),
-            location_data.get('level'),
-            location_data.get('area'),
-
-            lng, lat,  # PostGIS uses lng, lat order
-
-            poi_data.get('contact', {}).get('phone'),
-            poi_data.get('contact', {}).get('website'),
-            poi_data.get('contact', {}).get('reservations'),
-
-            hours_json,
-            poi_data.get('pricing', {}).get('price_range'),
-            poi_data.get('pricing', {}).get('average_per_person'),
-
-            poi_data.get('description'),
-            poi_data.get('cuisine', []),
-            poi_data.get('features', []),
-            poi_data.get('chef'),
-            poi_data.get('dress_code'),
-            poi_data.get('tags', []),
-
-            ratings_json,
-            special_features_json,
-            size_json,
-
-            poi_data.get('data_sources', []),
-            poi_data.get('image_url'),
-            poi_data.get('is_closed', False)
-        ))
-
-        return True
-
-    except Exception as e:
-        print(f"  ❌ Error importing {poi_data.get('name', 'Unknown')}: {e}")
-        return False
-
-def import_all_pois():
-    """Import all POI JSON files from data/pois directory"""
+    Pairs stored the wrong way round (lng in 'lat') are swapped back.
+    """
+    try:
+        lat = float(coords['lat'])
+        lng = float(coords['lng'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("missing coordinates")
+    if not lat or not lng:
+        raise ValueError("missing coordinates")
+    if abs(lat) > 90 and abs(lng) <= 90:
+        lat, lng = lng, lat
+    if abs(lat) > 90 or abs(lng) > 180:
+        raise ValueError(f"coordinates out of range ({lat}, {lng})")
+    return lat, lng
+
+def normalize_price_range(value):
+    """price_range enum value ('$'..'$$$$+') or None; raises ValueError otherwise.
+
+    Accepts stray whitespace, ranges like '$$-$$$' (the upper end is kept)
+    and runs of more than four '$'.
+    """
+    if value is None:
+        return None
+    value = ''.join(str(value).split())
+    if not value:
+        return None
+    if '-' in value:
+        value = value.rsplit('-', 1)[1]
+    if value in PRICE_RANGES:
+        return value
+    if value.strip('$') in ('', '+') and len(value.rstrip('+')) > 4:
+        return '$$$$+'
+    raise ValueError(f"unknown price_range {value!r}")
+
+def poi_row(poi_data):
+    """Staging-table row for a POI; raises ValueError if it cannot be imported
+
+    JSONB values are serialized here, so rows are plain picklable tuples.
+    """
+    if not poi_data.get('id') or not poi_data.get('name'):
+        raise ValueError("missing id or name")
+    lat, lng = normalize_coordinates(poi_data.get('location', {}).get('coordinates') or {})
+    if poi_data.get('category') not in CATEGORIES:
+        raise ValueError(f"unknown category {poi_data.get('category')!r}")
+    pricing = poi_data.get('pricing') or {}
+    price_range = normalize_price_range(pricing.get('price_range'))
+
+    location_data = poi_data.get('location', {})
+    contact = poi_data.get('contact') or {}
+    # Handle size data (can be 'size' or 'size_details')
+    size_data = poi_data.get('size', {}) or poi_data.get('size_details', {})
+
+    return (
+        poi_data['id'],
+        poi_data['name'],
+        poi_data['category'],
+        poi_data.get('subcategory'),
+        poi_data.get('casino_property'),
+
+        location_data.get('address'),
+        location_data.get('city', 'Las Vegas'),
+        location_data.get('state', 'NV'),
+        location_data.get('zip'),
+        location_data.get('level'),
+        location_data.get('area'),
+
+        lng, lat,
+
+        contact.get('phone'),
+        contact.get('website'),
+        contact.get('reservations'),
+
+        json.dumps(poi_data.get('hours', {})),
+        price_range,
+        pricing.get('average_per_person'),
+
+        poi_data.get('description'),
+        as_list(poi_data.get('cuisine')),
+        as_list(poi_data.get('features')),
+        poi_data.get('chef'),
+        poi_data.get('dress_code'),
+        as_list(poi_data.get('tags')),
+
+        json.dumps(poi_data.get('ratings', {})),
+        json.dumps(poi_data.get('special_features', {})),
+        json.dumps(size_data),
+
+        as_list(poi_data.get('data_sources')),
+        poi_data.get('image_url'),
+        bool(poi_data.get('is_closed', False)),
+    )
+
+def load_poi(path):
+    """Read, parse and validate one POI file (runs in a worker process).
+
+    Returns (status, row, message) with status LOADED, SKIPPED or FAILED.
+    """
+    name = os.path.basename(path)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            poi_data = json.load(f)
+    except json.JSONDecodeError as e:
+        return FAILED, None, f"Invalid JSON in {name}: {e}"
+    except (OSError, UnicodeDecodeError) as e:
+        return FAILED, None, f"Error reading {name}: {e}"
+    if not isinstance(poi_data, dict):
+        return FAILED, None, f"{name} is not a POI object"
+    try:
+        return LOADED, poi_row(poi_data), None
+    except (KeyError, TypeError, ValueError) as e:
+        return SKIPPED, None, f"{poi_data.get('name') or name}: {e}"
+
+def load_pois(paths, workers=None):
+    """load_poi() over paths on a process pool; yields results in input order.
+
+    Workers get LOAD_CHUNK_SIZE files per task and results stream back as
+    soon as they are ready, so the caller can write to the database while
+    later files are still being parsed. workers=1 runs in this process.
+    """
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(paths) <= LOAD_CHUNK_SIZE:
+        yield from map(load_poi, paths)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(load_poi, paths, chunksize=LOAD_CHUNK_SIZE)
+
+def merge_staged(cur, poi_ids):
+    """Merge the staging table into pois; returns the ids that were merged.
+
+    One set-based statement normally. If it fails (e.g. a value too long for
+    its column), POIs are merged one at a time so only the bad rows are lost.
+    """
+    cur.execute("SAVEPOINT poi_merge")
+    try:
+        cur.execute(MERGE_SQL.format(where=''))
+        cur.execute("RELEASE SAVEPOINT poi_merge")
+        return list(poi_ids)
+    except psycopg2.Error as e:
+        cur.execute("ROLLBACK TO SAVEPOINT poi_merge")
+        print(f"  ⚠️  Batch merge failed ({str(e).strip()}); merging one at a time")
+
+    merged = []
+    for poi_id in poi_ids:
+        cur.execute("SAVEPOINT poi_merge")
+        try:
+            cur.execute(MERGE_SQL.format(where='WHERE s.id = %s'), (poi_id,))
+            cur.execute("RELEASE SAVEPOINT poi_merge")
+            merged.append(poi_id)
+        except psycopg2.Error as e:
+            cur.execute("ROLLBACK TO SAVEPOINT poi_merge")
+            print(f"  ❌ Error importing {poi_id}: {str(e).strip()}")
+    return merged
+
+def retire_pois(cur, poi_ids, delete=False):
+    """Close (or delete) POIs whose files no longer exist"""
+    if delete:
+        cur.execute("SAVEPOINT poi_delete")
+        try:
+            cur.execute("DELETE FROM pois WHERE id = ANY(%s)", (poi_ids,))
+            cur.execute("RELEASE SAVEPOINT poi_delete")
+            return 'deleted'
+        except psycopg2.IntegrityError as e:
+            # Still referenced (e.g. by synthetic_routes): close instead
+            cur.execute("ROLLBACK TO SAVEPOINT poi_delete")
+            print(f"  ⚠️  Could not delete removed POIs ({str(e).strip()}); closing them instead")
+    cur.execute("UPDATE pois SET is_closed = TRUE WHERE id = ANY(%s)", (poi_ids,))
+    return 'closed'
+
+def import_all_pois(full=False, delete=False, workers=None, dedupe=True):
+    """Import new and changed POI JSON files from data/pois directory"""
     # Get project root
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
@@ -148,52 +319,86 @@ def import_all_pois():
         print(f"Error: POI directory not found: {poi_dir}")
         sys.exit(1)
 
-    # Connect to database
-    print("Connecting to database...")
-    conn = connect_db()
-    cur = conn.cursor()
-
     # Statistics
-    total_files = 0
     imported = 0
     skipped = 0
     errors = 0
 
-    # Import POIs by category (recursively walk subdirectories)
-    for category_dir in sorted(poi_dir.iterdir()):
-        if not category_dir.is_dir() or category_dir.name.startswith('.'):
-            continue
-
-        category_name = category_dir.name.replace('_', ' ').title()
-        print(f"\n📁 {category_name}")
-
-        # Use rglob to recursively find JSON files in subdirectories
-        # (e.g., nightlife/bars/*.json, nightlife/nightclubs/*.json)
-        for poi_file in sorted(category_dir.rglob("*.json")):
-            total_files += 1
-
-            try:
-                with open(poi_file, 'r', encoding='utf-8') as f:
-                    poi_data = json.load(f)
-
-                # Use savepoint so one error doesn't abort the whole transaction
-                cur.execute("SAVEPOINT poi_import")
-                success = import_poi(cur, poi_data, poi_file)
-                if success:
-                    cur.execute("RELEASE SAVEPOINT poi_import")
-                    print(f"  ✅ {poi_data['name']}")
-                    imported += 1
-                else:
-                    cur.execute("ROLLBACK TO SAVEPOINT poi_import")
-                    skipped += 1
-
-            except json.JSONDecodeError as e:
-                print(f"  ❌ Invalid JSON in {poi_file.name}: {e}")
-                errors += 1
-            except Exception as e:
-                cur.execute("ROLLBACK TO SAVEPOINT poi_import")
-                print(f"  ❌ Error processing {poi_file.name}: {e}")
-                errors += 1
+    # The manifest lists every POI file; refresh() re-reads only files that changed
+    manifest = Manifest(poi_dir)
+    changed, removed, manifest_errors = manifest.refresh()
+    manifest.save()
+    print(f"Manifest: {len(manifest.entries)} POIs ({len(changed)} new/changed, {len(removed)} removed)")
+    for rel_path, message in manifest_errors:
+        print(f"  ❌ {rel_path}: {message}")
+        errors += 1
+
+    if dedupe:
+        # Unchanged inputs keep their suggestions; the scan costs most of a no-op import
+        suggestions = dedupe_pois.current_suggestions(manifest)
+        if suggestions is None:
+            _, suggestions = dedupe_pois.run(manifest)
+        print(f"Possible duplicates: {len(suggestions)} merge suggestions in {dedupe_pois.SUGGESTIONS_FILE}")
+
+    # Connect to database
+    print("Connecting to database...")
+    conn = connect_db()
+    cur = conn.cursor()
+
+    cur.execute(CREATE_IMPORTS_SQL)
+    cur.execute("SELECT poi_id, content_hash FROM poi_imports")
+    imported_hashes = dict(cur.fetchall())
+
+    pending = sorted(
+        (poi_id for poi_id, entry in manifest.entries.items()
+         if full or imported_hashes.get(poi_id) != entry['hash']),
+        key=lambda poi_id: manifest.entries[poi_id]['path'])
+    gone = sorted(poi_id for poi_id in imported_hashes if poi_id not in manifest.entries)
+    print(f"To import: {len(pending)} | Unchanged: {len(manifest.entries) - len(pending)} | "
+          f"Removed since last import: {len(gone)}")
+
+    staged = []
+    problems = []  # (status, message) for the summary
+    if pending:
+        cur.execute(
+            "CREATE TEMP TABLE poi_import_staging ({}) ON COMMIT DROP".format(
+                ', '.join(f"{name} {sql_type}" for name, sql_type in STAGING_COLUMNS)))
+
+        batch = []
+        paths = [manifest.abspath(poi_id) for poi_id in pending]
+        for poi_id, (status, row, message) in zip(pending, load_pois(paths, workers)):
+            if status != LOADED:
+                problems.append((status, message))
+                continue
+            batch.append(row)
+            staged.append(poi_id)
+            if len(batch) >= BATCH_SIZE:
+                execute_values(cur, "INSERT INTO poi_import_staging VALUES %s", batch, page_size=BATCH_SIZE)
+                batch = []
+        if batch:
+            execute_values(cur, "INSERT INTO poi_import_staging VALUES %s", batch, page_size=BATCH_SIZE)
+        skipped += sum(1 for status, _ in problems if status == SKIPPED)
+        errors += sum(1 for status, _ in problems if status == FAILED)
+
+    if staged:
+        merged = merge_staged(cur, staged)
+        errors += len(staged) - len(merged)
+        imported += len(merged)
+
+        # Only record hashes of POIs that made it in, so failures retry next run
+        execute_values(cur, """
+            INSERT INTO poi_imports (poi_id, content_hash, path) VALUES %s
+            ON CONFLICT (poi_id) DO UPDATE SET
+                content_hash = EXCLUDED.content_hash,
+                path = EXCLUDED.path,
+                imported_at = CURRENT_TIMESTAMP
+        """, [(poi_id, manifest.entries[poi_id]['hash'], manifest.entries[poi_id]['path'])
+              for poi_id in merged], page_size=BATCH_SIZE)
+
+    retired = None
+    if gone:
+        retired = retire_pois(cur, gone, delete)
+        cur.execute("DELETE FROM poi_imports WHERE poi_id = ANY(%s)", (gone,))
 
     # Commit all changes
     conn.commit()
@@ -206,14 +411,21 @@ def import_all_pois():
     print("\n" + "="*60)
     print("📊 Import Summary")
     print("="*60)
-    print(f"Total files processed: {total_files}")
+    print(f"POI files: {len(manifest.entries)}")
+    print(f"Unchanged since last import: {len(manifest.entries) - len(pending)}")
     print(f"Successfully imported: {imported}")
     print(f"Skipped (missing data): {skipped}")
+    if retired:
+        print(f"Removed files ({retired}): {len(gone)}")
     print(f"Errors: {errors}")
+    if problems:
+        print("\nSkipped / failed files:")
+        for status, message in problems:
+            print(f"  {'⚠️ ' if status == SKIPPED else '❌'} {message}")
     print("="*60)
 
     # Verify import
-    if imported > 0:
+    if imported > 0 or retired:
         print("\n✨ Verifying import...")
         conn = connect_db()
         cur = conn.cursor()
@@ -241,8 +453,20 @@ def import_all_pois():
     print("\n✅ Import complete!")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Import POI JSON files into PostgreSQL')
+    parser.add_argument('--full', action='store_true',
+                        help='Re-import every POI, not just new or changed files')
+    parser.add_argument('--delete', action='store_true',
+                        help='Delete POIs whose files were removed (default: mark them closed)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Parse worker processes (default: one per CPU)')
+    parser.add_argument('--no-dedupe', action='store_true',
+                        help='Skip near-duplicate detection')
+    args = parser.parse_args()
+
     print("="*60)
     print("Sin City Travels - POI Import")
     print("="*60)
 
-    import_all_pois()
+    import_all_pois(full=args.full, delete=args.delete, workers=args.workers,
+                    dedupe=not args.no_dedupe)
@@ -0,0 +1,111 @@
+"""
+Sin City Travels - Checkpoint journal and atomic JSON writes
+Used by enrich_pois.py to resume interrupted runs.
+
+A journal is an append-only JSONL file with one record per processed POI:
+    {"id": "poi_123", "status": "done", "hash": "<sha256 of the file>", ...}
+Every record is flushed and fsynced before the next POI starts, so a crash
+loses at most the POI in flight; a torn last line is ignored on load. The
+latest record for an id wins. A POI whose file still has the recorded hash
+needs no work on resume.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import stat
+import tempfile
+from datetime import datetime, timezone
+
+DONE = 'done'        # processed (updated or nothing to change)
+SKIPPED = 'skipped'  # did not need enrichment / had no source URL
+FAILED = 'failed'    # fetch or parse failed; retried on the next run
+
+
+def file_hash(path):
+    """SHA-256 of a file's bytes."""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def atomic_write_json(path, data):
+    """Write JSON via a temp file in the same directory and os.replace().
+
+    Readers see either the old file or the complete new one, never a
+    partial write, even if the process is killed mid-write. The file keeps
+    its permissions (mkstemp creates 0600); a new file gets the umask default.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_', suffix='.json')
+    try:
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def shard_of(poi_id, shard_count):
+    """Stable shard number for a POI id (independent of PYTHONHASHSEED)."""
+    return int(hashlib.sha1(poi_id.encode('utf-8')).hexdigest(), 16) % shard_count
+
+
+class Journal:
+    """Append-only checkpoint journal; reads every journal matching `pattern`."""
+
+    def __init__(self, path, pattern=None):
+        self.path = str(path)
+        self.records = {}
+        for journal_path in sorted(glob.glob(str(pattern or path))):
+            self._load(journal_path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn write from an interrupted run
+                self.records[record['id']] = record
+
+    def is_current(self, poi_id, content_hash):
+        """True if the POI was handled and its file has not changed since."""
+        record = self.records.get(poi_id)
+        return (record is not None and record['status'] != FAILED
+                and record.get('hash') == content_hash)
+
+    def failed_ids(self):
+        return {poi_id for poi_id, r in self.records.items() if r['status'] == FAILED}
+
+    def record(self, poi_id, status, content_hash=None, error=None):
+        record = {
+            'id': poi_id,
+            'status': status,
+            'hash': content_hash,
+            'at': datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        if error:
+            record['error'] = str(error)[:500]
+        self.records[poi_id] = record
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
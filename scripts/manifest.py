@@ -0,0 +1,221 @@
+"""
+Sin City Travels - POI manifest and id allocator
+Shared by scrape_pois.py, enrich_pois.py and import_pois.py.
+
+data/pois/.manifest.json maps every POI id to its file (relative to
+data/pois), name, property, category and the SHA-256 of the file, plus the
+file's size and mtime so refresh() only re-reads files that changed. This
+replaces opening and parsing every POI file to find the next id, or to
+check whether a POI already exists.
+
+New ids come from data/pois/.next_poi_id. The counter is read and bumped
+under an exclusive flock, so parallel scrapers never hand out the same id.
+save() takes the same lock, merges this process's changes into the copy on
+disk and replaces the file atomically, so concurrent writers don't lose
+each other's entries.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+
+from journal import atomic_write_json
+
+MANIFEST_NAME = '.manifest.json'
+COUNTER_NAME = '.next_poi_id'
+LOCK_NAME = '.manifest.lock'
+SKIP_DIRS = {'raw'}  # bulk collector output, not POI files
+FIRST_POI_ID = 50    # poi_001 - poi_049 were assigned by hand
+
+
+def poi_number(poi_id):
+    """'poi_123' -> 123; None if the id is not in that form."""
+    try:
+        return int(poi_id.replace('poi_', ''))
+    except (AttributeError, ValueError):
+        return None
+
+
+class Manifest:
+    """Index of the POI files under data/pois, keyed by POI id."""
+
+    def __init__(self, data_dir):
+        self.data_dir = str(data_dir)
+        self.path = os.path.join(self.data_dir, MANIFEST_NAME)
+        self.entries = self._read()
+        self._changes = {}  # poi_id -> entry, or None for a removal
+        self._build_lookups()
+        if not os.path.exists(self.path):
+            print(f"  Building POI manifest {self.path}...")
+            self.refresh()
+            self.save()
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('pois', {})
+        except (OSError, ValueError):
+            return {}
+
+    def _build_lookups(self):
+        self.by_path = {}
+        self.by_name = {}
+        self.max_number = 0
+        for poi_id, entry in self.entries.items():
+            self._add_lookups(poi_id, entry)
+
+    def _add_lookups(self, poi_id, entry):
+        self.by_path[entry['path']] = poi_id
+        self.by_name.setdefault(entry['name'].strip().lower(), []).append(poi_id)
+        self.max_number = max(self.max_number, poi_number(poi_id) or 0)
+
+    def _set(self, poi_id, entry):
+        self._remove(poi_id)
+        self.entries[poi_id] = entry
+        self._add_lookups(poi_id, entry)
+        self._changes[poi_id] = entry
+
+    def _remove(self, poi_id):
+        old = self.entries.pop(poi_id, None)
+        if old is None:
+            return
+        if self.by_path.get(old['path']) == poi_id:
+            del self.by_path[old['path']]
+        same_name = self.by_name.get(old['name'].strip().lower(), [])
+        if poi_id in same_name:
+            same_name.remove(poi_id)
+        self._changes[poi_id] = None
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.data_dir, exist_ok=True)
+        with open(os.path.join(self.data_dir, LOCK_NAME), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def relpath(self, path):
+        return os.path.relpath(path, self.data_dir).replace(os.sep, '/')
+
+    def abspath(self, poi_id):
+        return os.path.join(self.data_dir, *self.entries[poi_id]['path'].split('/'))
+
+    def get(self, poi_id):
+        return self.entries.get(poi_id)
+
+    def find(self, name, property_name=None):
+        """Id of a POI with this name (at this property, if given), or None."""
+        for poi_id in self.by_name.get(name.strip().lower(), ()):
+            if property_name is None or self.entries[poi_id]['property'] == property_name:
+                return poi_id
+        return None
+
+    def reserve_id(self):
+        """Reserve the next POI number. Safe across processes; never reused."""
+        counter_path = os.path.join(self.data_dir, COUNTER_NAME)
+        with self._locked():
+            try:
+                with open(counter_path, 'r', encoding='utf-8') as f:
+                    next_id = int(json.load(f))
+            except (OSError, ValueError, TypeError):
+                # No counter yet: start after the highest id anyone has saved
+                next_id = max([FIRST_POI_ID] + [
+                    (poi_number(poi_id) or 0) + 1 for poi_id in self._read()])
+            # Never below an id already indexed (e.g. a file added by hand)
+            next_id = max(next_id, self.max_number + 1)
+            atomic_write_json(counter_path, next_id + 1)
+        return next_id
+
+    def _read_entry(self, path):
+        """(poi_id, entry) for a POI file; (None, None) if it is not a POI."""
+        with open(path, 'rb') as f:
+            raw = f.read()
+            stat = os.fstat(f.fileno())
+        poi = json.loads(raw)
+        if not isinstance(poi, dict) or 'id' not in poi:
+            return None, None
+        return poi['id'], {
+            'path': self.relpath(path),
+            'name': poi.get('name', ''),
+            'property': poi.get('casino_property'),
+            'category': poi.get('category'),
+            'hash': hashlib.sha256(raw).hexdigest(),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+
+    def update(self, path):
+        """(Re-)index one POI file; returns its entry, or None if it is not a POI."""
+        poi_id, entry = self._read_entry(path)
+        if entry is not None:
+            self._set(poi_id, entry)
+        return entry
+
+    def refresh(self):
+        """Re-index data/pois: re-read new or modified files, drop deleted ones.
+
+        Returns (changed_ids, removed_ids, errors) where errors is a list of
+        (relative path, message) for unreadable files and duplicate ids.
+        """
+        seen = set()
+        changed = []
+        errors = []
+        for root, dirs, files in os.walk(self.data_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d not in SKIP_DIRS)
+            for filename in sorted(files):
+                if not filename.endswith('.json') or filename.startswith('.'):
+                    continue
+                path = os.path.join(root, filename)
+                rel = self.relpath(path)
+
+                poi_id = self.by_path.get(rel)
+                old = self.entries.get(poi_id)
+                if old:
+                    stat = os.stat(path)
+                    if old['size'] == stat.st_size and old['mtime_ns'] == stat.st_mtime_ns:
+                        seen.add(poi_id)
+                        continue
+
+                try:
+                    new_id, entry = self._read_entry(path)
+                except (OSError, ValueError) as e:
+                    errors.append((rel, str(e)))
+                    continue
+                if entry is None:
+                    continue
+                if new_id in seen:
+                    errors.append((rel, f"duplicate id {new_id}"))
+                    continue
+                if old and new_id != poi_id:
+                    self._remove(poi_id)  # file now holds a different POI
+                    old = None
+                seen.add(new_id)
+                self._set(new_id, entry)
+                if not old or old['hash'] != entry['hash']:
+                    changed.append(new_id)
+
+        removed = [poi_id for poi_id in self.entries if poi_id not in seen]
+        for poi_id in removed:
+            self._remove(poi_id)
+        return changed, removed, errors
+
+    def save(self):
+        """Merge this process's changes into the manifest on disk."""
+        if not self._changes and os.path.exists(self.path):
+            return
+        with self._locked():
+            entries = self._read()
+            for poi_id, entry in self._changes.items():
+                if entry is None:
+                    entries.pop(poi_id, None)
+                else:
+                    entries[poi_id] = entry
+            ordered = dict(sorted(entries.items(), key=lambda kv: (poi_number(kv[0]) or 0, kv[0])))
+            atomic_write_json(self.path, {'pois': ordered})
+        self.entries = ordered
+        self._changes = {}
+        self._build_lookups()
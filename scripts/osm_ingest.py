@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""
+Sin City Travels - Streaming OSM ingestion
+Reads an Overpass JSON extract (plain or .gz) and extracts casino/hotel
+properties with their building footprints, plus entrance nodes
+(entrance=*). The results are merged into data/maps/properties.json and
+data/maps/property_footprints.geojson, the shared source of property
+coordinates. With --db they are also bulk-upserted into `properties`
+(location, footprint, osm_id) and `navigation_nodes` (node_type
+'entrance', keyed by osm_id).
+
+The extract is never loaded whole. iter_elements() decodes the
+"elements" array one element at a time from a fixed-size read buffer.
+Untagged node coordinates and way node lists go to a temporary SQLite
+index, because ways and relations only reference them by id. Memory
+stays flat however large the extract is; only the matched properties and
+entrances are kept.
+
+OSM features are matched to property names (properties.json names plus
+the property_detector aliases). Only building or hotel/resort footprints
+are taken; a bare amenity=casino room such as "NoMad High Limit Casino" is
+rejected and reported. When several features match one property, a name
+that is just the property name wins over "Nobu Hotel at Caesars Palace",
+then hotels, then the largest footprint. Entrances belong to the property
+whose footprint contains them, or the nearest one within 150 m, and get
+indoor coordinates relative to its location so generate_synthetic_routes.py
+meshes them into the walkway graph like its own entrances.
+
+Usage:
+    python scripts/osm_ingest.py data/maps/las_vegas_strip_hotels_casinos.json
+    python scripts/osm_ingest.py metro.json.gz --db
+    python scripts/osm_ingest.py extract.json --dry-run --show-unmatched
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+
+from journal import atomic_write_json
+from property_detector import PropertyDetector, META_NAMES
+from property_locations import PROPERTIES_FILE, FOOTPRINTS_FILE, read_properties_file
+
+READ_CHUNK = 1 << 20  # characters per read
+INDEX_BATCH = 10000   # rows per SQLite executemany
+ENTRANCE_RADIUS_M = 150
+INDOOR_UNIT_METERS = 5  # navigation_nodes indoor_x/indoor_y scale, as in generate_synthetic_routes.py
+MAX_SHIFT_M = 2000    # farther from the known location is a different building with a shared name
+ELEMENTS_RE = re.compile(r'"elements"\s*:\s*\[')
+# What may precede a property name in an OSM name: "The Palazzo", "Hotel MGM
+# Grand", "Nobu Hotel at Caesars Palace" - but not "Howard Johnson Tropicana"
+NAME_PREFIX_RE = re.compile(r'(?:(?:the|hotel)\s+|.*\bat\s+(?:the\s+)?)?', re.I)
+# What may follow it in the OSM name of the property's own building: "Luxor Las
+# Vegas", "Sahara Las Vegas Hotel & Casino" - but not "Harrah's Showroom"
+NAME_SUFFIX_RE = re.compile(r"(?:[\s,&'-]|\b(?:las|vegas|hotel|casino|resort|and|spa|of|the)\b)*", re.I)
+
+PROPERTY_TAGS = {'tourism': {'hotel', 'resort'}, 'amenity': {'casino'},
+                 'building': {'hotel', 'casino'}, 'leisure': {'resort'}}
+# Tags of a whole building or resort; an amenity=casino area or point can be one room of it
+BUILDING_TAGS = {'tourism': {'hotel', 'resort'}, 'leisure': {'resort'}, 'building': None}
+
+
+def iter_elements(path):
+    """Yield the objects of an Overpass JSON "elements" array one at a time."""
+    opener = gzip.open if str(path).endswith('.gz') else open
+    decoder = json.JSONDecoder()
+    with opener(path, 'rt', encoding='utf-8') as f:
+        buffer = ''
+        while True:
+            chunk = f.read(READ_CHUNK)
+            buffer += chunk
+            m = ELEMENTS_RE.search(buffer)
+            if m:
+                buffer = buffer[m.end():]
+                break
+            if not chunk:
+                raise ValueError(f'{path}: no "elements" array')
+            buffer = buffer[-64:]  # a key split across reads
+
+        pos = 0
+        eof = False
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            if pos < len(buffer):
+                try:
+                    element, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    yield element
+                    continue
+            elif eof:
+                raise ValueError(f'{path}: unterminated "elements" array')
+            # Need more input: drop what has been consumed, then read
+            chunk = f.read(READ_CHUNK)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+
+class GeometryIndex:
+    """Node coordinates and way node lists in a temporary SQLite file."""
+
+    def __init__(self, directory=None):
+        fd, self.path = tempfile.mkstemp(prefix='osm_index_', suffix='.sqlite', dir=directory)
+        os.close(fd)
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE nodes (id INTEGER PRIMARY KEY, lat REAL, lon REAL);
+            CREATE TABLE ways (id INTEGER PRIMARY KEY, nodes TEXT);
+        """)
+        self._nodes = []
+        self._ways = []
+
+    def add_node(self, node_id, lat, lon):
+        self._nodes.append((node_id, lat, lon))
+        if len(self._nodes) >= INDEX_BATCH:
+            self.flush()
+
+    def add_way(self, way_id, node_ids):
+        self._ways.append((way_id, ','.join(map(str, node_ids))))
+        if len(self._ways) >= INDEX_BATCH:
+            self.flush()
+
+    def flush(self):
+        if self._nodes:
+            self.db.executemany("INSERT OR REPLACE INTO nodes VALUES (?, ?, ?)", self._nodes)
+            self._nodes = []
+        if self._ways:
+            self.db.executemany("INSERT OR REPLACE INTO ways VALUES (?, ?)", self._ways)
+            self._ways = []
+
+    def coordinates(self, node_ids):
+        """[(lon, lat)] for node_ids, in order; None if any node is missing."""
+        self.flush()
+        found = {}
+        unique = list(set(node_ids))
+        for start in range(0, len(unique), 900):  # SQLite variable limit
+            batch = unique[start:start + 900]
+            found.update((row[0], (row[2], row[1])) for row in self.db.execute(
+                f"SELECT id, lat, lon FROM nodes WHERE id IN ({','.join('?' * len(batch))})", batch))
+        if len(found) < len(unique):
+            return None
+        return [found[node_id] for node_id in node_ids]
+
+    def way_nodes(self, way_id):
+        self.flush()
+        row = self.db.execute("SELECT nodes FROM ways WHERE id = ?", (way_id,)).fetchone()
+        return [int(n) for n in row[0].split(',')] if row and row[0] else None
+
+    def close(self):
+        self.db.close()
+        os.remove(self.path)
+
+
+def local_xy(points, origin_lat):
+    """[(lon, lat)] -> [(x, y)] in meters on a plane around origin_lat."""
+    kx = 111320 * math.cos(math.radians(origin_lat))
+    return [(lon * kx, lat * 110540) for lon, lat in points]
+
+
+def ring_area_centroid(ring):
+    """(area m², (lon, lat) centroid) of a closed [(lon, lat)] ring."""
+    origin_lat = ring[0][1]
+    xy = local_xy(ring, origin_lat)
+    area = cx = cy = 0.0
+    for (x0, y0), (x1, y1) in zip(xy, xy[1:]):
+        cross = x0 * y1 - x1 * y0
+        area += cross
+        cx += (x0 + x1) * cross
+        cy += (y0 + y1) * cross
+    area /= 2
+    if abs(area) < 1e-9:
+        lon = sum(p[0] for p in ring) / len(ring)
+        lat = sum(p[1] for p in ring) / len(ring)
+        return 0.0, (lon, lat)
+    kx = 111320 * math.cos(math.radians(origin_lat))
+    return abs(area), (cx / (6 * area) / kx, cy / (6 * area) / 110540)
+
+
+def point_in_ring(lon, lat, ring):
+    inside = False
+    for (x0, y0), (x1, y1) in zip(ring, ring[1:]):
+        if (y0 > lat) != (y1 > lat) and lon < x0 + (lat - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
+
+
+def stitch_rings(ways):
+    """Join way node lists end to end into closed rings; open leftovers are dropped."""
+    segments = [list(way) for way in ways if way and len(way) > 1]
+    rings = []
+    while segments:
+        ring = segments.pop()
+        while ring[0] != ring[-1]:
+            for k, segment in enumerate(segments):
+                if segment[0] == ring[-1]:
+                    ring += segment[1:]
+                elif segment[-1] == ring[-1]:
+                    ring += segment[-2::-1]
+                else:
+                    continue
+                segments.pop(k)
+                break
+            else:
+                break
+        if ring[0] == ring[-1] and len(ring) >= 4:
+            rings.append(ring)
+    return rings
+
+
+def is_property(tags):
+    return 'name' in tags and any(tags.get(key) in values for key, values in PROPERTY_TAGS.items())
+
+
+def is_building(tags):
+    return any(key in tags and (values is None or tags[key] in values) for key, values in BUILDING_TAGS.items())
+
+
+def osm_address(tags):
+    street = ' '.join(filter(None, (tags.get('addr:housenumber'), tags.get('addr:street'))))
+    if not street:
+        return None
+    city = tags.get('addr:city', 'Las Vegas')
+    state_zip = ' '.join(filter(None, (tags.get('addr:state', 'NV'), tags.get('addr:postcode'))))
+    return f"{street}, {city}, {state_zip}"
+
+
+def name_matcher(registry):
+    """PropertyDetector over registry names, aliases, osm_names and property_detector aliases."""
+    names = [name for name, entry in registry['properties'].items() if not entry.get('fixed')]
+    aliases = list(registry.get('aliases', {}).items())
+    aliases += [(osm_name, name) for name in names
+                for osm_name in registry['properties'][name].get('osm_names', [])]
+    aliases += [(alias, canonical) for alias, canonical in META_NAMES
+                if canonical in registry['properties']]
+    return PropertyDetector(names=[(name, name) for name in names] + aliases)
+
+
+def way_points(way, index):
+    """[(lon, lat)] of a way (or relation member), inline geometry first."""
+    if 'geometry' in way:
+        return [(p['lon'], p['lat']) for p in way['geometry']]
+    node_ids = way.get('nodes') or index.way_nodes(way.get('ref'))
+    return index.coordinates(node_ids) if node_ids else None
+
+
+def resolve_feature(element, index, exact=False):
+    """Footprint rings, area and centroid of a matched element, or None without geometry.
+
+    exact: the OSM name is the property name plus only generic words.
+    """
+    rings = []
+    if element['type'] == 'way':
+        points = way_points(element, index) or []
+        if len(points) >= 4 and points[0] == points[-1]:
+            rings = [points]
+    elif element['type'] == 'relation':
+        outer = [way_points(member, index) for member in element.get('members', [])
+                 if member.get('type') == 'way' and member.get('role', 'outer') in ('outer', '')]
+        rings = stitch_rings(points for points in outer if points)
+
+    if rings:
+        measured = [ring_area_centroid(ring) for ring in rings]
+        area = sum(a for a, _ in measured)
+        lon, lat = max(measured)[1] if area == 0 else (
+            sum(a * c[0] for a, c in measured) / area, sum(a * c[1] for a, c in measured) / area)
+    elif 'lat' in element or 'center' in element:
+        point = element.get('center') or element
+        area, lon, lat = 0.0, point['lon'], point['lat']
+    else:
+        return None
+    tags = element['tags']
+    return {'osm_id': f"{element['type']}/{element['id']}", 'osm_name': tags['name'],
+            'rings': rings, 'area': area, 'lat': lat, 'lng': lon, 'address': osm_address(tags),
+            'hotel': tags.get('tourism') in ('hotel', 'resort'), 'building': is_building(tags),
+            'exact': exact}
+
+
+def scan(path, matcher, index_dir=None):
+    """Stream one extract; returns (candidates, entrances, unmatched names, element count).
+
+    candidates: {property name: [feature]}, feature = {osm_id, osm_name,
+    rings, area, lat, lng, address, hotel, building, exact}.
+    """
+    index = GeometryIndex(index_dir)
+    pending = []  # (property name, element, exact): resolved once every node has been indexed
+    entrances = []
+    unmatched = set()
+    count = 0
+
+    try:
+        for element in iter_elements(path):
+            count += 1
+            kind = element.get('type')
+            tags = element.get('tags') or {}
+            if kind == 'node':
+                index.add_node(element['id'], element['lat'], element['lon'])
+                if 'entrance' in tags:
+                    entrances.append({'osm_id': element['id'], 'lat': element['lat'], 'lng': element['lon'],
+                                      'role': tags['entrance'],
+                                      'name': tags.get('name') or tags.get('ref')})
+            elif kind == 'way' and 'nodes' in element:
+                index.add_way(element['id'], element['nodes'])
+            if kind in ('node', 'way', 'relation') and is_property(tags):
+                found = matcher.search(tags['name'])
+                if found and NAME_PREFIX_RE.fullmatch(tags['name'][:found[1]]):
+                    exact = bool(NAME_SUFFIX_RE.fullmatch(tags['name'][found[2]:]))
+                    pending.append((found[0], element, exact))
+                else:
+                    unmatched.add(tags['name'])
+
+        candidates = {}
+        for name, element, exact in pending:
+            feature = resolve_feature(element, index, exact)
+            if feature:
+                candidates.setdefault(name, []).append(feature)
+    finally:
+        index.close()
+    return candidates, entrances, unmatched, count
+
+
+def distance_m(lat1, lng1, lat2, lng2):
+    (x0, y0), (x1, y1) = local_xy([(lng1, lat1), (lng2, lat2)], lat1)
+    return math.hypot(x1 - x0, y1 - y0)
+
+
+def choose_features(candidates, registry):
+    """One building footprint per property.
+
+    Only polygons tagged as a building, hotel or resort qualify; points and
+    bare amenity=casino areas are often one room of a resort ("NoMad High
+    Limit Casino"). Among those, a feature named the property plus generic
+    words wins ("Harrah's Las Vegas" over "Harrah's Showroom"), then hotels
+    (so "Encore Beach Club" doesn't stand in for Encore), then the largest.
+
+    Returns (features, rejected) with rejected = [(name, feature, reason)]
+    for features that aren't buildings or are farther than MAX_SHIFT_M from
+    the property's current location.
+    """
+    features, rejected = {}, []
+    for name, found in candidates.items():
+        entry = registry['properties'][name]
+        usable = []
+        for f in found:
+            if not (f['rings'] and f['building']):
+                rejected.append((name, f, 'not a building footprint'))
+            elif entry.get('lat') is not None and \
+                    distance_m(entry['lat'], entry['lng'], f['lat'], f['lng']) > MAX_SHIFT_M:
+                rejected.append((name, f, f"more than {MAX_SHIFT_M} m from its current location"))
+            else:
+                usable.append(f)
+        if usable:
+            features[name] = max(usable, key=lambda f: (f['exact'], f['hotel'], f['area']))
+    return features, rejected
+
+
+def assign_entrances(entrances, features):
+    """(property name, entrance) pairs: containing footprint first, else nearest within radius."""
+    assigned = []
+    for entrance in entrances:
+        owner = next((name for name, feature in features.items()
+                      if any(point_in_ring(entrance['lng'], entrance['lat'], ring) for ring in feature['rings'])),
+                     None)
+        if owner is None:
+            best = None
+            for name, feature in features.items():
+                distance = distance_m(entrance['lat'], entrance['lng'], feature['lat'], feature['lng'])
+                if distance <= ENTRANCE_RADIUS_M and (best is None or distance < best[0]):
+                    best = (distance, name)
+            owner = best[1] if best else None
+        if owner:
+            assigned.append((owner, entrance))
+    return assigned
+
+
+def indoor_xy(entrance, feature):
+    """Entrance position in the property's indoor coordinates (INDOOR_UNIT_METERS around its location)."""
+    (x, y), (x0, y0) = local_xy([(entrance['lng'], entrance['lat']), (feature['lng'], feature['lat'])],
+                                feature['lat'])
+    return round((x - x0) / INDOOR_UNIT_METERS, 2), round((y - y0) / INDOOR_UNIT_METERS, 2)
+
+
+def write_files(registry, features, sources, properties_path=PROPERTIES_FILE,
+                footprints_path=FOOTPRINTS_FILE):
+    """Merge matched features into properties.json and rewrite the footprint file."""
+    for name, feature in features.items():
+        entry = registry['properties'][name]
+        entry['lat'] = round(feature['lat'], 6)
+        entry['lng'] = round(feature['lng'], 6)
+        if not entry.get('address') and feature['address']:
+            entry['address'] = feature['address']
+        entry['osm_id'] = feature['osm_id']
+        entry['osm_name'] = feature['osm_name']
+    registry['generated_at'] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    registry['sources'] = sorted(set(registry.get('sources', [])) | set(sources))
+    atomic_write_json(properties_path, registry)
+
+    # Footprints from earlier extracts are kept unless this one replaced them
+    existing = {}
+    if os.path.exists(footprints_path):
+        with open(footprints_path, 'r', encoding='utf-8') as f:
+            existing = {feature['properties']['name']: feature for feature in json.load(f)['features']}
+    for name, feature in features.items():
+        if feature['rings']:
+            existing[name] = {
+                'type': 'Feature',
+                'properties': {'name': name, 'osm_id': feature['osm_id'], 'area_m2': round(feature['area'])},
+                'geometry': {'type': 'MultiPolygon', 'coordinates': [
+                    [[[round(lon, 7), round(lat, 7)] for lon, lat in ring]] for ring in feature['rings']]},
+            }
+    tmp = f"{footprints_path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write('{"type": "FeatureCollection", "features": [\n')
+        f.write(',\n'.join(json.dumps(existing[name], ensure_ascii=False) for name in sorted(existing)))
+        f.write('\n]}\n')
+    os.replace(tmp, footprints_path)
+
+
+def multipolygon_wkt(rings):
+    polygons = ', '.join('((' + ', '.join(f"{lon} {lat}" for lon, lat in ring) + '))' for ring in rings)
+    return f"SRID=4326;MULTIPOLYGON({polygons})"
+
+
+def upsert_db(features, entrances):
+    """Bulk-upsert matched properties and their entrances; returns (properties, entrances)."""
+    from psycopg2.extras import execute_values
+    from import_pois import connect_db
+
+    conn = connect_db()
+    cur = conn.cursor()
+    cur.execute("""
+        ALTER TABLE properties ADD COLUMN IF NOT EXISTS footprint GEOGRAPHY(MULTIPOLYGON, 4326);
+        ALTER TABLE properties ADD COLUMN IF NOT EXISTS osm_id VARCHAR(30);
+        ALTER TABLE navigation_nodes ADD COLUMN IF NOT EXISTS osm_id BIGINT UNIQUE;
+    """)
+    execute_values(cur, """
+        INSERT INTO properties (name, address, location, footprint, osm_id)
+        SELECT v.name, v.address, ST_GeogFromText(v.location), ST_GeogFromText(v.footprint), v.osm_id
+        FROM (VALUES %s) AS v(name, address, location, footprint, osm_id)
+        ON CONFLICT (name) DO UPDATE SET
+            location = EXCLUDED.location,
+            footprint = COALESCE(EXCLUDED.footprint, properties.footprint),
+            address = COALESCE(properties.address, EXCLUDED.address),
+            osm_id = EXCLUDED.osm_id
+    """, [(name, f['address'], f"SRID=4326;POINT({f['lng']} {f['lat']})",
+           multipolygon_wkt(f['rings']) if f['rings'] else None, f['osm_id'])
+          for name, f in features.items()])
+    if entrances:
+        execute_values(cur, """
+            INSERT INTO navigation_nodes (property_id, node_type, level, location, indoor_x, indoor_y,
+                                          indoor_level, name, entrance_role, osm_id)
+            SELECT p.id, 'entrance', 'ground', ST_GeogFromText(v.location), v.indoor_x, v.indoor_y, 0,
+                   v.name, v.role, v.osm_id
+            FROM (VALUES %s) AS v(property, location, indoor_x, indoor_y, name, role, osm_id)
+            JOIN properties p ON p.name = v.property
+            ON CONFLICT (osm_id) DO UPDATE SET
+                property_id = EXCLUDED.property_id,
+                location = EXCLUDED.location,
+                indoor_x = EXCLUDED.indoor_x,
+                indoor_y = EXCLUDED.indoor_y,
+                name = EXCLUDED.name,
+                entrance_role = EXCLUDED.entrance_role
+        """, [(name, f"SRID=4326;POINT({e['lng']} {e['lat']})", *indoor_xy(e, features[name]),
+               e['name'] or f"{name} Entrance", e['role'], e['osm_id'])
+              for name, e in entrances])
+    conn.commit()
+    cur.close()
+    conn.close()
+    return len(features), len(entrances)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream an OSM extract into the shared property locations')
+    parser.add_argument('extracts', nargs='+', help='Overpass JSON files (.json or .json.gz)')
+    parser.add_argument('--db', action='store_true', help='Also upsert into properties / navigation_nodes')
+    parser.add_argument('--dry-run', action='store_true', help="Report only; don't write files or the DB")
+    parser.add_argument('--show-unmatched', action='store_true',
+                        help='List hotel/casino names that matched no property')
+    args = parser.parse_args()
+
+    registry = read_properties_file()
+    matcher = name_matcher(registry)
+    candidates, entrances, unmatched = {}, [], set()
+    for path in args.extracts:
+        start = time.perf_counter()
+        found, found_entrances, found_unmatched, count = scan(path, matcher)
+        for name, features in found.items():
+            candidates.setdefault(name, []).extend(features)
+        entrances += found_entrances
+        unmatched |= found_unmatched
+        print(f"{path}: {count} elements in {time.perf_counter() - start:.2f}s, "
+              f"{sum(map(len, found.values()))} property features, {len(found_entrances)} entrances")
+
+    features, rejected = choose_features(candidates, registry)
+    assigned = assign_entrances(entrances, features)
+    print(f"Matched {len(features)} of {len(registry['properties'])} properties "
+          f"({sum(1 for f in features.values() if f['rings'])} with footprints), "
+          f"{len(assigned)} of {len(entrances)} entrances, {len(unmatched)} unmatched names")
+    for name in sorted(features):
+        feature = features[name]
+        print(f"  {name:<22} {feature['osm_id']:<18} {feature['osm_name']!r} "
+              f"({feature['area'] / 1e4:.1f} ha)")
+    for name, feature, reason in rejected:
+        print(f"  rejected {feature['osm_id']} {feature['osm_name']!r} for {name}: {reason}")
+    if args.show_unmatched:
+        for name in sorted(unmatched):
+            print(f"  unmatched: {name}")
+
+    if args.dry_run:
+        return 0
+    write_files(registry, features, [os.path.relpath(os.path.abspath(p), PROPERTIES_FILE.parent.parent.parent)
+                                     for p in args.extracts])
+    print(f"Updated {PROPERTIES_FILE} and {FOOTPRINTS_FILE}")
+    if args.db:
+        count, entrance_count = upsert_db(features, assigned)
+        print(f"Upserted {count} properties and {entrance_count} entrances")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Sin City Travels - Consolidated POI dataset
+Compiles the per-file POI tree under data/pois into two files in data/build:
+
+    pois.jsonl  one compact JSON object per line, in POI id order
+    pois.cols   binary columnar table, one row per line of pois.jsonl:
+                id, path, byte offset and length of the JSONL line (the offset
+                index), plus name, category, subcategory, casino_property,
+                area, price_range, lat and lng for scans that don't need the
+                full record, and whether the source file ended with a newline
+                (so export reproduces the files byte for byte)
+
+pois.cols layout: b'POIC', uint32 version, uint32 header length, a JSON
+header describing each column, then the column bytes. Numeric columns are
+raw little-endian arrays, 'dict' columns are uint16 codes into a vocabulary
+kept in the header, and 'str' columns are n+1 uint32 offsets into a UTF-8
+blob. Every column starts on an 8-byte boundary, so PoiDataset can mmap both
+files and read columns as zero-copy memoryviews; get(poi_id) is a dict
+lookup plus one slice of pois.jsonl.
+
+Usage:
+    python scripts/poi_dataset.py build                  (data/pois -> data/build)
+    python scripts/poi_dataset.py export /tmp/pois       (data/build -> per-file JSON)
+    python scripts/poi_dataset.py get poi_123
+"""
+
+import argparse
+import array
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+
+from manifest import Manifest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "data" / "pois"
+BUILD_DIR = PROJECT_ROOT / "data" / "build"
+
+JSONL_NAME = 'pois.jsonl'
+COLUMNS_NAME = 'pois.cols'
+MAGIC = b'POIC'
+VERSION = 2
+PREAMBLE = struct.Struct('<4sII')
+
+# (column, kind, value from (poi, path, offset, length, newline))
+COLUMNS = [
+    ('id', 'str', lambda poi, path, offset, length, newline: poi['id']),
+    ('path', 'str', lambda poi, path, offset, length, newline: path),
+    ('offset', 'u64', lambda poi, path, offset, length, newline: offset),
+    ('length', 'u32', lambda poi, path, offset, length, newline: length),
+    ('name', 'str', lambda poi, path, offset, length, newline: poi.get('name') or ''),
+    ('category', 'dict', lambda poi, path, offset, length, newline: poi.get('category')),
+    ('subcategory', 'dict', lambda poi, path, offset, length, newline: poi.get('subcategory')),
+    ('casino_property', 'dict', lambda poi, path, offset, length, newline: poi.get('casino_property')),
+    ('area', 'dict', lambda poi, path, offset, length, newline: (poi.get('location') or {}).get('area')),
+    ('price_range', 'dict', lambda poi, path, offset, length, newline: (poi.get('pricing') or {}).get('price_range')),
+    ('lat', 'f64', lambda poi, path, offset, length, newline: _coordinate(poi, 'lat')),
+    ('lng', 'f64', lambda poi, path, offset, length, newline: _coordinate(poi, 'lng')),
+    ('newline', 'u8', lambda poi, path, offset, length, newline: newline),
+]
+
+TYPECODES = {'u64': 'Q', 'u32': 'I', 'u8': 'B', 'f64': 'd', 'dict': 'H'}
+
+
+def _coordinate(poi, key):
+    try:
+        return float(poi['location']['coordinates'][key])
+    except (KeyError, TypeError, ValueError):
+        return float('nan')
+
+
+def source_digest(manifest):
+    """Digest of every (id, content hash) in the manifest; changes with any POI file."""
+    digest = hashlib.sha256()
+    for poi_id in sorted(manifest.entries):
+        digest.update(f"{poi_id}:{manifest.entries[poi_id]['hash']}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _encode_column(kind, values):
+    """(header fields, bytes) for one column."""
+    if kind == 'str':
+        blob = bytearray()
+        offsets = array.array('I', [0])
+        for value in values:
+            blob += value.encode('utf-8')
+            offsets.append(len(blob))
+        return {'blob_start': len(offsets) * offsets.itemsize}, offsets.tobytes() + bytes(blob)
+    if kind == 'dict':
+        vocab = sorted({v for v in values if v is not None})
+        codes = {v: i + 1 for i, v in enumerate(vocab)}  # 0 = null
+        return {'vocab': vocab}, array.array('H', (codes.get(v, 0) for v in values)).tobytes()
+    return {}, array.array(TYPECODES[kind], values).tobytes()
+
+
+def build(data_dir=DATA_DIR, build_dir=BUILD_DIR):
+    """Compile data/pois into pois.jsonl + pois.cols; returns the POI count."""
+    manifest = Manifest(data_dir)
+    manifest.refresh()
+    manifest.save()
+    os.makedirs(build_dir, exist_ok=True)
+
+    rows = []
+    jsonl_tmp = os.path.join(build_dir, f".{JSONL_NAME}.tmp")
+    with open(jsonl_tmp, 'wb') as out:
+        for poi_id in manifest.entries:  # saved manifests are in id order
+            path = manifest.entries[poi_id]['path']
+            with open(manifest.abspath(poi_id), 'r', encoding='utf-8') as f:
+                text = f.read()
+            poi = json.loads(text)
+            line = json.dumps(poi, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            rows.append((poi, path, out.tell(), len(line), int(text.endswith('\n'))))
+            out.write(line + b'\n')
+        out.flush()
+        os.fsync(out.fileno())
+
+    header = {'count': len(rows), 'jsonl_bytes': os.path.getsize(jsonl_tmp),
+              'source_digest': source_digest(manifest),
+              'built_at': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), 'columns': []}
+    chunks = []
+    position = 0
+    for name, kind, getter in COLUMNS:
+        fields, data = _encode_column(kind, [getter(*row) for row in rows])
+        header['columns'].append(dict(name=name, kind=kind, start=position, nbytes=len(data), **fields))
+        padding = -len(data) % 8
+        chunks.append(data + b'\0' * padding)
+        position += len(data) + padding
+
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    header_bytes += b' ' * (-(PREAMBLE.size + len(header_bytes)) % 8)
+    columns_tmp = os.path.join(build_dir, f".{COLUMNS_NAME}.tmp")
+    with open(columns_tmp, 'wb') as out:
+        out.write(PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+        out.write(header_bytes)
+        for chunk in chunks:
+            out.write(chunk)
+        out.flush()
+        os.fsync(out.fileno())
+
+    # Readers check jsonl_bytes, so a pair caught mid-swap is detected
+    os.replace(jsonl_tmp, os.path.join(build_dir, JSONL_NAME))
+    os.replace(columns_tmp, os.path.join(build_dir, COLUMNS_NAME))
+    return len(rows)
+
+
+class PoiDataset:
+    """Read-only view of a built dataset; both files are memory-mapped."""
+
+    def __init__(self, build_dir=BUILD_DIR):
+        with open(os.path.join(build_dir, JSONL_NAME), 'rb') as f:
+            jsonl_bytes = os.fstat(f.fileno()).st_size
+            self._jsonl = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if jsonl_bytes else b''
+        with open(os.path.join(build_dir, COLUMNS_NAME), 'rb') as f:
+            self._cols = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_len = PREAMBLE.unpack_from(self._cols, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a version {VERSION} POI column file")
+        self.header = json.loads(bytes(self._cols[PREAMBLE.size:PREAMBLE.size + header_len]))
+        if self.header['jsonl_bytes'] != jsonl_bytes:
+            raise ValueError(f"{JSONL_NAME} does not match {COLUMNS_NAME} (rebuild in progress?)")
+        self._data_start = PREAMBLE.size + header_len
+        self._columns = {c['name']: c for c in self.header['columns']}
+        self._cache = {}
+
+        self.count = self.header['count']
+        self.ids = self.column('id')
+        self.row_of = {poi_id: i for i, poi_id in enumerate(self.ids)}
+        self._offsets = self.column('offset')
+        self._lengths = self.column('length')
+
+    def __len__(self):
+        return self.count
+
+    def _view(self, start, nbytes):
+        begin = self._data_start + start
+        return memoryview(self._cols)[begin:begin + nbytes]
+
+    def column(self, name):
+        """Column values: a memoryview for numbers, a list for strings and dict columns."""
+        if name in self._cache:
+            return self._cache[name]
+        spec = self._columns[name]
+        view = self._view(spec['start'], spec['nbytes'])
+        if spec['kind'] == 'str':
+            offsets = view[:spec['blob_start']].cast('I')
+            blob = view[spec['blob_start']:]
+            values = [str(blob[offsets[i]:offsets[i + 1]], 'utf-8') for i in range(self.count)]
+        elif spec['kind'] == 'dict':
+            vocab = [None] + spec['vocab']
+            values = [vocab[code] for code in view.cast('H')]
+        else:
+            values = view.cast(TYPECODES[spec['kind']])
+        self._cache[name] = values
+        return values
+
+    def raw(self, row):
+        """The JSONL line (bytes) for a row."""
+        offset = self._offsets[row]
+        return self._jsonl[offset:offset + self._lengths[row]]
+
+    def get(self, poi_id):
+        """The POI dict for an id, or None."""
+        row = self.row_of.get(poi_id)
+        return None if row is None else json.loads(self.raw(row))
+
+    def __iter__(self):
+        """Stream every POI in id order."""
+        for row in range(self.count):
+            yield json.loads(self.raw(row))
+
+    def is_current(self, manifest):
+        """True if the dataset was built from the files the manifest describes."""
+        return self.header['source_digest'] == source_digest(manifest)
+
+    def export(self, out_dir):
+        """Write every POI back to its own file (same relative path and format as data/pois)."""
+        paths = self.column('path')
+        newlines = self.column('newline')
+        for row in range(self.count):
+            path = os.path.join(str(out_dir), *paths[row].split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(json.loads(self.raw(row)), f, indent=2, ensure_ascii=False)
+                if newlines[row]:
+                    f.write('\n')
+        return self.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or read the consolidated POI dataset')
+    parser.add_argument('--build-dir', default=str(BUILD_DIR), help=f'Dataset directory (default {BUILD_DIR})')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help='Compile data/pois into the dataset')
+    export_parser = sub.add_parser('export', help='Write the dataset back out as per-file JSON')
+    export_parser.add_argument('out_dir')
+    get_parser = sub.add_parser('get', help='Print one POI by id')
+    get_parser.add_argument('poi_id')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == 'build':
+        count = build(DATA_DIR, args.build_dir)
+        print(f"Built {count} POIs into {args.build_dir} in {time.perf_counter() - start:.2f}s")
+    elif args.command == 'export':
+        count = PoiDataset(args.build_dir).export(args.out_dir)
+        print(f"Exported {count} POIs to {args.out_dir} in {time.perf_counter() - start:.2f}s")
+    else:
+        poi = PoiDataset(args.build_dir).get(args.poi_id)
+        if poi is None:
+            print(f"{args.poi_id} not found", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(poi, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Sin City Travels - Property detection in scraped text
+Shared by scrape_pois.py and enrich_pois.py.
+
+A PropertyDetector compiles all of its aliases into one case-insensitive
+regex, each alias ending in its own capturing group, so a text is scanned
+once no matter how many aliases there are. The match that starts earliest in
+the text wins.
+
+`aliases` and `bare` are regexes; when several match at the same position
+the one listed first wins (list aliases most specific first). With a
+`context` regex (e.g. "at the "), that context must directly precede
+`aliases`; `bare` ones are matched without it. `names` are plain strings,
+compiled as a prefix trie (e.g. c(?:ircus circus|osmopolitan|romwell)) so
+the regex engine tries one branch per character instead of one per name;
+the longest name at a position wins. Everything matches on word boundaries.
+"""
+
+import re
+
+
+def _alternation(aliases, canonical):
+    """One capturing group per alias regex; appends each group's name to canonical."""
+    groups = []
+    for alias, name in aliases:
+        groups.append(f'({alias})')
+        canonical.append(name)
+    return f'(?:{"|".join(groups)})'
+
+
+def _trie(names, canonical):
+    """Prefix-trie regex over plain names; each name ends in an empty capturing group."""
+    root = {}
+    for alias, name in names:
+        node = root
+        for ch in alias.lower():
+            node = node.setdefault(ch, {})
+        node.setdefault('', name)  # first listing of a duplicate wins
+
+    def emit(node):
+        branches = [re.escape(ch) + emit(node[ch]) for ch in sorted(k for k in node if k)]
+        if '' in node:
+            # After the longer branches, so the longest name at a position wins
+            branches.append('()')
+            canonical.append(node[''])
+        return branches[0] if len(branches) == 1 else f'(?:{"|".join(branches)})'
+
+    return emit(root)
+
+
+class PropertyDetector:
+    def __init__(self, aliases=(), context=None, bare=(), names=()):
+        """aliases / bare: [(alias regex, canonical property name)] in priority order;
+        names: [(plain alias, canonical property name)]."""
+        aliases, bare, names = list(aliases), list(bare), list(names)
+        self.canonical = []  # canonical name per capturing group, in group order
+
+        branches = []
+        if aliases:
+            branches.append((context or '') + _alternation(aliases, self.canonical))
+        if bare:
+            branches.append(_alternation(bare, self.canonical))
+        if names:
+            branches.append(_trie(names, self.canonical))
+        pattern = f'(?<!\\w)(?:{"|".join(branches)})(?!\\w)' if branches else r'(?!)'
+        self.regex = re.compile(pattern, re.I)
+
+    def search(self, text):
+        """(canonical name, start offset, end offset) of the first alias in text, or None."""
+        if not text:
+            return None
+        m = self.regex.search(text)
+        if not m:
+            return None
+        return self.canonical[m.lastindex - 1], m.start(), m.end()
+
+    def find(self, text):
+        """Canonical property name of the first alias in text, or None."""
+        found = self.search(text)
+        return found[0] if found else None
+
+
+# "at/inside/in (the) <property>" in venue page content. Requiring the
+# preposition avoids false positives from property names in site navigation.
+VENUE_CONTEXT = r'(?:at|inside|in)\s+(?:the\s+)?'
+VENUE_ALIASES = [
+    # Strip properties - most specific first
+    ('Encore', 'Encore'),
+    ('Wynn', 'Wynn'),
+    ('Bellagio', 'Bellagio'),
+    ('Aria', 'Aria'),
+    ('Cosmopolitan', 'Cosmopolitan'),
+    ('MGM Grand', 'MGM Grand'),
+    ('Mandalay Bay', 'Mandalay Bay'),
+    ('Caesars Palace', 'Caesars Palace'),
+    ('Venetian', 'The Venetian'),
+    ('Palazzo', 'The Palazzo'),
+    ('Paris', 'Paris'),
+    ('Planet Hollywood', 'Planet Hollywood'),
+    ('Flamingo', 'Flamingo'),
+    ('LINQ', 'The LINQ'),
+    ('Cromwell', 'The Cromwell'),
+    ('Horseshoe', 'Horseshoe'),
+    ("Harrah'?s", "Harrah's"),
+    ('Luxor', 'Luxor'),
+    ('Excalibur', 'Excalibur'),
+    ('New York.New York', 'New York New York'),
+    ('Park MGM', 'Park MGM'),
+    ('Treasure Island', 'Treasure Island'),
+    ('Circus Circus', 'Circus Circus'),
+    ('STRAT', 'The STRAT'),
+    ('Resorts World', 'Resorts World'),
+    ('Fontainebleau', 'Fontainebleau'),
+    ('Sahara', 'Sahara'),
+    ('Tropicana', 'Tropicana'),
+    # Downtown
+    ('Golden Nugget', 'Golden Nugget'),
+    ('Downtown Grand', 'Downtown Grand'),
+    ('Circa', 'Circa'),
+    # Off-Strip
+    ('Palms', 'Palms'),
+    ('Rio', 'Rio'),
+]
+VENUE_BARE_ALIASES = [
+    ('Fremont Street', 'Downtown'),
+    ('AREA ?15', 'AREA15'),
+]
+
+# Meta descriptions are short and about the venue itself, so names are
+# matched without the preposition
+META_NAMES = [
+    ('Encore', 'Encore'), ('Wynn', 'Wynn'), ('Bellagio', 'Bellagio'),
+    ('Cosmopolitan', 'Cosmopolitan'), ('MGM Grand', 'MGM Grand'),
+    ('Mandalay Bay', 'Mandalay Bay'), ('Caesars Palace', 'Caesars Palace'),
+    ('Venetian', 'The Venetian'), ('Palazzo', 'The Palazzo'),
+    ('Paris Las Vegas', 'Paris'), ('Paris Hotel', 'Paris'),
+    ('Planet Hollywood', 'Planet Hollywood'), ('Flamingo', 'Flamingo'),
+    ('LINQ', 'The LINQ'), ('Cromwell', 'The Cromwell'),
+    ('Horseshoe', 'Horseshoe'), ("Harrah's", "Harrah's"),
+    ('Luxor', 'Luxor'), ('Excalibur', 'Excalibur'),
+    ('New York-New York', 'New York New York'), ('New York New York', 'New York New York'),
+    ('Park MGM', 'Park MGM'), ('Treasure Island', 'Treasure Island'),
+    ('Circus Circus', 'Circus Circus'), ('STRAT', 'The STRAT'),
+    ('Resorts World', 'Resorts World'), ('Fontainebleau', 'Fontainebleau'),
+    ('Sahara', 'Sahara'), ('Golden Nugget', 'Golden Nugget'),
+    ('Palms', 'Palms'), ('Rio', 'Rio'), ('Circa', 'Circa'),
+    ('Downtown Grand', 'Downtown Grand'), ('AREA15', 'AREA15'),
+]
+
+VENUE_DETECTOR = PropertyDetector(VENUE_ALIASES, context=VENUE_CONTEXT, bare=VENUE_BARE_ALIASES)
+META_DETECTOR = PropertyDetector(names=META_NAMES)
+
+
+def detect_property(text):
+    """Property named as "at/inside/in (the) X" in venue page content."""
+    return VENUE_DETECTOR.find(text)
+
+
+def detect_property_from_meta(meta_text):
+    """Property named anywhere in a page's meta description."""
+    return META_DETECTOR.find(meta_text)
@@ -0,0 +1,35 @@
+"""
+Sin City Travels - Shared property locations
+Shared by scrape_pois.py, enrich_pois.py and osm_ingest.py.
+
+data/maps/properties.json is the one source of property coordinates. It is
+generated by osm_ingest.py: each property's location is the centroid of
+its OSM building footprint where the extract covers it, and the previous
+value elsewhere. Aliases (e.g. "Palazzo" for "The Palazzo") resolve to the
+same entry; an entry's `osm_names` are extra spellings only the OSM matcher
+uses, and `fixed` entries (areas, not buildings) are never moved.
+"""
+
+import json
+from pathlib import Path
+
+PROPERTIES_FILE = Path(__file__).parent.parent / "data" / "maps" / "properties.json"
+FOOTPRINTS_FILE = Path(__file__).parent.parent / "data" / "maps" / "property_footprints.geojson"
+
+
+def read_properties_file(path=PROPERTIES_FILE):
+    """The raw file: {'properties': {name: entry}, 'aliases': {alias: name}, ...}."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_properties(path=PROPERTIES_FILE):
+    """{name: {lat, lng, address, area}} for every property and alias."""
+    data = read_properties_file(path)
+    properties = {
+        name: {key: entry.get(key) for key in ('lat', 'lng', 'address', 'area')}
+        for name, entry in data['properties'].items()
+    }
+    for alias, name in data.get('aliases', {}).items():
+        properties[alias] = properties[name]
+    return properties
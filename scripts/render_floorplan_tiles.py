@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Sin City Travels - Floor-plan tile pyramids
+Renders the property map PDFs in data/attractions/*/ into georeferenced XYZ
+tile pyramids (256 px PNG, Web Mercator), served by the demo app at
+/tiles/floorplans/<slug>/{z}/{x}/{y}.png so phones fetch only the visible
+tiles instead of a 1.5 MB PDF.
+
+data/attractions/floorplans.json says which page of which PDF is a
+property's floor plan, which part of the page is the map, how it is rotated
+and where it sits (explicit bounds, or fitted over the OSM footprint in
+data/maps/property_footprints.geojson). Each tile is rendered straight from
+the PDF's vector content through one page -> tile pixel matrix, so every
+zoom is sharp and no full-page raster is ever held in memory. (layer, zoom)
+jobs for all properties and pages run on a process pool.
+
+Files in data/attractions that are saved HTML pages rather than PDFs are
+reported and skipped. Layers whose PDF, georeference and zoom range are
+unchanged since the last run are skipped (--force re-renders).
+
+Output: data/build/floorplan_tiles/<slug>/{z}/{x}/{y}.png, <slug>/tiles.json
+(bounds, zooms, source) and index.json listing every layer with its
+fingerprint, which the app puts in tile URLs so browsers can cache them for
+good.
+
+Usage:
+    python scripts/render_floorplan_tiles.py
+    python scripts/render_floorplan_tiles.py --min-zoom 15 --max-zoom 20 --workers 4
+    python scripts/render_floorplan_tiles.py Bellagio --force
+
+Requirements:
+    pip install pymupdf
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+
+import pymupdf
+
+from journal import atomic_write_json
+from property_locations import FOOTPRINTS_FILE
+
+PROJECT_ROOT = Path(__file__).parent.parent
+ATTRACTIONS_DIR = PROJECT_ROOT / "data" / "attractions"
+GEOREF_FILE = ATTRACTIONS_DIR / "floorplans.json"
+TILES_DIR = PROJECT_ROOT / "data" / "build" / "floorplan_tiles"
+
+TILE_SIZE = 256
+DEFAULT_MIN_ZOOM = 15
+DEFAULT_MAX_ZOOM = 19
+EARTH_RADIUS = 6378137.0
+ORIGIN = math.pi * EARTH_RADIUS  # Web Mercator half-extent in meters
+
+
+def to_mercator(lng, lat):
+    return (math.radians(lng) * EARTH_RADIUS,
+            math.log(math.tan(math.pi / 4 + math.radians(lat) / 2)) * EARTH_RADIUS)
+
+
+def to_lnglat(x, y):
+    return (math.degrees(x / EARTH_RADIUS),
+            math.degrees(2 * math.atan(math.exp(y / EARTH_RADIUS)) - math.pi / 2))
+
+
+def tile_bounds(z, x, y):
+    """(min x, min y, max x, max y) of an XYZ tile in Web Mercator meters."""
+    size = 2 * ORIGIN / 2 ** z
+    return (-ORIGIN + x * size, ORIGIN - (y + 1) * size, -ORIGIN + (x + 1) * size, ORIGIN - y * size)
+
+
+def footprint_bounds(property_name, path=FOOTPRINTS_FILE):
+    """[west, south, east, north] of a property's OSM footprint, or None."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        for feature in json.load(f)['features']:
+            if feature['properties']['name'] == property_name:
+                points = [p for polygon in feature['geometry']['coordinates'] for ring in polygon for p in ring]
+                return [min(p[0] for p in points), min(p[1] for p in points),
+                        max(p[0] for p in points), max(p[1] for p in points)]
+    return None
+
+
+class Georeference:
+    """Page points -> Web Mercator meters: rotate the clip, scale it and centre it on bounds.
+
+    The rotated clip covers the bounds (the map usually shows more than the
+    building: pools, parking, the street), keeping the page's aspect ratio.
+    """
+
+    def __init__(self, clip, rotation, bounds):
+        self.clip = clip
+        theta = math.radians(rotation)
+        self.cos, self.sin = math.cos(theta), math.sin(theta)
+        (x0, y0), (x1, y1) = to_mercator(bounds[0], bounds[1]), to_mercator(bounds[2], bounds[3])
+        width, height = clip[2] - clip[0], clip[3] - clip[1]
+        extent_x = abs(width * self.cos) + abs(height * self.sin)
+        extent_y = abs(width * self.sin) + abs(height * self.cos)
+        self.scale = max((x1 - x0) / extent_x, (y1 - y0) / extent_y)  # meters per point
+        page_cx, page_cy = (clip[0] + clip[2]) / 2, (clip[1] + clip[3]) / 2
+        east, north = self._rotate(page_cx, page_cy)
+        self.x0 = (x0 + x1) / 2 - east
+        self.y0 = (y0 + y1) / 2 - north
+
+    def _rotate(self, px, py):
+        """Scaled, rotated (east, north) offset of a page point; page y points down."""
+        return (self.scale * (px * self.cos - py * self.sin),
+                self.scale * (-px * self.sin - py * self.cos))
+
+    def to_map(self, px, py):
+        east, north = self._rotate(px, py)
+        return self.x0 + east, self.y0 + north
+
+    def to_page(self, x, y):
+        east, north = (x - self.x0) / self.scale, (y - self.y0) / self.scale
+        return east * self.cos - north * self.sin, -east * self.sin - north * self.cos
+
+    def map_bounds(self):
+        """Mercator (min x, min y, max x, max y) of the clip."""
+        c = self.clip
+        corners = [self.to_map(px, py) for px in (c[0], c[2]) for py in (c[1], c[3])]
+        return (min(x for x, _ in corners), min(y for _, y in corners),
+                max(x for x, _ in corners), max(y for _, y in corners))
+
+    def tile_matrix(self, z, x, y):
+        """pymupdf.Matrix taking page points to pixels of tile (z, x, y)."""
+        min_x, _, _, max_y = tile_bounds(z, x, y)
+        res = 2 * ORIGIN / 2 ** z / TILE_SIZE  # meters per pixel
+        k = self.scale / res
+        return pymupdf.Matrix(k * self.cos, k * self.sin, -k * self.sin, k * self.cos,
+                              (self.x0 - min_x) / res, (max_y - self.y0) / res)
+
+    def tile_range(self, z):
+        """Inclusive (x0, y0, x1, y1) XYZ tile range covering the clip at zoom z."""
+        min_x, min_y, max_x, max_y = self.map_bounds()
+        size = 2 * ORIGIN / 2 ** z
+        return (int((min_x + ORIGIN) // size), int((ORIGIN - max_y) // size),
+                int((max_x + ORIGIN) // size), int((ORIGIN - min_y) // size))
+
+    def page_clip(self, z, x, y):
+        """Part of the clip (page points) that falls in tile (z, x, y)."""
+        min_x, min_y, max_x, max_y = tile_bounds(z, x, y)
+        corners = [self.to_page(mx, my) for mx in (min_x, max_x) for my in (min_y, max_y)]
+        rect = pymupdf.Rect(min(p[0] for p in corners), min(p[1] for p in corners),
+                            max(p[0] for p in corners), max(p[1] for p in corners))
+        return rect & pymupdf.Rect(self.clip)
+
+
+def is_real_pdf(path):
+    """True for an actual PDF (some downloads are saved HTML pages)."""
+    with open(path, 'rb') as f:
+        return f.read(1024).lstrip().startswith(b'%PDF')
+
+
+def load_layers(georef_path=GEOREF_FILE, only=None):
+    """(layers, problems): one layer per georeferenced property, plus why others were skipped."""
+    with open(georef_path, 'r', encoding='utf-8') as f:
+        config = {slug: entry for slug, entry in json.load(f).items() if not slug.startswith('_')}
+
+    layers, problems = [], []
+    for directory in sorted(p for p in ATTRACTIONS_DIR.iterdir() if p.is_dir()):
+        slug = directory.name
+        if only and slug not in only:
+            continue
+        pdfs = sorted(directory.glob('*.pdf'))
+        real = [p for p in pdfs if is_real_pdf(p)]
+        for pdf in pdfs:
+            if pdf not in real:
+                problems.append(f"{slug}/{pdf.name}: not a PDF (saved HTML page)")
+        entry = config.get(slug)
+        if entry is None:
+            if real:
+                problems.append(f"{slug}: no entry in {georef_path.name}")
+            continue
+        pdf = directory / entry['pdf']
+        if pdf not in real:
+            problems.append(f"{slug}/{entry['pdf']}: missing or not a PDF")
+            continue
+        bounds = entry.get('bounds') or footprint_bounds(entry['property'])
+        if bounds is None:
+            problems.append(f"{slug}: no bounds and no footprint for {entry['property']!r}")
+            continue
+        page = entry.get('page', 0)
+        clip = entry.get('clip') or list(pymupdf.open(pdf)[page].rect)
+        layers.append({'slug': slug, 'property': entry['property'], 'pdf': str(pdf), 'page': page,
+                       'clip': clip, 'rotation': entry.get('rotation', 0), 'bounds': bounds})
+    return layers, problems
+
+
+def fingerprint(layer, min_zoom, max_zoom):
+    digest = hashlib.sha1()
+    with open(layer['pdf'], 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    digest.update(json.dumps([layer, min_zoom, max_zoom, TILE_SIZE], sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=8)
+def page_display_list(pdf, page):
+    """The page's parsed drawing commands, replayed for every tile instead of re-parsing the PDF."""
+    return pymupdf.open(pdf)[page].get_displaylist()
+
+
+def render_tile(display_list, georef, z, x, y):
+    """PNG bytes of one tile, or None where the floor plan doesn't reach."""
+    clip = georef.page_clip(z, x, y)
+    if clip.is_empty:
+        return None
+    pix = display_list.get_pixmap(matrix=georef.tile_matrix(z, x, y), clip=clip, alpha=True)
+    tile = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, TILE_SIZE, TILE_SIZE), True)
+    tile.clear_with(0)
+    tile.copy(pix, pix.irect)
+    if not any(tile.samples[3::4]):  # fully transparent (RGBA samples)
+        return None
+    return tile.tobytes('png')
+
+
+def render_zoom(layer, z, out_dir):
+    """Render every tile of one layer at one zoom; returns (slug, z, tiles written)."""
+    display_list = page_display_list(layer['pdf'], layer['page'])
+    georef = Georeference(layer['clip'], layer['rotation'], layer['bounds'])
+    x0, y0, x1, y1 = georef.tile_range(z)
+    written = 0
+    for x in range(x0, x1 + 1):
+        column = os.path.join(out_dir, str(z), str(x))
+        for y in range(y0, y1 + 1):
+            png = render_tile(display_list, georef, z, x, y)
+            if png is None:
+                continue
+            os.makedirs(column, exist_ok=True)
+            with open(os.path.join(column, f'{y}.png'), 'wb') as f:
+                f.write(png)
+            written += 1
+    return layer['slug'], z, written
+
+
+def render_all(layers, min_zoom, max_zoom, workers=None, force=False, tiles_dir=TILES_DIR):
+    """Render stale layers on a process pool; returns {slug: tiles.json metadata}."""
+    os.makedirs(tiles_dir, exist_ok=True)
+    metadata, stale = {}, []
+    for layer in layers:
+        layer_dir = os.path.join(tiles_dir, layer['slug'])
+        key = fingerprint(layer, min_zoom, max_zoom)
+        try:
+            with open(os.path.join(layer_dir, 'tiles.json'), 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            previous = None
+        if previous and previous.get('fingerprint') == key and not force:
+            metadata[layer['slug']] = previous
+            continue
+        # Render into a staging directory; the live layer is swapped out when it's complete
+        staging = f"{layer_dir}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        stale.append((layer, key, staging))
+
+    jobs = [(layer, z, staging) for layer, _, staging in stale for z in range(min_zoom, max_zoom + 1)]
+    counts = {}
+    if workers == 1:
+        results = (render_zoom(*job) for job in jobs)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = (future.result() for future in as_completed([pool.submit(render_zoom, *job) for job in jobs]))
+    try:
+        for slug, z, written in results:
+            counts[slug] = counts.get(slug, 0) + written
+    finally:
+        if workers != 1:
+            pool.shutdown()
+
+    for layer, key, staging in stale:
+        georef = Georeference(layer['clip'], layer['rotation'], layer['bounds'])
+        min_x, min_y, max_x, max_y = georef.map_bounds()
+        west, south = to_lnglat(min_x, min_y)
+        east, north = to_lnglat(max_x, max_y)
+        meta = {
+            'slug': layer['slug'], 'property': layer['property'],
+            'source': os.path.relpath(layer['pdf'], PROJECT_ROOT), 'page': layer['page'],
+            'bounds': [round(v, 7) for v in (west, south, east, north)],
+            'minzoom': min_zoom, 'maxzoom': max_zoom, 'tiles': counts.get(layer['slug'], 0),
+            'fingerprint': key, 'generated_at': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        atomic_write_json(os.path.join(staging, 'tiles.json'), meta)
+        layer_dir = os.path.join(tiles_dir, layer['slug'])
+        retired = f"{layer_dir}.old"
+        shutil.rmtree(retired, ignore_errors=True)
+        if os.path.exists(layer_dir):
+            os.replace(layer_dir, retired)
+        os.replace(staging, layer_dir)
+        shutil.rmtree(retired, ignore_errors=True)
+        metadata[layer['slug']] = meta
+    return metadata
+
+
+def write_index(tiles_dir=TILES_DIR):
+    """index.json: tiles.json of every rendered layer, for the app's /api/floorplans.
+
+    The fingerprint changes whenever a layer is re-rendered differently; the
+    app versions the layer's tile URLs with it.
+    """
+    layers = []
+    for path in sorted(glob.glob(os.path.join(str(tiles_dir), '*', 'tiles.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        layers.append({key: meta[key] for key in ('slug', 'property', 'bounds', 'minzoom', 'maxzoom', 'fingerprint')})
+    atomic_write_json(os.path.join(tiles_dir, 'index.json'), {'layers': layers})
+    return layers
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render floor-plan PDFs into XYZ tile pyramids')
+    parser.add_argument('slugs', nargs='*', help='data/attractions directories to render (default: all)')
+    parser.add_argument('--min-zoom', type=int, default=DEFAULT_MIN_ZOOM)
+    parser.add_argument('--max-zoom', type=int, default=DEFAULT_MAX_ZOOM)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Render processes (default: CPU count; 1 renders in this process)')
+    parser.add_argument('--force', action='store_true', help='Re-render layers that are up to date')
+    args = parser.parse_args()
+
+    layers, problems = load_layers(only=set(args.slugs) or None)
+    for problem in problems:
+        print(f"  skipped {problem}")
+    start = time.perf_counter()
+    metadata = render_all(layers, args.min_zoom, args.max_zoom, args.workers, args.force)
+    for slug, meta in sorted(metadata.items()):
+        print(f"  {slug:<20} {meta['tiles']:>6} tiles, z{meta['minzoom']}-{meta['maxzoom']}, "
+              f"bounds {meta['bounds']}")
+    write_index()
+    print(f"Rendered {len(layers)} floor plans in {time.perf_counter() - start:.1f}s -> {TILES_DIR}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,21 +11,23 @@ Usage:
     python scrape_pois.py --category attractions
     python scrape_pois.py --category all
     python scrape_pois.py --category all --details   (scrapes individual pages - slower)
+    python scrape_pois.py --category all --details --concurrency 8 --rate 2
+    python scrape_pois.py --category all --details --offline   (re-parse cached pages only)
 """
 
-import json
 import os
 import re
-import time
 import argparse
 from datetime import datetime, timezone
 from pathlib import Path
 
-import requests
 from bs4 import BeautifulSoup
 
-# Rate limiting
-REQUEST_DELAY = 1.5  # seconds between requests
+from fetcher import Fetcher, PageCache, MAX_CONCURRENCY, REQUESTS_PER_SECOND
+from journal import atomic_write_json
+from manifest import Manifest
+from property_detector import PropertyDetector
+from property_locations import load_properties
 
 BASE_URL = "https://www.smartervegas.com"
 
@@ -36,209 +38,8 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.5",
 }
 
-# All properties with coordinates, addresses, and Strip areas
-PROPERTIES = {
-    "Aria": {
-        "lat": 36.1067, "lng": -115.1761,
-        "address": "3730 Las Vegas Blvd S, Las Vegas, NV 89158",
-        "area": "Mid Strip"
-    },
-    "Bellagio": {
-        "lat": 36.1127, "lng": -115.1765,
-        "address": "3600 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "Mid Strip"
-    },
-    "Caesars Palace": {
-        "lat": 36.1162, "lng": -115.1744,
-        "address": "3570 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "Mid Strip"
-    },
-    "Casino Royale": {
-        "lat": 36.1200, "lng": -115.1721,
-        "address": "3411 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "Mid Strip"
-    },
-    "Circus Circus": {
-        "lat": 36.1367, "lng": -115.1631,
-        "address": "2880 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "North Strip"
-    },
-    "Cosmopolitan": {
-        "lat": 36.1095, "lng": -115.1742,
-        "address": "3708 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "Mid Strip"
-    },
-    "Encore": {
-        "lat": 36.1289, "lng": -115.1650,
-        "address": "3121 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "North Strip"
-    },
-    "Excalibur": {
-        "lat": 36.0987, "lng": -115.1754,
-        "address": "3850 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "South Strip"
-    },
-    "Fashion Show Mall": {
-        "lat": 36.1268, "lng": -115.1700,
-        "address": "3200 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "North Strip"
-    },
-    "Flamingo": {
-        "lat": 36.1162, "lng": -115.1714,
-        "address": "3555 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "Mid Strip"
-    },
-    "Fontainebleau": {
-        "lat": 36.1361, "lng": -115.1568,
-        "address": "2777 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "North Strip"
-    },
-    "Four Seasons": {
-        "lat": 36.0909, "lng": -115.1753,
-        "address": "3960 Las Vegas Blvd S, Las Vegas, NV 89119",
-        "area": "South Strip"
-    },
-    "Hard Rock": {
-        "lat": 36.1246, "lng": -115.1679,
-        "address": "3580 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "Mid Strip"
-    },
-    "Harrah's": {
-        "lat": 36.1190, "lng": -115.1726,
-        "address": "3475 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "Mid Strip"
-    },
-    "Horseshoe": {
-        "lat": 36.1190, "lng": -115.1726,
-        "address": "3475 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "Mid Strip"
-    },
-    "Luxor": {
-        "lat": 36.0955, "lng": -115.1761,
-        "address": "3900 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "South Strip"
-    },
-    "Mandalay Bay": {
-        "lat": 36.0909, "lng": -115.1743,
-        "address": "3950 Las Vegas Blvd S, Las Vegas, NV 89119",
-        "area": "South Strip"
-    },
-    "MGM Grand": {
-        "lat": 36.1024, "lng": -115.1698,
-        "address": "3799 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "South Strip"
-    },
-    "New York New York": {
-        "lat": 36.1022, "lng": -115.1745,
-        "address": "3790 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "South Strip"
-    },
-    "NoMad": {
-        "lat": 36.1028, "lng": -115.1709,
-        "address": "3772 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "South Strip"
-    },
-    "Palazzo": {
-        "lat": 36.1228, "lng": -115.1693,
-        "address": "3325 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "North Strip"
-    },
-    "Paris": {
-        "lat": 36.1125, "lng": -115.1707,
-        "address": "3655 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "Mid Strip"
-    },
-    "Park MGM": {
-        "lat": 36.1028, "lng": -115.1709,
-        "address": "3770 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "South Strip"
-    },
-    "Planet Hollywood": {
-        "lat": 36.1097, "lng": -115.1708,
-        "address": "3663 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "Mid Strip"
-    },
-    "Resorts World": {
-        "lat": 36.1380, "lng": -115.1652,
-        "address": "3000 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "North Strip"
-    },
-    "Sahara": {
-        "lat": 36.1413, "lng": -115.1567,
-        "address": "2535 Las Vegas Blvd S, Las Vegas, NV 89104",
-        "area": "North Strip"
-    },
-    "The Cromwell": {
-        "lat": 36.1168, "lng": -115.1722,
-        "address": "3595 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "Mid Strip"
-    },
-    "The LINQ": {
-        "lat": 36.1176, "lng": -115.1710,
-        "address": "3535 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "Mid Strip"
-    },
-    "The Palazzo": {
-        "lat": 36.1228, "lng": -115.1693,
-        "address": "3325 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "North Strip"
-    },
-    "The Signature": {
-        "lat": 36.1024, "lng": -115.1665,
-        "address": "145 E Harmon Ave, Las Vegas, NV 89109",
-        "area": "South Strip"
-    },
-    "The STRAT": {
-        "lat": 36.1474, "lng": -115.1557,
-        "address": "2000 Las Vegas Blvd S, Las Vegas, NV 89104",
-        "area": "North Strip"
-    },
-    "The Strip": {
-        "lat": 36.1147, "lng": -115.1728,
-        "address": "Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "Mid Strip"
-    },
-    "The Venetian": {
-        "lat": 36.1212, "lng": -115.1697,
-        "address": "3355 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "North Strip"
-    },
-    "Treasure Island": {
-        "lat": 36.1247, "lng": -115.1709,
-        "address": "3300 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "North Strip"
-    },
-    "Tropicana": {
-        "lat": 36.1012, "lng": -115.1730,
-        "address": "3801 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "South Strip"
-    },
-    "Trump": {
-        "lat": 36.1270, "lng": -115.1686,
-        "address": "2000 Fashion Show Dr, Las Vegas, NV 89109",
-        "area": "North Strip"
-    },
-    "Vdara": {
-        "lat": 36.1080, "lng": -115.1773,
-        "address": "2600 W Harmon Ave, Las Vegas, NV 89158",
-        "area": "Mid Strip"
-    },
-    "W Las Vegas": {
-        "lat": 36.1024, "lng": -115.1665,
-        "address": "3950 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "South Strip"
-    },
-    "Waldorf Astoria": {
-        "lat": 36.1070, "lng": -115.1755,
-        "address": "3752 Las Vegas Blvd S, Las Vegas, NV 89158",
-        "area": "Mid Strip"
-    },
-    "Wynn": {
-        "lat": 36.1264, "lng": -115.1660,
-        "address": "3131 Las Vegas Blvd S, Las Vegas, NV 89109",
-        "area": "North Strip"
-    },
-}
+# All properties with coordinates, addresses, and Strip areas (data/maps/properties.json)
+PROPERTIES = load_properties()
 
 # Fast food / chain restaurants to exclude
 CHAINS_TO_SKIP = {
@@ -251,21 +52,127 @@ CHAINS_TO_SKIP = {
     "white castle", "pressed juicery", "wok to walk", "ben & jerry's",
 }
 
+# Property names in detail-page text; the first one mentioned wins
+PROPERTY_NAME_DETECTOR = PropertyDetector(names=((name, name) for name in PROPERTIES))
+
+# Shows with a known home property, matched against show names
+SHOW_VENUES = {
+    "O by Cirque": "Bellagio", '"O"': "Bellagio",
+    "KA": "MGM Grand", "KÀ": "MGM Grand",
+    "Mystere": "Treasure Island", "Mystère": "Treasure Island",
+    "Beatles LOVE": "Mandalay Bay", "LOVE": "Mandalay Bay",
+    "Blue Man Group": "Luxor",
+    "Absinthe": "Caesars Palace",
+    "David Copperfield": "MGM Grand",
+    "Michael Jackson ONE": "Mandalay Bay", "MJ ONE": "Mandalay Bay",
+    "Mac King": "Excalibur",
+    "Mat Franco": "The LINQ",
+    "Shin Lim": "The LINQ",
+    "Terry Fator": "New York New York",
+    "Thunder From Down Under": "Excalibur",
+    "Tournament of Kings": "Excalibur",
+    "Mad Apple": "New York New York",
+    "Carrot Top": "Luxor",
+    "Fantasy": "Luxor",
+    "Zombie Burlesque": "Planet Hollywood",
+    "V - The Ultimate Variety": "Planet Hollywood",
+    "Piff the Magic Dragon": "Flamingo",
+    "RuPaul's Drag Race": "Flamingo",
+    "Donny Osmond": "Harrah's",
+    "Tape Face": "Harrah's",
+    "Xavier Mortimer": "The STRAT",
+    "Banachek": "The STRAT",
+}
+SHOW_DETECTOR = PropertyDetector(names=SHOW_VENUES.items())
+
+# Nightlife venues with a known property, matched against venue names
+NIGHTLIFE_VENUES = {
+    "XS Nightclub": "Encore", "XS": "Encore",
+    "Encore Beach Club": "Encore", "EBC": "Encore",
+    "Hakkasan": "MGM Grand",
+    "JEWEL": "Aria", "Jewel": "Aria",
+    "Marquee Nightclub": "Cosmopolitan", "Marquee Dayclub": "Cosmopolitan",
+    "OMNIA": "Caesars Palace",
+    "On The Record": "Park MGM",
+    "LIV Nightclub": "Fontainebleau", "LIV Beach": "Fontainebleau",
+    "Liquid": "Aria",
+    "Venus Pool": "Caesars Palace",
+    "Go Pool": "Flamingo",
+    "Daylight": "Mandalay Bay", "Moorea": "Mandalay Bay",
+    "Foundation Room": "Mandalay Bay",
+    "Vanderpump": "Paris",
+    "Chandelier": "Cosmopolitan",
+    "Lily Bar": "Bellagio",
+    "Hyde": "Bellagio",
+    "Skyfall": "Mandalay Bay",
+    "Drai's": "The Cromwell",
+}
+NIGHTLIFE_DETECTOR = PropertyDetector(names=NIGHTLIFE_VENUES.items())
+
+# Attractions with a known property, matched against attraction names
+ATTRACTION_VENUES = {
+    "Adventuredome": "Circus Circus", "Indoor Circus": "Circus Circus",
+    "The Midway": "Circus Circus", "Slots-A-Fun": "Circus Circus",
+    "Conservatory": "Bellagio", "Fountains": "Bellagio",
+    "Gallery of Fine Art": "Bellagio",
+    "High Roller": "The LINQ", "Fly LINQ": "The LINQ",
+    "DreamBox": "The LINQ", "VR Adventures": "The LINQ",
+    "Eiffel Tower": "Paris",
+    "Gondola": "The Venetian", "Madame Tussauds": "The Venetian",
+    "PanIQ": "The Venetian",
+    "Shark Reef": "Mandalay Bay", "Swingers": "Mandalay Bay",
+    "Bob Marley": "Mandalay Bay",
+    "SkyJump": "The STRAT", "Big Shot": "The STRAT",
+    "X Scream": "The STRAT", "STRAT Tower": "The STRAT",
+    "Atomic Golf": "The STRAT",
+    "Lake of Dreams": "Wynn", "Wynn Golf": "Wynn",
+    "Hershey": "New York New York", "Roller Coaster": "New York New York",
+    "BODIES": "Luxor", "King Tut": "Luxor", "Titanic": "Luxor",
+    "HyperX": "Luxor", "Play Playground": "Luxor",
+    "Fun Dungeon": "Excalibur", "Max Flight": "Excalibur",
+    "Ultimate 4-D": "Excalibur",
+    "Electric Playhouse": "Caesars Palace", "F1 Arcade": "Caesars Palace",
+    "Escape Game": "Caesars Palace", "Atlantis Show": "Caesars Palace",
+    "Arte Museum": "Cosmopolitan", "Museum of Illusions": "Cosmopolitan",
+    "Arcade at Horseshoe": "Horseshoe", "BattleBots": "Horseshoe",
+    "Real Bodies": "Horseshoe", "Twilight Zone": "Horseshoe",
+    "Friends Experience": "MGM Grand", "Topgolf": "MGM Grand",
+    "Virtual Reality": "MGM Grand",
+    "Haus of Gaga": "Park MGM",
+    "Wildlife Habitat": "Flamingo",
+    "Princess Diana": "Aria", "Van Gogh": "Aria",
+    "The Cove": "Treasure Island",
+    "Hall of Excellence": "Fontainebleau",
+}
+ATTRACTION_DETECTOR = PropertyDetector(names=ATTRACTION_VENUES.items())
+
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data" / "pois"
 
 
-def fetch_page(url, delay=REQUEST_DELAY):
-    """Fetch a page with rate limiting and error handling."""
-    time.sleep(delay)
-    try:
-        resp = requests.get(url, headers=HEADERS, timeout=30)
-        resp.raise_for_status()
-        return BeautifulSoup(resp.text, "lxml")
-    except requests.RequestException as e:
-        print(f"  [ERROR] Failed to fetch {url}: {e}")
+PAGE_CACHE_DIR = PROJECT_ROOT / ".cache" / "pages"
+
+# Shared rate-limited session; replaced in main() according to the command line
+FETCHER = Fetcher(HEADERS, cache=PageCache(PAGE_CACHE_DIR))
+
+
+def fetch_page(url):
+    """Fetch and parse a page through the shared rate-limited session."""
+    html = FETCHER.get(url)
+    if html is None:
         return None
+    return BeautifulSoup(html, "lxml")
+
+
+def prefetch_details(items, detail_fn):
+    """Scrape detail pages for items concurrently; returns {url: details}."""
+    urls = list(dict.fromkeys(item['url'] for item in items if item.get('url')))
+    if not urls:
+        return {}
+    print(f"  Fetching {len(urls)} detail pages "
+          f"({FETCHER.max_workers} workers, {FETCHER.rate:g} req/s per host)...")
+    return dict(zip(urls, FETCHER.map(detail_fn, urls)))
 
 
 def make_filename(name, property_name):
@@ -275,23 +182,6 @@ def make_filename(name, property_name):
     return f"{slug}_{prop_slug}"
 
 
-def get_next_poi_id():
-    """Scan all existing POI files to find the next available ID number."""
-    max_id = 49  # Current max from existing POIs
-    for root, dirs, files in os.walk(DATA_DIR):
-        for f in files:
-            if f.endswith('.json'):
-                try:
-                    with open(os.path.join(root, f), 'r', encoding='utf-8') as fh:
-                        data = json.load(fh)
-                        if 'id' in data:
-                            num = int(data['id'].replace('poi_', ''))
-                            max_id = max(max_id, num)
-                except (json.JSONDecodeError, ValueError, KeyError):
-                    pass
-    return max_id + 1
-
-
 def create_poi_json(poi_id, name, category, subcategory, property_name,
                     description="", features=None, tags=None,
                     price_range=None, cuisine=None, cuisine_raw=None,
@@ -460,15 +350,27 @@ def scrape_restaurant_detail(url):
     return details
 
 
-def generate_restaurant_pois(restaurants_by_property, scrape_details=False):
+def generate_restaurant_pois(restaurants_by_property, scrape_details=False, manifest=None):
     """Generate POI JSON files for restaurants."""
     output_dir = str(DATA_DIR / "restaurants")
     os.makedirs(output_dir, exist_ok=True)
-    poi_id = get_next_poi_id()
+    manifest = manifest or Manifest(DATA_DIR)
     created = 0
     skipped_chains = 0
     skipped_existing = 0
 
+    details_by_url = {}
+    if scrape_details:
+        pending = [
+            rest for property_name, restaurants in restaurants_by_property.items()
+            for rest in restaurants
+            if rest['name'].lower().strip() not in CHAINS_TO_SKIP
+            and not manifest.find(rest['name'], property_name)
+            and not os.path.exists(os.path.join(
+                output_dir, f"{make_filename(rest['name'], property_name)}.json"))
+        ]
+        details_by_url = prefetch_details(pending, scrape_restaurant_detail)
+
     for property_name, restaurants in sorted(restaurants_by_property.items()):
         print(f"\n  {property_name} ({len(restaurants)} restaurants)...")
 
@@ -483,14 +385,12 @@ def generate_restaurant_pois(restaurants_by_property, scrape_details=False):
             filename = make_filename(name, property_name)
             filepath = os.path.join(output_dir, f"{filename}.json")
 
-            if os.path.exists(filepath):
+            if manifest.find(name, property_name) or os.path.exists(filepath):
                 skipped_existing += 1
                 continue
 
-            # Optionally get more details from individual page
-            details = {}
-            if scrape_details and rest.get('url'):
-                details = scrape_restaurant_detail(rest['url'])
+            # Details from the individual page, if they were prefetched
+            details = details_by_url.get(rest.get('url')) or {}
 
             cuisine_raw = rest.get('cuisine_raw', '')
             cuisine_list = parse_cuisine(cuisine_raw)
@@ -499,6 +399,7 @@ def generate_restaurant_pois(restaurants_by_property, scrape_details=False):
             price_range = details.get('price_range') or infer_price_range(name, cuisine_raw)
             phone = details.get('phone')
 
+            poi_id = manifest.reserve_id()
             poi = create_poi_json(
                 poi_id=poi_id,
                 name=name,
@@ -515,13 +416,13 @@ def generate_restaurant_pois(restaurants_by_property, scrape_details=False):
                 website=rest.get('url', ''),
             )
 
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(poi, f, indent=2, ensure_ascii=False)
+            atomic_write_json(filepath, poi)
+            manifest.update(filepath)
 
             print(f"    [NEW] poi_{poi_id:03d} - {name} ({cuisine_raw or 'unknown'})")
-            poi_id += 1
             created += 1
 
+    manifest.save()
     print(f"\n  === Restaurant Summary ===")
     print(f"  Created: {created}")
     print(f"  Skipped chains: {skipped_chains}")
@@ -570,11 +471,10 @@ def scrape_show_detail(url):
     details = {}
     text = soup.get_text(' ', strip=True)
 
-    # Property from text
-    for prop_name in PROPERTIES:
-        if prop_name.lower() in text.lower():
-            details['property'] = prop_name
-            break
+    # Property from text (first property name mentioned)
+    prop_name = PROPERTY_NAME_DETECTOR.find(text)
+    if prop_name:
+        details['property'] = prop_name
 
     # Meta description
     meta = soup.find('meta', attrs={'name': 'description'})
@@ -589,21 +489,20 @@ def scrape_show_detail(url):
     return details
 
 
-def generate_show_pois(shows, scrape_details=False):
+def generate_show_pois(shows, scrape_details=False, manifest=None):
     """Generate POI JSON files for shows."""
     output_dir = str(DATA_DIR / "shows")
     os.makedirs(output_dir, exist_ok=True)
-    poi_id = get_next_poi_id()
+    manifest = manifest or Manifest(DATA_DIR)
     created = 0
 
     print(f"\n  Processing {len(shows)} shows...")
+    details_by_url = prefetch_details(shows, scrape_show_detail) if scrape_details else {}
 
     for show in shows:
         name = show['name']
 
-        details = {}
-        if scrape_details and show.get('url'):
-            details = scrape_show_detail(show['url'])
+        details = details_by_url.get(show.get('url')) or {}
 
         property_name = details.get('property') or infer_show_property(name)
         description = details.get('description', '')
@@ -612,12 +511,13 @@ def generate_show_pois(shows, scrape_details=False):
         filename = make_filename(name, property_name or 'las_vegas')
         filepath = os.path.join(output_dir, f"{filename}.json")
 
-        if os.path.exists(filepath):
+        if manifest.find(name, property_name) or os.path.exists(filepath):
             continue
 
         price_from = details.get('price_from')
         price_range = "$$$$" if price_from and price_from > 80 else "$$$" if price_from and price_from > 40 else "$$"
 
+        poi_id = manifest.reserve_id()
         poi = create_poi_json(
             poi_id=poi_id,
             name=name,
@@ -635,13 +535,13 @@ def generate_show_pois(shows, scrape_details=False):
             poi['casino_property'] = "Las Vegas Strip"
             poi['location']['area'] = 'Las Vegas Strip'
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(poi, f, indent=2, ensure_ascii=False)
+        atomic_write_json(filepath, poi)
+        manifest.update(filepath)
 
         print(f"    [NEW] poi_{poi_id:03d} - {name} ({property_name or 'TBD'})")
-        poi_id += 1
         created += 1
 
+    manifest.save()
     print(f"\n  Created {created} show POIs")
     return created
 
@@ -702,10 +602,9 @@ def scrape_nightlife_detail(url):
     details = {}
     text = soup.get_text(' ', strip=True)
 
-    for prop_name in PROPERTIES:
-        if prop_name.lower() in text.lower():
-            details['property'] = prop_name
-            break
+    prop_name = PROPERTY_NAME_DETECTOR.find(text)
+    if prop_name:
+        details['property'] = prop_name
 
     meta = soup.find('meta', attrs={'name': 'description'})
     if meta:
@@ -714,9 +613,9 @@ def scrape_nightlife_detail(url):
     return details
 
 
-def generate_nightlife_pois(venues, scrape_details=False):
+def generate_nightlife_pois(venues, scrape_details=False, manifest=None):
     """Generate POI JSON files for nightlife venues."""
-    poi_id = get_next_poi_id()
+    manifest = manifest or Manifest(DATA_DIR)
     created = 0
 
     type_config = {
@@ -743,13 +642,12 @@ def generate_nightlife_pois(venues, scrape_details=False):
         os.makedirs(output_dir, exist_ok=True)
 
         print(f"\n  Processing {venue_type} ({len(venue_list)} venues)...")
+        details_by_url = prefetch_details(venue_list, scrape_nightlife_detail) if scrape_details else {}
 
         for venue in venue_list:
             name = venue['name']
 
-            details = {}
-            if scrape_details and venue.get('url'):
-                details = scrape_nightlife_detail(venue['url'])
+            details = details_by_url.get(venue.get('url')) or {}
 
             property_name = details.get('property') or infer_nightlife_property(name)
             description = details.get('description', '')
@@ -757,9 +655,10 @@ def generate_nightlife_pois(venues, scrape_details=False):
             filename = make_filename(name, property_name or 'las_vegas')
             filepath = os.path.join(output_dir, f"{filename}.json")
 
-            if os.path.exists(filepath):
+            if manifest.find(name, property_name) or os.path.exists(filepath):
                 continue
 
+            poi_id = manifest.reserve_id()
             poi = create_poi_json(
                 poi_id=poi_id,
                 name=name,
@@ -777,13 +676,13 @@ def generate_nightlife_pois(venues, scrape_details=False):
                 poi['casino_property'] = "Las Vegas Strip"
                 poi['location']['area'] = 'Las Vegas Strip'
 
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(poi, f, indent=2, ensure_ascii=False)
+            atomic_write_json(filepath, poi)
+            manifest.update(filepath)
 
             print(f"    [NEW] poi_{poi_id:03d} - {name} ({property_name or 'TBD'})")
-            poi_id += 1
             created += 1
 
+    manifest.save()
     print(f"\n  Created {created} nightlife POIs total")
     return created
 
@@ -829,10 +728,9 @@ def scrape_attraction_detail(url):
     details = {}
     text = soup.get_text(' ', strip=True)
 
-    for prop_name in PROPERTIES:
-        if prop_name.lower() in text.lower():
-            details['property'] = prop_name
-            break
+    prop_name = PROPERTY_NAME_DETECTOR.find(text)
+    if prop_name:
+        details['property'] = prop_name
 
     meta = soup.find('meta', attrs={'name': 'description'})
     if meta:
@@ -845,21 +743,20 @@ def scrape_attraction_detail(url):
     return details
 
 
-def generate_attraction_pois(attractions, scrape_details=False):
+def generate_attraction_pois(attractions, scrape_details=False, manifest=None):
     """Generate POI JSON files for attractions."""
     output_dir = str(DATA_DIR / "attractions")
     os.makedirs(output_dir, exist_ok=True)
-    poi_id = get_next_poi_id()
+    manifest = manifest or Manifest(DATA_DIR)
     created = 0
 
     print(f"\n  Processing {len(attractions)} attractions...")
+    details_by_url = prefetch_details(attractions, scrape_attraction_detail) if scrape_details else {}
 
     for attr in attractions:
         name = attr['name']
 
-        details = {}
-        if scrape_details and attr.get('url'):
-            details = scrape_attraction_detail(attr['url'])
+        details = details_by_url.get(attr.get('url')) or {}
 
         property_name = details.get('property') or infer_attraction_property(name)
         description = details.get('description', '')
@@ -868,12 +765,13 @@ def generate_attraction_pois(attractions, scrape_details=False):
         filename = make_filename(name, property_name or 'las_vegas')
         filepath = os.path.join(output_dir, f"{filename}.json")
 
-        if os.path.exists(filepath):
+        if manifest.find(name, property_name) or os.path.exists(filepath):
             continue
 
         price_from = details.get('price_from')
         price_range = "$$$" if price_from and price_from > 30 else "$$"
 
+        poi_id = manifest.reserve_id()
         poi = create_poi_json(
             poi_id=poi_id,
             name=name,
@@ -891,13 +789,13 @@ def generate_attraction_pois(attractions, scrape_details=False):
             poi['casino_property'] = "Off-Strip"
             poi['location']['area'] = 'Las Vegas'
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(poi, f, indent=2, ensure_ascii=False)
+        atomic_write_json(filepath, poi)
+        manifest.update(filepath)
 
         print(f"    [NEW] poi_{poi_id:03d} - {name} ({property_name or 'Las Vegas'})")
-        poi_id += 1
         created += 1
 
+    manifest.save()
     print(f"\n  Created {created} attraction POIs")
     return created
 
@@ -996,37 +894,7 @@ def infer_restaurant_tags(name, property_name, cuisine_raw=''):
 
 def infer_show_property(name):
     """Map show names to their known properties."""
-    known = {
-        "O by Cirque": "Bellagio", '"O"': "Bellagio",
-        "KA": "MGM Grand", "KÀ": "MGM Grand",
-        "Mystere": "Treasure Island", "Mystère": "Treasure Island",
-        "Beatles LOVE": "Mandalay Bay", "LOVE": "Mandalay Bay",
-        "Blue Man Group": "Luxor",
-        "Absinthe": "Caesars Palace",
-        "David Copperfield": "MGM Grand",
-        "Michael Jackson ONE": "Mandalay Bay", "MJ ONE": "Mandalay Bay",
-        "Mac King": "Excalibur",
-        "Mat Franco": "The LINQ",
-        "Shin Lim": "The LINQ",
-        "Terry Fator": "New York New York",
-        "Thunder From Down Under": "Excalibur",
-        "Tournament of Kings": "Excalibur",
-        "Mad Apple": "New York New York",
-        "Carrot Top": "Luxor",
-        "Fantasy": "Luxor",
-        "Zombie Burlesque": "Planet Hollywood",
-        "V - The Ultimate Variety": "Planet Hollywood",
-        "Piff the Magic Dragon": "Flamingo",
-        "RuPaul's Drag Race": "Flamingo",
-        "Donny Osmond": "Harrah's",
-        "Tape Face": "Harrah's",
-        "Xavier Mortimer": "The STRAT",
-        "Banachek": "The STRAT",
-    }
-    for key, prop in known.items():
-        if key.lower() in name.lower():
-            return prop
-    return None
+    return SHOW_DETECTOR.find(name)
 
 
 def infer_show_subcategory(name):
@@ -1051,73 +919,12 @@ def infer_show_subcategory(name):
 
 def infer_nightlife_property(name):
     """Map nightlife venue names to properties."""
-    known = {
-        "XS Nightclub": "Encore", "XS": "Encore",
-        "Encore Beach Club": "Encore", "EBC": "Encore",
-        "Hakkasan": "MGM Grand",
-        "JEWEL": "Aria", "Jewel": "Aria",
-        "Marquee Nightclub": "Cosmopolitan", "Marquee Dayclub": "Cosmopolitan",
-        "OMNIA": "Caesars Palace",
-        "On The Record": "Park MGM",
-        "LIV Nightclub": "Fontainebleau", "LIV Beach": "Fontainebleau",
-        "Liquid": "Aria",
-        "Venus Pool": "Caesars Palace",
-        "Go Pool": "Flamingo",
-        "Daylight": "Mandalay Bay", "Moorea": "Mandalay Bay",
-        "Foundation Room": "Mandalay Bay",
-        "Vanderpump": "Paris",
-        "Chandelier": "Cosmopolitan",
-        "Lily Bar": "Bellagio",
-        "Hyde": "Bellagio",
-        "Skyfall": "Mandalay Bay",
-        "Drai's": "The Cromwell",
-    }
-    for key, prop in known.items():
-        if key.lower() in name.lower():
-            return prop
-    return None
+    return NIGHTLIFE_DETECTOR.find(name)
 
 
 def infer_attraction_property(name):
     """Map attraction names to properties."""
-    known = {
-        "Adventuredome": "Circus Circus", "Indoor Circus": "Circus Circus",
-        "The Midway": "Circus Circus", "Slots-A-Fun": "Circus Circus",
-        "Conservatory": "Bellagio", "Fountains": "Bellagio",
-        "Gallery of Fine Art": "Bellagio",
-        "High Roller": "The LINQ", "Fly LINQ": "The LINQ",
-        "DreamBox": "The LINQ", "VR Adventures": "The LINQ",
-        "Eiffel Tower": "Paris",
-        "Gondola": "The Venetian", "Madame Tussauds": "The Venetian",
-        "PanIQ": "The Venetian",
-        "Shark Reef": "Mandalay Bay", "Swingers": "Mandalay Bay",
-        "Bob Marley": "Mandalay Bay",
-        "SkyJump": "The STRAT", "Big Shot": "The STRAT",
-        "X Scream": "The STRAT", "STRAT Tower": "The STRAT",
-        "Atomic Golf": "The STRAT",
-        "Lake of Dreams": "Wynn", "Wynn Golf": "Wynn",
-        "Hershey": "New York New York", "Roller Coaster": "New York New York",
-        "BODIES": "Luxor", "King Tut": "Luxor", "Titanic": "Luxor",
-        "HyperX": "Luxor", "Play Playground": "Luxor",
-        "Fun Dungeon": "Excalibur", "Max Flight": "Excalibur",
-        "Ultimate 4-D": "Excalibur",
-        "Electric Playhouse": "Caesars Palace", "F1 Arcade": "Caesars Palace",
-        "Escape Game": "Caesars Palace", "Atlantis Show": "Caesars Palace",
-        "Arte Museum": "Cosmopolitan", "Museum of Illusions": "Cosmopolitan",
-        "Arcade at Horseshoe": "Horseshoe", "BattleBots": "Horseshoe",
-        "Real Bodies": "Horseshoe", "Twilight Zone": "Horseshoe",
-        "Friends Experience": "MGM Grand", "Topgolf": "MGM Grand",
-        "Virtual Reality": "MGM Grand",
-        "Haus of Gaga": "Park MGM",
-        "Wildlife Habitat": "Flamingo",
-        "Princess Diana": "Aria", "Van Gogh": "Aria",
-        "The Cove": "Treasure Island",
-        "Hall of Excellence": "Fontainebleau",
-    }
-    for key, prop in known.items():
-        if key.lower() in name.lower():
-            return prop
-    return None
+    return ATTRACTION_DETECTOR.find(name)
 
 
 def infer_attraction_subcategory(name):
@@ -1157,37 +964,56 @@ def main():
                         help='Scrape individual venue pages for details (slower)')
     parser.add_argument('--dry-run', action='store_true',
                         help='Show what would be scraped without creating files')
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY,
+                        help=f'Parallel page fetches (default {MAX_CONCURRENCY})')
+    parser.add_argument('--rate', type=float, default=REQUESTS_PER_SECOND,
+                        help=f'Max requests per second per host (default {REQUESTS_PER_SECOND:.2g}; '
+                             'raise only for sites that allow it)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Do not read or write the page cache ({PAGE_CACHE_DIR})')
+    parser.add_argument('--offline', action='store_true',
+                        help='Replay from the page cache only; never touch the network')
     args = parser.parse_args()
+    if args.offline and args.no_cache:
+        parser.error('--offline needs the page cache')
+
+    global FETCHER
+    FETCHER = Fetcher(HEADERS, max_workers=args.concurrency, rate=args.rate,
+                      cache=None if args.no_cache else PageCache(PAGE_CACHE_DIR),
+                      offline=args.offline)
 
     print("=" * 60)
     print("Sin City Travels - POI Scraper")
     print(f"Category: {args.category}")
     print(f"Scrape details: {args.details}")
+    print(f"Concurrency: {args.concurrency} workers, {args.rate:g} req/s per host")
+    print(f"Page cache: {'off' if args.no_cache else PAGE_CACHE_DIR}{' (offline replay)' if args.offline else ''}")
     print(f"Dry run: {args.dry_run}")
     print(f"Output: {DATA_DIR}")
     print("=" * 60)
 
     total_created = 0
+    manifest = None if args.dry_run else Manifest(DATA_DIR)
 
     if args.category in ('restaurants', 'all'):
         restaurants = scrape_dining_page()
         if restaurants and not args.dry_run:
-            total_created += generate_restaurant_pois(restaurants, scrape_details=args.details)
+            total_created += generate_restaurant_pois(restaurants, args.details, manifest)
 
     if args.category in ('shows', 'all'):
         shows = scrape_shows_page()
         if shows and not args.dry_run:
-            total_created += generate_show_pois(shows, scrape_details=args.details)
+            total_created += generate_show_pois(shows, args.details, manifest)
 
     if args.category in ('nightlife', 'all'):
         nightlife = scrape_nightlife_page()
         if not args.dry_run:
-            total_created += generate_nightlife_pois(nightlife, scrape_details=args.details)
+            total_created += generate_nightlife_pois(nightlife, args.details, manifest)
 
     if args.category in ('attractions', 'all'):
         attractions = scrape_attractions_page()
         if attractions and not args.dry_run:
-            total_created += generate_attraction_pois(attractions, scrape_details=args.details)
+            total_created += generate_attraction_pois(attractions, args.details, manifest)
 
     print("\n" + "=" * 60)
     print(f"TOTAL NEW POIs CREATED: {total_created}")